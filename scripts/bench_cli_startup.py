@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""CLI 启动耗时回归基准
+
+检查只读 SQLite 的命令（history/stats/micro-stats/activity-history）：
+1. 导入 toutiao_agent.main 时不加载 Playwright、httpx、asyncio 等重量级模块；
+2. 命令的启动耗时（扣除解释器自身启动时间）不超过阈值。
+
+用法: python scripts/bench_cli_startup.py [--runs 5] [--max-ms 150]
+任一检查失败时以非零状态码退出。
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent / 'src'
+
+# 纯存储命令
+STORAGE_COMMANDS = ['history', 'stats', 'micro-stats', 'activity-history']
+
+# 纯存储命令不应加载的模块
+HEAVY_MODULES = [
+    'playwright',
+    'httpx',
+    'asyncio',
+    'toutiao_agent.toutiao_client',
+    'toutiao_agent.activity_fetcher',
+    'toutiao_agent.generator',
+    'toutiao_agent.storage',
+]
+
+CHECK_IMPORTS = f'''
+import json, sys
+import toutiao_agent.main
+print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))
+'''
+
+
+def _run(args, cwd: str) -> float:
+    """运行子进程并返回耗时（毫秒）"""
+    env = {**os.environ, 'PYTHONPATH': str(SRC_DIR)}
+    start = time.perf_counter()
+    subprocess.run(args, cwd=cwd, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def _median(args, cwd: str, runs: int) -> float:
+    """多次运行取中位数（毫秒）"""
+    return statistics.median(_run(args, cwd) for _ in range(runs))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='CLI 启动耗时回归基准')
+    parser.add_argument('--runs', type=int, default=5, help='每个命令运行次数')
+    parser.add_argument('--max-ms', type=float, default=150, help='扣除解释器启动后的耗时上限(ms)')
+    args = parser.parse_args()
+
+    failed = False
+
+    # 在临时目录中运行，使用默认配置和空数据库
+    with tempfile.TemporaryDirectory() as cwd:
+        env = {**os.environ, 'PYTHONPATH': str(SRC_DIR)}
+        output = subprocess.run([sys.executable, '-c', CHECK_IMPORTS], cwd=cwd, env=env,
+                                check=True, capture_output=True, text=True).stdout
+        loaded = json.loads(output.strip().splitlines()[-1])
+        if loaded:
+            print(f"[FAIL] 导入 toutiao_agent.main 时加载了重量级模块: {', '.join(loaded)}")
+            failed = True
+        else:
+            print("[OK] 导入 toutiao_agent.main 未加载重量级模块")
+
+        baseline = _median([sys.executable, '-c', 'pass'], cwd, args.runs)
+        print(f"\n解释器启动基线: {baseline:.1f} ms\n")
+
+        for command in STORAGE_COMMANDS:
+            elapsed = _median([sys.executable, '-m', 'toutiao_agent.main', command], cwd, args.runs) - baseline
+            status = 'OK' if elapsed <= args.max_ms else 'FAIL'
+            failed = failed or status == 'FAIL'
+            print(f"[{status}] {command:<18} {elapsed:7.1f} ms (上限 {args.max_ms:.0f} ms)")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
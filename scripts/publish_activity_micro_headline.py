@@ -18,7 +18,7 @@ async def publish_activity_headline():
     print("=== 发布活动微头条 ===\n")
 
     # 获取活动
-    activities = activity_fetcher.fetch_activities(limit=5, only_ongoing=True, only_unparticipated=True)
+    activities = await activity_fetcher.fetch_activities_async(limit=5, only_ongoing=True, only_unparticipated=True)
 
     if not activities:
         print("没有找到活动")
@@ -66,7 +66,7 @@ async def publish_activity_headline():
 
     if result.get('success'):
         # 记录到数据库
-        storage.add_micro_headline(
+        await storage.a_add_micro_headline(
             content=content,
             activity_id=str(activity.activity_id),
             activity_title=activity.title,
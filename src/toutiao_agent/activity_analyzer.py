@@ -8,6 +8,7 @@ from pathlib import Path
 from dataclasses import dataclass, asdict
 from typing import Dict, Optional, Any, List
 from .activity_types import OperationType
+from .page_helpers import call_helper
 
 
 @dataclass
@@ -72,67 +73,7 @@ class ActivityAnalyzer:
 
         try:
             # 使用 JavaScript 直接分析页面元素
-            analysis_result = await page.evaluate('''() => {
-                const results = {
-                    hasInput: false,
-                    hasTextarea:false,
-                    hasPublishButton:false,
-                    hasActivityCard:false,
-                    inputTypes:[],
-                    buttonTexts:[],
-                    pageTitle:'',
-                    pageText:''
-                };
-
-                // 获取页面标题
-                const titleEl = document.querySelector('.activity-title, h1, .title');
-                if (titleEl) {
-                    results.pageTitle = titleEl.textContent?.trim().substring(0, 50) || '';
-                }
-
-                // 检测输入框
-                const contenteditables = document.querySelectorAll('[contenteditable="true"]');
-                const textareas = document.querySelectorAll('textarea');
-
-                results.hasInput = contenteditables.length > 0 || textareas.length > 0;
-
-                if (contenteditables.length > 0) {
-                    contenteditables.forEach((el, i) => {
-                        if (i < 3) {  // 只记录前3个
-                            results.inputTypes.push('contenteditable');
-                        }
-                    });
-                }
-
-                if (textareas.length > 0) {
-                    textareas.forEach((el, i) => {
-                        if (i < 3) {  // 只记录前3个
-                            results.inputTypes.push('textarea');
-                        }
-                    });
-                }
-
-                // 检测发布/提交按钮
-                const buttons = Array.from(document.querySelectorAll('button, [role="button"]'));
-                const publishKeywords = ['发布', '发送', '提交', '确认', '立即参与'];
-
-                buttons.forEach(btn => {
-                    const text = btn.textContent?.trim() || '';
-                    results.buttonTexts.push(text.substring(0, 20));
-                    if (publishKeywords.some(kw => text.includes(kw))) {
-                        results.hasPublishButton = true;
-                    }
-                });
-
-                // 检测活动卡片（用于验证是否在活动页面）
-                const activityLinks = Array.from(document.querySelectorAll('a[href*="activity"]'));
-                results.hasActivityCard = activityLinks.length > 0;
-
-                // 获取页面文本（用于回退规则分析）
-                results.pageText = document.body.innerText.substring(0, 1000);
-
-                return results;
-            }''')
+            analysis_result = await call_helper(page, 'analyzeActivityPage')
 
             # 根据检测结果确定操作类型
             operation_type, confidence, suggested = self._analyze_from_elements(
@@ -1,52 +1,159 @@
-"""活动抓取模块 - 从头条创作者平台获取活动列表"""
-
-import json
-import urllib.request
-import urllib.error
+"""活动抓取模块 - 从头条创作者平台获取活动列表
+
+请求通过共享的 httpx.AsyncClient 发出（长连接、可选 HTTP/2），异步命令中直接
+await *_async 方法，同步方法 fetch_activities/get_categories 是对其的简单包装。
+成功的响应按完整 URL 和登录账号缓存到磁盘（见 response_cache），过期数据先返回再后台刷新。
+"""
+
+import asyncio
+import inspect
+import re
+import threading
+import time
 import urllib.parse
-from datetime import datetime
-from typing import List, Dict, Optional
-from pathlib import Path
-
-from .config import config
+from dataclasses import dataclass, field, replace
+from collections import deque
+from typing import (
+    AsyncIterator, Awaitable, Callable, Collection, Deque, Iterable, List, Dict, Optional, Tuple,
+    TypeVar, Union
+)
 
+import httpx
 
+from .config import config
+from .cookie_jar import CookieJar, get_cookie_jar
+from .rate_limiter import AdaptiveRateLimiter, get_rate_limiter
+from .resilience import CircuitBreaker, backoff_delay
+from .response_cache import ResponseCache
+from .tracing import tracer, traced
+
+T = TypeVar('T')
+
+# 默认 HTTP 配置，可通过 activity_fetcher 配置段覆盖
+DEFAULT_FETCHER_SETTINGS = {
+    "timeout": 10.0,                 # 请求超时(秒)
+    "http2": False,                  # 启用 HTTP/2（需安装 h2: pip install httpx[http2]）
+    "max_connections": 10,           # 连接池最大连接数
+    "max_keepalive_connections": 10, # 保持的空闲长连接数
+    "keepalive_expiry": 30.0,        # 空闲长连接保留时间(秒)
+    "page_size": 24,                 # fetch_all_activities 每页数量
+    "max_pages": 20,                 # fetch_all_activities 最多拉取页数
+    "max_in_flight": 8,              # fetch_all_activities 同时进行的分页请求数
+    "prefetch_pages": 1,             # iter_activities 预取的页数
+    "cache_enabled": True,           # 是否缓存接口响应
+    "cache_ttl": 60,                 # 缓存新鲜期(秒)，期内不发请求
+    "cache_stale_ttl": 3600,         # 过期缓存最长可用期(秒)，期内先返回旧数据再后台刷新
+    "cache_dir": "data/cache/activity_api",  # 缓存目录
+    "retries": 2,                    # 超时/连接错误/429/5xx 的重试次数
+    "retry_backoff": 0.5,            # 重试退避基础时间(秒)，指数增长并加完全抖动
+    "retry_backoff_max": 5.0,        # 重试退避上限(秒)
+    "hedge_after": 0,                # 请求超过该秒数未返回时再发一个相同请求，0 表示不启用
+    "breaker_threshold": 5,          # 连续失败多少次后熔断，0 表示不熔断
+    "breaker_reset": 30.0,           # 熔断后多久允许探测请求(秒)
+}
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+REFERER = 'https://mp.toutiao.com/profile_v4/activity/task-list'
+
+
+def _report_outcome(limiter: Optional[AdaptiveRateLimiter], response: httpx.Response) -> Dict:
+    """解析接口响应，并据此调整限流速率：429 或接口返回非零 code 时降速，否则提速
+
+    Args:
+        limiter: 限流器，None 表示不受限
+        response: HTTP 响应
+
+    Returns:
+        Dict: 响应数据（非 2xx 时抛出 httpx.HTTPStatusError）
+    """
+    if limiter and response.status_code == 429:
+        limiter.on_throttle('HTTP 429')
+    response.raise_for_status()
+    result = response.json()
+    if limiter:
+        code = result.get('code')
+        if code not in (0, None):
+            limiter.on_throttle(f'code={code}')
+        else:
+            limiter.on_success()
+    return result
+
+
+def _http2_available() -> bool:
+    """检查 HTTP/2 依赖 h2 是否已安装"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# 从标题/介绍中提取话题（格式：#话题名#）
+_HASHTAG_RE = re.compile(r'#([^#]+)#')
+
+
+@dataclass(frozen=True, slots=True, repr=False)
 class Activity:
-    """活动数据类"""
-
-    def __init__(self, data: Dict):
-        """从 API 数据初始化活动
+    """活动数据类（不可变；原始数据仅在 keep_raw=True 时保留）"""
+
+    activity_id: Optional[int]
+    title: str = ''
+    introduction: str = ''
+    activity_time: str = ''
+    activity_reward: str = ''
+    activity_participants: str = ''
+    part_in: int = 0                    # 是否已参与
+    status: int = 0                     # 活动状态
+    hashtag_id: int = 0
+    hashtag_name: str = ''
+    href: str = ''
+    activity_start_time: int = 0
+    activity_end_time: int = 0          # Unix 时间戳，0 表示长期活动
+    categories: Tuple[str, ...] = ()    # 所属分类（由 fetch_activities_by_category 填充）
+    raw_data: Optional[Dict] = field(default=None, compare=False)
+
+    @classmethod
+    def from_api(cls, data: Dict, categories: Tuple[str, ...] = (), keep_raw: bool = False) -> 'Activity':
+        """从 API 数据创建活动
 
         Args:
             data: API 返回的活动数据
+            categories: 所属分类
+            keep_raw: 是否保留原始数据（写入本地活动表时需要）
+
+        Returns:
+            Activity: 活动
         """
-        self.activity_id = data.get('activity_id')
-        self.title = data.get('title', '')
-        self.introduction = data.get('introduction', '')
-        self.activity_time = data.get('activity_time', '')
-        self.activity_reward = data.get('activity_reward', '')
-        self.activity_participants = data.get('activity_participants', '')
-        self.part_in = data.get('part_in', 0)  # 是否已参与
-        self.status = data.get('status', 0)  # 活动状态
-        self.hashtag_id = data.get('hashtag_id', 0)
-        self.hashtag_name = data.get('hashtag_name', '')
-        self.href = data.get('href', '')
-        self.activity_start_time = data.get('activity_start_time', 0)
-        self.activity_end_time = data.get('activity_end_time', 0)
-
-        # 原始数据
-        self.raw_data = data
-
-    def is_expired(self) -> bool:
+        return cls(
+            activity_id=data.get('activity_id'),
+            title=data.get('title', ''),
+            introduction=data.get('introduction', ''),
+            activity_time=data.get('activity_time', ''),
+            activity_reward=data.get('activity_reward', ''),
+            activity_participants=data.get('activity_participants', ''),
+            part_in=data.get('part_in', 0),
+            status=data.get('status', 0),
+            hashtag_id=data.get('hashtag_id', 0),
+            hashtag_name=data.get('hashtag_name', ''),
+            href=data.get('href', ''),
+            activity_start_time=data.get('activity_start_time', 0),
+            activity_end_time=data.get('activity_end_time', 0),
+            categories=tuple(categories),
+            raw_data=data if keep_raw else None,
+        )
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
         """检查活动是否已过期
 
+        Args:
+            now: 当前 Unix 时间戳，批量判断时由调用方传入同一个值
+
         Returns:
             bool: 是否已过期
         """
         if self.activity_end_time == 0:
             return False
-        # activity_end_time 是 Unix 时间戳
-        return self.activity_end_time < datetime.now().timestamp()
+        return self.activity_end_time < (time.time() if now is None else now)
 
     def get_hashtag(self) -> Optional[str]:
         """获取活动话题标签
@@ -56,9 +163,7 @@ class Activity:
         """
         if self.hashtag_name:
             return f"#{self.hashtag_name}#"
-        # 从标题中提取话题（格式：#话题名#）
-        import re
-        match = re.search(r'#([^#]+)#', self.title + ' ' + self.introduction)
+        match = _HASHTAG_RE.search(self.title + ' ' + self.introduction)
         if match:
             return match.group(0)
         return None
@@ -67,6 +172,40 @@ class Activity:
         return f"Activity(id={self.activity_id}, title={self.title[:20]}...)"
 
 
+def filter_activities(
+    activities: Iterable[Activity],
+    only_ongoing: bool = False,
+    only_unparticipated: bool = False,
+    category: Optional[str] = None,
+    exclude_ids: Optional[Collection[str]] = None,
+    now: Optional[float] = None
+) -> List[Activity]:
+    """批量筛选活动（整批只取一次当前时间）
+
+    Args:
+        activities: 活动列表
+        only_ongoing: 仅保留未过期的活动
+        only_unparticipated: 仅保留未参与的活动
+        category: 分类筛选（"全部" 或 None 表示不筛选）
+        exclude_ids: 要排除的活动 ID（字符串形式，如已处理的活动）
+        now: 当前 Unix 时间戳，默认取系统时间
+
+    Returns:
+        List[Activity]: 筛选后的活动，保持原有顺序
+    """
+    now = time.time() if now is None else now
+    if category == '全部':
+        category = None
+    exclude_ids = set(exclude_ids) if exclude_ids else None
+    return [
+        a for a in activities
+        if not (only_ongoing and a.is_expired(now))
+        and not (only_unparticipated and a.part_in)
+        and (category is None or category in a.categories)
+        and (exclude_ids is None or str(a.activity_id) not in exclude_ids)
+    ]
+
+
 class ActivityFetcher:
     """活动抓取类"""
 
@@ -81,66 +220,279 @@ class ActivityFetcher:
         Args:
             cookie_file: Cookie 文件路径，默认从配置读取
         """
-        self.cookie_file = cookie_file or config.playwright.get('cookies_file', 'data/cookies.json')
-        self.cookies = self._load_cookies()
+        # 默认与浏览器共用同一个 Cookie 存储，登录态刷新后下一个请求即生效
+        self.cookie_jar = CookieJar(cookie_file) if cookie_file else get_cookie_jar()
+        self.settings = {**DEFAULT_FETCHER_SETTINGS, **(config.get('activity_fetcher') or {})}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        # 为 True 时跳过缓存读取，总是请求接口（结果仍写入缓存）
+        self.force_refresh = False
+        self.cache: Optional[ResponseCache] = None
+        if self.settings['cache_enabled']:
+            self.cache = ResponseCache(
+                self.settings['cache_dir'],
+                ttl=float(self.settings['cache_ttl']),
+                stale_ttl=float(self.settings['cache_stale_ttl'])
+            )
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self.breaker = CircuitBreaker(
+            int(self.settings['breaker_threshold']),
+            float(self.settings['breaker_reset']),
+            name='活动接口'
+        )
+
+    def _headers(self, url: str) -> Dict[str, str]:
+        """接口请求头（后台刷新线程使用，共享客户端通过事件钩子设置 Cookie）"""
+        return {
+            'Cookie': self.cookie_jar.header(url),
+            'User-Agent': USER_AGENT,
+            'Referer': REFERER,
+        }
 
-    def _load_cookies(self) -> List[Dict]:
-        """加载 Cookie
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取共享的 HTTP 客户端（首次调用时创建，绑定当前事件循环）"""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._client_loop is not loop:
+            # 上一个事件循环已结束（同步包装每次调用都会新建循环），其连接不可复用
+            self._client = None
+        if self._client is None:
+            settings = self.settings
+            http2 = bool(settings['http2'])
+            if http2 and not _http2_available():
+                print("[警告] 未安装 h2，活动接口回退到 HTTP/1.1（pip install httpx[http2]）")
+                http2 = False
+            self._client = httpx.AsyncClient(
+                headers={'User-Agent': USER_AGENT, 'Referer': REFERER},
+                event_hooks={'request': [self.cookie_jar.apply_header]},
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=settings['max_connections'],
+                    max_keepalive_connections=settings['max_keepalive_connections'],
+                    keepalive_expiry=settings['keepalive_expiry'],
+                ),
+                timeout=settings['timeout'],
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self):
+        """关闭 HTTP 客户端"""
+        if self._client is not None:
+            client, self._client = self._client, None
+            self._client_loop = None
+            await client.aclose()
+
+    def _run_sync(self, coro: Awaitable[T]) -> T:
+        """在新的事件循环中运行协程，结束后关闭该循环上的 HTTP 客户端
+
+        Args:
+            coro: 要运行的协程
 
         Returns:
-            List[Dict]: Cookie 列表
+            协程的返回值
         """
-        cookie_path = Path(self.cookie_file)
-        if not cookie_path.exists():
-            return []
+        async def run():
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(run())
+        coro.close()
+        raise RuntimeError("事件循环中请使用 ActivityFetcher 的 *_async 方法")
+
+    def _cache_key(self, url: str) -> str:
+        """缓存键：URL 加登录态标识，重新登录或切换账号后不会读到上一个会话的响应"""
+        return f"{url}#{self.cookie_jar.identity(url)}"
 
-        with open(cookie_path, 'r', encoding='utf-8') as f:
-            cookies_data = json.load(f)
-            # 处理两种可能的格式
-            if isinstance(cookies_data, dict) and 'cookies' in cookies_data:
-                return cookies_data['cookies']
-            return cookies_data if isinstance(cookies_data, list) else []
+    async def _make_request(self, url: str) -> Dict:
+        """发送 HTTP 请求（优先读取缓存）
 
-    def _build_cookie_header(self) -> str:
-        """构建 Cookie 请求头
+        Args:
+            url: 请求 URL
 
         Returns:
-            str: Cookie 字符串
+            Dict: 响应数据
         """
-        return '; '.join([f"{c['name']}={c['value']}" for c in self.cookies])
-
-    def _make_request(self, url: str) -> Dict:
-        """发送 HTTP 请求
+        key = self._cache_key(url)
+        if self.cache is not None and not self.force_refresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                result, fresh = cached
+                if not fresh:
+                    self._refresh_in_background(url)
+                return result
+
+        result = await self._request(url)
+        if self.cache is not None and result.get('code') == 0:
+            self.cache.set(key, result)
+        return result
+
+    def _refresh_in_background(self, url: str):
+        """在后台线程中刷新过期缓存（同一 URL 同时只刷新一次）
+
+        使用非守护线程：同步命令输出结果后，进程会等刷新写完缓存再退出。
+        """
+        with self._refresh_lock:
+            if url in self._refreshing:
+                return
+            self._refreshing.add(url)
+        threading.Thread(target=self._refresh_blocking, args=(url,), name='activity-cache-refresh').start()
+
+    def _refresh_blocking(self, url: str):
+        """同步请求接口并写入缓存（在后台线程中运行）"""
+        limiter = get_rate_limiter(url)
+        key = self._cache_key(url)
+        allowed = False
+        failed = False  # 与 _attempt 一致：超时、连接错误、429、5xx、无法解析的响应计为熔断失败
+        try:
+            allowed = self.breaker.allow()
+            if not allowed:
+                return
+            if limiter:
+                limiter.acquire_blocking()
+            with tracer.span('http.activity_api.refresh', url=url.split('?', 1)[0]):
+                response = httpx.get(url, headers=self._headers(url), timeout=self.settings['timeout'])
+            result = _report_outcome(limiter, response)
+            if result.get('code') == 0:
+                self.cache.set(key, result)
+        except httpx.TimeoutException:
+            failed = True
+            if limiter:
+                limiter.on_throttle('超时')
+        except httpx.TransportError:
+            failed = True
+        except httpx.HTTPStatusError as e:
+            # 429 已在 _report_outcome 中降速
+            status = e.response.status_code
+            failed = status == 429 or status >= 500
+        except httpx.HTTPError:
+            # 刷新失败时保留旧缓存，下次读取会再次尝试
+            pass
+        except Exception:
+            failed = True
+        finally:
+            # 本次刷新可能拿到了半开状态的探测机会，无论结果如何都要记录，否则熔断器一直不放行
+            if allowed:
+                if failed:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+            with self._refresh_lock:
+                self._refreshing.discard(url)
+
+    async def _request(self, url: str) -> Dict:
+        """请求接口（熔断检查 + 可重试错误按抖动退避重试）
+
+        重试后仍为可重试的失败时计为熔断失败，其他结果（成功、4xx 等）计为成功。
 
         Args:
             url: 请求 URL
 
         Returns:
-            Dict: 响应数据
+            Dict: 响应数据，失败时为 {'error': ..., 'success': False}
+        """
+        if not self.breaker.allow():
+            return {
+                'error': f'活动接口熔断中，{self.breaker.retry_after():.0f} 秒后重试',
+                'success': False
+            }
+
+        retries = max(0, int(self.settings['retries']))
+        try:
+            for attempt in range(retries + 1):
+                if attempt:
+                    await asyncio.sleep(backoff_delay(
+                        attempt, float(self.settings['retry_backoff']), float(self.settings['retry_backoff_max'])
+                    ))
+                result, retryable = await self._attempt_hedged(url)
+                if not retryable:
+                    break
+        except asyncio.CancelledError:
+            # 被取消时没有结果，释放可能持有的探测机会
+            self.breaker.release()
+            raise
+
+        if retryable:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return result
+
+    async def _attempt_hedged(self, url: str) -> Tuple[Dict, bool]:
+        """发送请求；超过 hedge_after 秒未返回时再发一个相同请求，取先成功的结果
+
+        Returns:
+            Tuple[Dict, bool]: (响应数据, 是否为可重试的失败)
         """
-        req = urllib.request.Request(url)
-        req.add_header('Cookie', self._build_cookie_header())
-        req.add_header('User-Agent', 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36')
-        req.add_header('Referer', 'https://mp.toutiao.com/profile_v4/activity/task-list')
+        hedge_after = float(self.settings['hedge_after'] or 0)
+        if hedge_after <= 0:
+            return await self._attempt(url)
+
+        pending = {asyncio.create_task(self._attempt(url))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_after)
+            if done:
+                return done.pop().result()
+
+            with tracer.span('http.activity_api.hedge', url=url.split('?', 1)[0]):
+                pending.add(asyncio.create_task(self._attempt(url)))
+                while True:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        result, retryable = task.result()
+                        # 成功或不可重试的失败直接采用；可重试的失败等另一个请求
+                        if not retryable or not pending:
+                            return result, retryable
+        finally:
+            # 已有结果或调用方被取消：取消并等待仍在进行的请求，避免泄漏
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _attempt(self, url: str) -> Tuple[Dict, bool]:
+        """发送一次请求
 
+        Returns:
+            Tuple[Dict, bool]: (响应数据, 是否为可重试的失败：超时、连接错误、429、5xx、
+                无法解析的响应)
+        """
+        limiter = get_rate_limiter(url)
         try:
-            with urllib.request.urlopen(req, timeout=10) as response:
-                return json.loads(response.read().decode('utf-8'))
-        except urllib.error.HTTPError as e:
+            if limiter:
+                await limiter.acquire()
+            with tracer.span('http.activity_api', url=url.split('?', 1)[0]):
+                response = await self._get_client().get(url)
+            return _report_outcome(limiter, response), False
+        except httpx.TimeoutException as e:
+            if limiter:
+                limiter.on_throttle('超时')
             return {
-                'error': f'HTTP 错误: {e.code}',
+                'error': f'连接错误: 请求超时 {e}',
                 'success': False
-            }
-        except urllib.error.URLError as e:
+            }, True
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
             return {
-                'error': f'连接错误: {e.reason}',
+                'error': f'HTTP 错误: {status}',
                 'success': False
-            }
+            }, status == 429 or status >= 500
+        except httpx.RequestError as e:
+            return {
+                'error': f'连接错误: {e}',
+                'success': False
+            }, True
         except Exception as e:
+            # 响应不是合法 JSON 或结构异常：服务端异常，计入熔断失败并重试
             return {
-                'error': f'未知错误: {str(e)}',
+                'error': f'响应异常: {str(e)}',
                 'success': False
-            }
+            }, True
 
     def fetch_activities(
         self,
@@ -149,6 +501,20 @@ class ActivityFetcher:
         category: str = "全部",
         only_ongoing: bool = True,
         only_unparticipated: bool = True
+    ) -> List[Activity]:
+        """获取活动列表（同步包装，参数见 fetch_activities_async）"""
+        return self._run_sync(self.fetch_activities_async(
+            offset, limit, category, only_ongoing, only_unparticipated
+        ))
+
+    @traced('fetcher.fetch_activities')
+    async def fetch_activities_async(
+        self,
+        offset: int = 0,
+        limit: int = 24,
+        category: str = "全部",
+        only_ongoing: bool = True,
+        only_unparticipated: bool = True
     ) -> List[Activity]:
         """获取活动列表
 
@@ -162,6 +528,30 @@ class ActivityFetcher:
         Returns:
             List[Activity]: 活动列表
         """
+        activities = await self._fetch_page_async(
+            offset, limit, category, only_ongoing, only_unparticipated
+        ) or []
+
+        # 过滤过期活动
+        if only_ongoing:
+            activities = filter_activities(activities, only_ongoing=True)
+
+        return activities
+
+    async def _fetch_page_async(
+        self,
+        offset: int,
+        limit: int,
+        category: str,
+        only_ongoing: bool,
+        only_unparticipated: bool,
+        keep_raw: bool = False
+    ) -> Optional[List[Activity]]:
+        """请求一页活动（不做过期过滤，便于按返回条数判断是否为最后一页）
+
+        Returns:
+            Optional[List[Activity]]: 本页活动，请求失败返回 None
+        """
         # 构建查询参数
         params = {
             'offset': offset,
@@ -182,27 +572,337 @@ class ActivityFetcher:
         query_string = urllib.parse.urlencode(params)
         url = f"{self.API_BASE}/list/v2/?{query_string}"
 
-        result = self._make_request(url)
+        result = await self._make_request(url)
 
         if 'error' in result:
             print(f"[错误] 获取活动失败: {result['error']}")
-            return []
+            return None
 
         if result.get('code') != 0:
             print(f"[错误] API 错误: {result.get('message', '未知错误')}")
-            return []
+            return None
 
         # 解析活动列表
         activity_list_data = result.get('data', {}).get('activity_list', [])
-        activities = [Activity(data) for data in activity_list_data]
+        return [Activity.from_api(data, keep_raw=keep_raw) for data in activity_list_data]
+
+    def fetch_all_activities(
+        self,
+        category: str = "全部",
+        only_ongoing: bool = True,
+        only_unparticipated: bool = True,
+        page_size: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        max_in_flight: Optional[int] = None
+    ) -> Optional[List[Activity]]:
+        """获取全部分页的活动（同步包装，参数见 fetch_all_activities_async）"""
+        return self._run_sync(self.fetch_all_activities_async(
+            category, only_ongoing, only_unparticipated, page_size, max_pages, max_in_flight
+        ))
+
+    @traced('fetcher.fetch_all_activities')
+    async def fetch_all_activities_async(
+        self,
+        category: str = "全部",
+        only_ongoing: bool = True,
+        only_unparticipated: bool = True,
+        page_size: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        keep_raw: bool = False
+    ) -> Optional[List[Activity]]:
+        """并发拉取全部分页的活动
+
+        按偏移同时发出最多 max_in_flight 个分页请求，任一页返回不足 page_size 条
+        即视为最后一页，取消其后仍在进行的请求；结果按页序合并并按 activity_id 去重。
+        最后一页之前的任一页请求失败（已按 retries 重试）时结果不完整，整体返回 None。
+
+        Args:
+            category: 分类筛选
+            only_ongoing: 仅获取进行中的活动
+            only_unparticipated: 仅获取未参与的活动
+            page_size: 每页数量，默认读取 activity_fetcher.page_size
+            max_pages: 最多拉取页数，默认读取 activity_fetcher.max_pages
+            max_in_flight: 同时进行的请求数，默认读取 activity_fetcher.max_in_flight
+            keep_raw: 是否保留原始数据
+
+        Returns:
+            Optional[List[Activity]]: 去重后的活动列表，有分页请求失败时返回 None
+        """
+        page_size = page_size or int(self.settings['page_size'])
+        max_pages = max_pages or int(self.settings['max_pages'])
+        max_in_flight = max(1, max_in_flight or int(self.settings['max_in_flight']))
+
+        pending: Dict[int, asyncio.Task] = {}
+        pages: Dict[int, List[Activity]] = {}
+        next_page = 0
+        last_page = max_pages  # 页号上界（不含），遇到不满的一页后收缩
+        failed_page: Optional[int] = None
+
+        try:
+            while pending or next_page < last_page:
+                while next_page < last_page and len(pending) < max_in_flight:
+                    pending[next_page] = asyncio.create_task(self._fetch_page_async(
+                        next_page * page_size, page_size, category, only_ongoing, only_unparticipated,
+                        keep_raw
+                    ))
+                    next_page += 1
+
+                done, _ = await asyncio.wait(pending.values(), return_when=asyncio.FIRST_COMPLETED)
+                for index in [i for i, task in pending.items() if task in done]:
+                    page = pending.pop(index).result()
+                    if page is None:
+                        # 失败的页不能当作最后一页，否则其后的活动会被悄悄截断
+                        if failed_page is None or index < failed_page:
+                            failed_page = index
+                        last_page = min(last_page, index + 1)
+                        continue
+                    if page:
+                        pages[index] = page
+                    if len(page) < page_size:
+                        last_page = min(last_page, index + 1)
+
+                # 取消最后一页之后的请求
+                cancelled = [pending.pop(i) for i in list(pending) if i >= last_page]
+                for task in cancelled:
+                    task.cancel()
+                await asyncio.gather(*cancelled, return_exceptions=True)
+        finally:
+            for task in pending.values():
+                task.cancel()
+
+        if failed_page is not None and failed_page < last_page:
+            print(f"[错误] 分类 {category} 第 {failed_page + 1} 页获取失败，活动列表不完整")
+            return None
+
+        activities: List[Activity] = []
+        seen = set()
+        for index in sorted(pages):
+            if index >= last_page:
+                continue
+            for activity in pages[index]:
+                if activity.activity_id in seen:
+                    continue
+                seen.add(activity.activity_id)
+                activities.append(activity)
 
         # 过滤过期活动
         if only_ongoing:
-            activities = [a for a in activities if not a.is_expired()]
+            activities = filter_activities(activities, only_ongoing=True)
 
         return activities
 
+    async def iter_activities(
+        self,
+        category: str = "全部",
+        only_ongoing: bool = True,
+        only_unparticipated: bool = True,
+        page_size: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        prefetch: Optional[int] = None,
+        exclude: Optional[
+            Callable[[List[str]], Union[Collection[str], Awaitable[Collection[str]]]]
+        ] = None
+    ) -> AsyncIterator[Activity]:
+        """逐页产出活动的异步生成器
+
+        消费当前页的同时预取后续 prefetch 页；某页返回不足 page_size 条即结束。
+        某页请求失败（已按 retries 重试）时打印错误并停止，已产出的活动不受影响。
+        提前退出（break）时取消尚未完成的预取请求。
+
+        Args:
+            category: 分类筛选
+            only_ongoing: 仅获取进行中的活动
+            only_unparticipated: 仅获取未参与的活动
+            page_size: 每页数量，默认读取 activity_fetcher.page_size
+            max_pages: 最多拉取页数，默认读取 activity_fetcher.max_pages
+            prefetch: 预取页数，默认读取 activity_fetcher.prefetch_pages
+            exclude: 每页调用一次，传入本页活动 ID，返回其中要跳过的 ID
+                （如 storage 中已处理的活动，整页一次批量查询）；可以是异步函数
+
+        Yields:
+            Activity: 按页序产出、按 activity_id 去重的活动
+        """
+        page_size = page_size or int(self.settings['page_size'])
+        max_pages = max_pages or int(self.settings['max_pages'])
+        prefetch = max(0, int(self.settings['prefetch_pages'] if prefetch is None else prefetch))
+
+        pending: Deque[Tuple[int, asyncio.Task]] = deque()
+        next_page = 0
+        seen = set()
+
+        def schedule():
+            nonlocal next_page
+            while next_page < max_pages and len(pending) <= prefetch:
+                pending.append((next_page, asyncio.create_task(self._fetch_page_async(
+                    next_page * page_size, page_size, category, only_ongoing, only_unparticipated
+                ))))
+                next_page += 1
+
+        def stop():
+            # 不再需要已预取的后续页
+            nonlocal next_page
+            for _, task in pending:
+                task.cancel()
+            pending.clear()
+            next_page = max_pages
+
+        try:
+            schedule()
+            while pending:
+                index, task = pending.popleft()
+                page = await task
+                if page is None:
+                    stop()
+                    print(f"[错误] 分类 {category} 第 {index + 1} 页获取失败，后续活动未获取")
+                    break
+                if len(page) < page_size:
+                    # 最后一页
+                    stop()
+                else:
+                    schedule()
+
+                page = filter_activities(page, only_ongoing=only_ongoing)
+                if exclude is not None and page:
+                    exclude_ids = exclude([str(a.activity_id) for a in page])
+                    if inspect.isawaitable(exclude_ids):
+                        exclude_ids = await exclude_ids
+                    page = filter_activities(page, exclude_ids=exclude_ids)
+                for activity in page:
+                    if activity.activity_id in seen:
+                        continue
+                    seen.add(activity.activity_id)
+                    yield activity
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    def fetch_activities_by_category(
+        self,
+        categories: Optional[List[str]] = None,
+        only_ongoing: bool = True,
+        only_unparticipated: bool = True
+    ) -> List[Activity]:
+        """按分类并发获取全部活动（同步包装，参数见 fetch_activities_by_category_async）"""
+        return self._run_sync(self.fetch_activities_by_category_async(
+            categories, only_ongoing, only_unparticipated
+        ))
+
+    @traced('fetcher.fetch_activities_by_category')
+    async def fetch_activities_by_category_async(
+        self,
+        categories: Optional[List[str]] = None,
+        only_ongoing: bool = True,
+        only_unparticipated: bool = True,
+        keep_raw: bool = False
+    ) -> List[Activity]:
+        """并发拉取所有分类的活动，合并去重并标注每个活动所属的分类
+
+        "全部" 分类同时拉取（不作为标签），保证没有分类的活动也不会遗漏。
+        各分类的分页请求共用同一个连接池，总并发受 max_connections 限制。
+        任一分类拉取失败时分类标注不完整，返回空列表（调用方按请求失败处理）。
+
+        Args:
+            categories: 要拉取的分类，默认通过 get_categories_async 获取
+            only_ongoing: 仅获取进行中的活动
+            only_unparticipated: 仅获取未参与的活动
+            keep_raw: 是否保留原始数据
+
+        Returns:
+            List[Activity]: 去重后的活动列表，activity.categories 为其出现过的分类；
+                任一分类拉取失败时为空列表
+        """
+        if categories is None:
+            categories = await self.get_categories_async()
+        names = ['全部'] + [c for c in categories if c and c != '全部']
+
+        results = await asyncio.gather(*[
+            self.fetch_all_activities_async(name, only_ongoing, only_unparticipated, keep_raw=keep_raw)
+            for name in names
+        ])
+        if any(activities is None for activities in results):
+            return []
+
+        merged: Dict[int, Activity] = {}
+        tags: Dict[int, List[str]] = {}
+        for name, activities in zip(names, results):
+            for activity in activities:
+                merged.setdefault(activity.activity_id, activity)
+                found_in = tags.setdefault(activity.activity_id, [])
+                if name != '全部' and name not in found_in:
+                    found_in.append(name)
+        return [
+            replace(activity, categories=tuple(tags[activity_id])) if tags[activity_id] else activity
+            for activity_id, activity in merged.items()
+        ]
+
+    def sync_activities(self) -> Dict[str, List[str]]:
+        """同步活动到本地活动表（同步包装，见 sync_activities_async）"""
+        return self._run_sync(self.sync_activities_async())
+
+    @traced('fetcher.sync_activities')
+    async def sync_activities_async(self) -> Dict[str, List[str]]:
+        """按分类拉取所有进行中的活动（含已参与），增量写入本地活动表
+
+        Returns:
+            Dict[str, List[str]]: 变化的活动 ID，见 CommentStorage.sync_activities
+        """
+        from .storage import storage
+
+        activities = await self.fetch_activities_by_category_async(
+            only_ongoing=True,
+            only_unparticipated=False,
+            keep_raw=True
+        )
+        if not activities:
+            # 请求失败时不做同步，避免误判
+            ended = await storage.a_mark_ended_activities()
+            return {'new': [], 'updated': [], 'participated': [], 'ended': ended}
+        return await storage.a_sync_activities(activities)
+
+    def load_local_activities(
+        self,
+        only_ongoing: bool = True,
+        only_unparticipated: bool = True,
+        category: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Activity]:
+        """从本地活动表读取活动（不发请求，参数见 CommentStorage.get_activities）
+
+        Returns:
+            List[Activity]: 活动列表
+        """
+        from .storage import storage
+
+        return self._local_rows_to_activities(
+            storage.get_activities(only_ongoing, only_unparticipated, category, limit)
+        )
+
+    async def load_local_activities_async(
+        self,
+        only_ongoing: bool = True,
+        only_unparticipated: bool = True,
+        category: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Activity]:
+        """从本地活动表读取活动（查询在存储的读线程中执行，不阻塞事件循环）"""
+        from .storage import storage
+
+        return self._local_rows_to_activities(
+            await storage.a_get_activities(only_ongoing, only_unparticipated, category, limit)
+        )
+
+    @staticmethod
+    def _local_rows_to_activities(rows: List[Dict]) -> List[Activity]:
+        """本地活动表的记录转换为活动"""
+        return [Activity.from_api(data, categories=data.pop('categories', ())) for data in rows]
+
     def get_categories(self) -> List[str]:
+        """获取所有活动分类（同步包装）"""
+        return self._run_sync(self.get_categories_async())
+
+    @traced('fetcher.get_categories')
+    async def get_categories_async(self) -> List[str]:
         """获取所有活动分类
 
         Returns:
@@ -217,7 +917,7 @@ class ActivityFetcher:
         query_string = urllib.parse.urlencode(params)
         url = f"{self.API_BASE}/get_all_category/?{query_string}"
 
-        result = self._make_request(url)
+        result = await self._make_request(url)
 
         if 'error' in result:
             print(f"[错误] 获取分类失败: {result['error']}")
@@ -259,5 +959,8 @@ def get_activity_fetcher() -> ActivityFetcher:
     return _fetcher
 
 
-# 导出便捷实例
-activity_fetcher = get_activity_fetcher()
+def __getattr__(name: str):
+    """按需创建便捷实例 activity_fetcher（导入模块时不读取 Cookie 文件）"""
+    if name == 'activity_fetcher':
+        return get_activity_fetcher()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,202 @@
+"""浏览器守护进程模块 - 常驻 Chromium，CLI 命令通过 CDP 连接复用
+
+首次使用时以 --remote-debugging-port 启动一个独立的 Chromium 进程（使用持久化的
+user_data_dir 保存登录态），进程信息写入状态文件；后续命令直接 connect_over_cdp，
+跳过浏览器冷启动和重新登录。
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from .config import config
+from .readiness import wait_until
+
+# 默认守护进程配置，可通过 playwright.daemon 覆盖
+DEFAULT_DAEMON_SETTINGS = {
+    "enabled": False,                            # 是否使用常驻浏览器
+    "port": 9222,                                # 远程调试端口（仅监听 127.0.0.1）
+    "state_file": "data/browser_daemon.json",    # 守护进程状态文件
+    "startup_timeout": 15000,                    # 启动等待超时(ms)
+}
+
+
+def daemon_settings() -> Dict:
+    """获取守护进程配置（与默认配置合并）"""
+    return {**DEFAULT_DAEMON_SETTINGS, **(config.playwright.get('daemon') or {})}
+
+
+def _read_state() -> Optional[Dict]:
+    """读取守护进程状态文件"""
+    state_file = Path(daemon_settings()['state_file'])
+    if not state_file.exists():
+        return None
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_state(state: Dict):
+    """写入守护进程状态文件"""
+    state_file = Path(daemon_settings()['state_file'])
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(state_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+
+
+def _remove_state():
+    """删除守护进程状态文件"""
+    state_file = Path(daemon_settings()['state_file'])
+    if state_file.exists():
+        state_file.unlink()
+
+
+def _probe(endpoint: str) -> bool:
+    """检查 CDP 端点是否可用（同步命令使用）"""
+    try:
+        response = httpx.get(f"{endpoint}/json/version", timeout=1.0)
+        return response.status_code == 200
+    except httpx.HTTPError:
+        return False
+
+
+async def _probe_async(endpoint: str) -> bool:
+    """检查 CDP 端点是否可用（不阻塞事件循环）"""
+    try:
+        async with httpx.AsyncClient(timeout=1.0) as client:
+            response = await client.get(f"{endpoint}/json/version")
+        return response.status_code == 200
+    except httpx.HTTPError:
+        return False
+
+
+def _is_daemon_process(state: Dict) -> bool:
+    """检查状态文件中的 PID 是否仍是守护进程（避免 PID 被复用后误杀其他进程）
+
+    有 /proc 时比对进程命令行中的 --user-data-dir；否则以 CDP 端点可用为准。
+    """
+    proc = Path('/proc')
+    if proc.is_dir():
+        try:
+            args = (proc / str(state['pid']) / 'cmdline').read_bytes().split(b'\0')
+        except OSError:
+            return False
+        return f"--user-data-dir={state['user_data_dir']}".encode() in args
+    return _probe(state['endpoint'])
+
+
+def daemon_status() -> Optional[Dict]:
+    """获取正在运行的守护进程信息
+
+    Returns:
+        Optional[Dict]: {pid, endpoint, user_data_dir}，未运行返回 None
+    """
+    state = _read_state()
+    if not state:
+        return None
+    if not _probe(state['endpoint']):
+        # 进程已退出，清理过期状态
+        _remove_state()
+        return None
+    return state
+
+
+async def daemon_status_async() -> Optional[Dict]:
+    """daemon_status 的异步版本（供启动流程使用）"""
+    state = _read_state()
+    if not state:
+        return None
+    if not await _probe_async(state['endpoint']):
+        _remove_state()
+        return None
+    return state
+
+
+async def start_daemon(playwright, args: List[str]) -> str:
+    """启动常驻 Chromium（已在运行则直接返回）
+
+    Args:
+        playwright: 已启动的 Playwright 实例（用于定位 Chromium 可执行文件）
+        args: 额外的浏览器启动参数
+
+    Returns:
+        str: CDP 端点地址
+    """
+    state = await daemon_status_async()
+    if state:
+        return state['endpoint']
+
+    settings = daemon_settings()
+    port = int(settings['port'])
+    endpoint = f"http://127.0.0.1:{port}"
+    user_data_dir = Path(config.playwright.get('user_data_dir', 'data/user_data')).resolve()
+    user_data_dir.mkdir(parents=True, exist_ok=True)
+
+    command = [
+        playwright.chromium.executable_path,
+        f'--remote-debugging-port={port}',
+        '--remote-debugging-address=127.0.0.1',
+        f'--user-data-dir={user_data_dir}',
+        '--no-first-run',
+        '--no-default-browser-check',
+        *args,
+    ]
+    if config.playwright.get('headless', False):
+        command.append('--headless=new')
+    command.append('about:blank')
+
+    # 与当前进程脱离，CLI 退出后浏览器继续运行
+    if sys.platform == 'win32':
+        detach = {'creationflags': subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        detach = {'start_new_session': True}
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        **detach
+    )
+
+    async def ready() -> bool:
+        return await _probe_async(endpoint)
+
+    if not await wait_until(ready, settings['startup_timeout'], interval=0.1):
+        process.kill()
+        raise RuntimeError(f"常驻浏览器启动超时（端口 {port}）")
+
+    _write_state({
+        'pid': process.pid,
+        'endpoint': endpoint,
+        'user_data_dir': str(user_data_dir),
+    })
+    print(f"[OK] 已启动常驻浏览器 (PID {process.pid}, {endpoint})")
+    return endpoint
+
+
+def stop_daemon() -> bool:
+    """停止常驻 Chromium
+
+    Returns:
+        bool: 是否停止了正在运行的守护进程
+    """
+    state = _read_state()
+    _remove_state()
+    if not state:
+        return False
+    if not _is_daemon_process(state):
+        # 进程已退出（PID 可能已被其他进程复用），只清理状态文件
+        return False
+    try:
+        os.kill(state['pid'], signal.SIGTERM)
+        return True
+    except OSError:
+        return False
@@ -15,6 +15,12 @@ DEFAULT_CONFIG = {
         "headless": True,           # 是否无头模式
         "user_data_dir": "data/user_data",  # 用户数据目录
         "cookies_file": "data/cookies.json",     # Cookie保存路径
+        "page_pool_size": 3,        # 页面池大小（并发页面数）
+        "wait_timeouts": {},        # 各步骤就绪等待超时(ms)，见 readiness.DEFAULT_WAIT_TIMEOUTS
+        "block_requests": {},       # 请求过滤规则，见 request_filter.DEFAULT_BLOCK_RULES
+        "daemon": {},               # 常驻浏览器配置，见 browser_daemon.DEFAULT_DAEMON_SETTINGS
+        "http_fast_path": True,     # 文章详情优先通过 HTTP 获取，失败再用浏览器
+        "http_max_connections": 10, # HTTP 快速通道连接池大小
     },
 
     # 行为配置
@@ -23,6 +29,8 @@ DEFAULT_CONFIG = {
         "max_comments_per_run": 5,    # 每次最多评论数
         "min_read_count": 1000,       # 最低阅读量阈值
         "comment_interval": 30,       # 评论间隔(秒)
+        "hot_news_mode": "dom",       # 热点获取方式: dom=解析页面链接, network=拦截信息流接口
+        "feed_max_scrolls": 5,        # network 模式下最多滚动加载的页数
     },
 
     # 评论风格
@@ -37,7 +45,13 @@ DEFAULT_CONFIG = {
         "cookies": "",  # 从浏览器复制的Cookie字符串
     },
 
-    # 存储配置
+    # 活动接口 HTTP 配置，见 activity_fetcher.DEFAULT_FETCHER_SETTINGS
+    "activity_fetcher": {},
+
+    # 请求限流配置（活动接口、HTTP 快速通道、浏览器导航共用），见 rate_limiter.DEFAULT_RATE_LIMIT
+    "rate_limit": {},
+
+    # 存储配置（连接参数默认值见 storage.DEFAULT_STORAGE_SETTINGS）
     "storage": {
         "db_file": "data/comments.db",  # SQLite数据库路径
     },
@@ -48,6 +62,12 @@ DEFAULT_CONFIG = {
         "timeout": 60,                           # 请求超时时间(秒)
         "enabled": True,                         # 是否启用 MCP 功能
     },
+
+    # 耗时追踪（也可通过环境变量 TOUTIAO_TRACE=1 临时启用）
+    "tracing": {
+        "enabled": False,              # 是否记录 span 耗时
+        "dir": "data/traces",          # trace 文件目录
+    },
 }
 
 
@@ -112,10 +132,22 @@ class Config:
     def storage(self):
         return self.config['storage']
 
+    @property
+    def activity_fetcher(self):
+        return self.config['activity_fetcher']
+
+    @property
+    def rate_limit(self):
+        return self.config['rate_limit']
+
     @property
     def mcp(self):
         return self.config['mcp']
 
+    @property
+    def tracing(self):
+        return self.config['tracing']
+
     def get_toutiao_credentials(self) -> tuple[Optional[str], Optional[str]]:
         """获取头条账号凭据（从环境变量）"""
         username = os.getenv('TOUTIAO_USERNAME')
@@ -0,0 +1,270 @@
+"""Cookie 共享模块 - 浏览器上下文与 HTTP 客户端共用的进程内 Cookie 存储
+
+Cookie 文件（storage_state 格式）只在首次使用时读取一次，之后以内存中的 CookieJar
+为准：浏览器上下文从中初始化并把新 Cookie 同步回来，HTTP 客户端在每次请求时按
+域名/路径取预先拼好的 Cookie 头。内容有变化时才写回文件；其他进程改写了文件
+（如另一个命令重新登录）时按修改时间自动重新加载。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .config import config
+
+# 检查 Cookie 文件是否被其他进程修改的最小间隔（秒）
+_RELOAD_CHECK_INTERVAL = 2.0
+
+CookieKey = Tuple[str, str, str]  # (name, domain, path)
+
+# 标识登录账号和会话的 Cookie（重新登录或切换账号后值会改变）
+SESSION_COOKIE_NAMES = frozenset({'sessionid', 'sid_tt', 'uid_tt'})
+
+
+def _cookie_key(cookie: Dict) -> CookieKey:
+    """Cookie 的唯一键"""
+    return cookie['name'], cookie.get('domain', ''), cookie.get('path') or '/'
+
+
+def _domain_matches(host: str, domain: str) -> bool:
+    """判断请求主机是否匹配 Cookie 域名（以 . 开头的域名匹配所有子域）"""
+    if not domain:
+        return False
+    if domain.startswith('.'):
+        return host == domain[1:] or host.endswith(domain)
+    return host == domain
+
+
+def _path_matches(request_path: str, cookie_path: str) -> bool:
+    """判断请求路径是否匹配 Cookie 路径"""
+    if not cookie_path or cookie_path == '/':
+        return True
+    return request_path == cookie_path or request_path.startswith(cookie_path.rstrip('/') + '/')
+
+
+class CookieJar:
+    """进程内共享的 Cookie 存储"""
+
+    def __init__(self, path: str):
+        """初始化 Cookie 存储（文件在首次使用时读取）
+
+        Args:
+            path: Cookie 文件路径（Playwright storage_state 格式）
+        """
+        self.path = Path(path)
+        self._cookies: Dict[CookieKey, Dict] = {}
+        self._origins: List[Dict] = []
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._dirty = False
+        self.version = 0  # 每次 Cookie 变化递增，用于判断缓存是否失效
+        # (secure, host[, path]) -> (Cookie 头, 最早过期时间)
+        self._header_cache: Dict[Tuple, Tuple[str, float]] = {}
+        self._path_scoped = False  # 是否存在非根路径的 Cookie
+
+    # ============ 文件读写 ============
+
+    def _file_mtime(self) -> Optional[float]:
+        """Cookie 文件修改时间，文件不存在返回 None"""
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
+
+    def _load_file(self):
+        """从文件加载（调用方持有锁）"""
+        self._mtime = self._file_mtime()
+        cookies, origins = [], []
+        if self._mtime is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[警告] 读取 Cookie 文件失败: {e}")
+                data = {}
+            # 兼容 storage_state 和纯 Cookie 列表两种格式
+            if isinstance(data, dict):
+                cookies = data.get('cookies', [])
+                origins = data.get('origins', [])
+            elif isinstance(data, list):
+                cookies = data
+        self._cookies = {_cookie_key(c): c for c in cookies if c.get('name')}
+        self._origins = origins
+        self._dirty = False
+        self._changed()
+
+    def _ensure_loaded(self):
+        """首次使用时加载文件；之后定期检查文件是否被其他进程修改（调用方持有锁）"""
+        if not self._loaded:
+            self._load_file()
+            self._loaded = True
+            self._last_check = time.monotonic()
+            return
+
+        now = time.monotonic()
+        if now - self._last_check < _RELOAD_CHECK_INTERVAL:
+            return
+        self._last_check = now
+        mtime = self._file_mtime()
+        if mtime is not None and mtime != self._mtime and not self._dirty:
+            self._load_file()
+
+    def save(self) -> bool:
+        """有变化时写回文件（先写临时文件再替换）
+
+        Returns:
+            bool: 是否写入了文件
+        """
+        with self._lock:
+            if not self._dirty:
+                return False
+            state = self.storage_state()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._mtime = self._file_mtime()
+            self._dirty = False
+            return True
+
+    # ============ 读取 ============
+
+    def storage_state(self) -> Dict:
+        """导出 storage_state（可直接传给 browser.new_context）"""
+        with self._lock:
+            self._ensure_loaded()
+            return {'cookies': list(self._cookies.values()), 'origins': list(self._origins)}
+
+    def cookies(self, url: Optional[str] = None) -> List[Dict]:
+        """获取未过期的 Cookie
+
+        Args:
+            url: 只返回发往该 URL 时会携带的 Cookie，None 表示全部
+
+        Returns:
+            List[Dict]: Cookie 列表（Playwright 格式）
+        """
+        with self._lock:
+            self._ensure_loaded()
+            now = time.time()
+            cookies = [c for c in self._cookies.values() if not self._expired(c, now)]
+        if url is None:
+            return cookies
+
+        parts = urlsplit(url)
+        host = parts.hostname or ''
+        secure = parts.scheme == 'https'
+        return [
+            c for c in cookies
+            if _domain_matches(host, c.get('domain', ''))
+            and _path_matches(parts.path or '/', c.get('path') or '/')
+            and (secure or not c.get('secure'))
+        ]
+
+    def header(self, url: str) -> str:
+        """获取发往 URL 的 Cookie 请求头（按主机缓存，Cookie 变化或过期时重新计算）
+
+        Args:
+            url: 请求 URL
+
+        Returns:
+            str: Cookie 头，无匹配 Cookie 时为空字符串
+        """
+        parts = urlsplit(url)
+        with self._lock:
+            self._ensure_loaded()
+            key: Tuple = (parts.scheme == 'https', parts.hostname or '')
+            if self._path_scoped:
+                key += (parts.path or '/',)
+            cached = self._header_cache.get(key)
+            if cached is not None and time.time() < cached[1]:
+                return cached[0]
+
+            cookies = self.cookies(url)
+            value = '; '.join(f"{c['name']}={c['value']}" for c in cookies)
+            expires = [c['expires'] for c in cookies if (c.get('expires') or -1) > 0]
+            self._header_cache[key] = (value, min(expires) if expires else float('inf'))
+            return value
+
+    def identity(self, url: str) -> str:
+        """发往 URL 的登录态标识（登录 Cookie 值的摘要），用于区分不同账号/会话的缓存
+
+        Args:
+            url: 请求 URL
+
+        Returns:
+            str: 摘要，未登录时为空字符串
+        """
+        values = sorted(
+            f"{c['name']}={c['value']}" for c in self.cookies(url) if c['name'] in SESSION_COOKIE_NAMES
+        )
+        if not values:
+            return ''
+        return hashlib.sha1('; '.join(values).encode('utf-8')).hexdigest()[:16]
+
+    async def apply_header(self, request):
+        """httpx.AsyncClient 的 request 事件钩子：按请求 URL 设置 Cookie 头
+
+        客户端长期存活时，每个请求都使用 Cookie 存储中的最新值。
+        """
+        header = self.header(str(request.url))
+        if header:
+            request.headers['Cookie'] = header
+
+    @staticmethod
+    def _expired(cookie: Dict, now: float) -> bool:
+        """Cookie 是否已过期（expires 为 -1 或缺失表示会话 Cookie）"""
+        expires = cookie.get('expires')
+        return expires is not None and expires > 0 and expires <= now
+
+    # ============ 写入 ============
+
+    def _changed(self):
+        """Cookie 变化后使缓存失效（调用方持有锁）"""
+        self.version += 1
+        self._header_cache.clear()
+        self._path_scoped = any((c.get('path') or '/') != '/' for c in self._cookies.values())
+
+    def replace(self, cookies: Iterable[Dict], origins: Optional[List[Dict]] = None) -> bool:
+        """用给定 Cookie 替换全部内容（如浏览器上下文的最新状态、重新导入的 Cookie 字符串）
+
+        不在 cookies 中的 Cookie（如浏览器已删除或过期的 sessionid）会被移除。
+
+        Args:
+            cookies: Cookie 列表（Playwright 格式）
+            origins: storage_state 中的 origins（localStorage），None 表示清空
+
+        Returns:
+            bool: 内容是否有变化
+        """
+        with self._lock:
+            self._ensure_loaded()
+            new_cookies = {_cookie_key(c): c for c in cookies if c.get('name')}
+            new_origins = origins or []
+            if new_cookies == self._cookies and new_origins == self._origins:
+                return False
+            self._cookies = new_cookies
+            self._origins = new_origins
+            self._dirty = True
+            self._changed()
+            return True
+
+
+# 全局单例
+_jar: Optional[CookieJar] = None
+
+
+def get_cookie_jar() -> CookieJar:
+    """获取共享 Cookie 存储单例（路径取 playwright.cookies_file）"""
+    global _jar
+    if _jar is None:
+        _jar = CookieJar(config.playwright.get('cookies_file', 'data/cookies.json'))
+    return _jar
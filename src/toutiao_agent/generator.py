@@ -66,4 +66,19 @@ class CommentGenerator:
 
 
 # 全局实例
-generator = CommentGenerator()
+_generator: Optional[CommentGenerator] = None
+
+
+def get_generator() -> CommentGenerator:
+    """获取评论生成器单例"""
+    global _generator
+    if _generator is None:
+        _generator = CommentGenerator()
+    return _generator
+
+
+def __getattr__(name: str):
+    """按需创建全局实例 generator（导入模块时不读取提示词文件）"""
+    if name == 'generator':
+        return get_generator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,206 @@
+// 页面辅助函数库 - 通过 context.add_init_script 每个上下文注册一次，
+// Python 侧用 page_helpers.call_helper(page, name, *args) 按名调用，参数经序列化传入。
+(() => {
+    if (window.__toutiaoAgent) {
+        return;
+    }
+
+    const isVisible = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+
+    const helpers = {
+        // 提取信息流文章：[{title, article_id, url}]，按 article_id 去重
+        extractFeed(selectors, maxItems) {
+            const items = [];
+            const seen = new Set();
+            const idPattern = /\/(group|article)\/(\d+)\//;
+            for (const selector of selectors) {
+                for (const link of document.querySelectorAll(selector)) {
+                    const url = link.getAttribute('href') || '';
+                    const match = url.match(idPattern);
+                    if (!match || seen.has(match[2])) continue;
+                    const titleEl = link.querySelector('.title, h1, h2, h3');
+                    const title = ((titleEl || link).textContent || '').trim();
+                    if (title.length <= 5) continue;
+                    seen.add(match[2]);
+                    items.push({ title: title.substring(0, 100), article_id: match[2], url });
+                    if (items.length >= maxItems) return items;
+                }
+            }
+            return items;
+        },
+
+        // 向第一个可见的输入框填值并触发 input/blur 事件
+        fillFirstVisible(selectors, value) {
+            for (const selector of selectors) {
+                const input = document.querySelector(selector);
+                if (input && input.offsetParent !== null) {
+                    input.value = value;
+                    input.dispatchEvent(new Event('input', { bubbles: true }));
+                    input.dispatchEvent(new Event('blur', { bubbles: true }));
+                    return { filled: true, selector };
+                }
+            }
+            return { filled: false };
+        },
+
+        // 在创作者中心点击指定活动的卡片
+        clickActivityCard(activityId) {
+            // 方法1: 通过活动ID精确匹配href
+            const allLinks = Array.from(document.querySelectorAll('a[href*="activity"]'));
+            for (const link of allLinks) {
+                const href = link.getAttribute('href') || '';
+                if (href.includes('id=' + activityId) || href.includes('activity/' + activityId)) {
+                    link.scrollIntoView({ behavior: 'smooth', block: 'center' });
+                    if (isVisible(link)) {
+                        link.click();
+                        return { clicked: true, method: 'exact_match', href };
+                    }
+                }
+            }
+
+            // 方法2: 通过 data 属性匹配活动卡片
+            const activityCards = Array.from(document.querySelectorAll('[data-activity-id], [class*="activity-card"], [class*="ActivityCard"]'));
+            for (const card of activityCards) {
+                if (card.getAttribute('data-activity-id') === activityId) {
+                    const link = card.querySelector('a[href*="activity"]');
+                    if (link) {
+                        link.scrollIntoView({ behavior: 'smooth', block: 'center' });
+                        link.click();
+                        return { clicked: true, method: 'data_attribute', href: link.getAttribute('href') };
+                    }
+                }
+            }
+
+            // 方法3: 从URL参数中提取活动ID匹配
+            for (const link of allLinks) {
+                const href = link.getAttribute('href') || '';
+                const idMatch = href.match(/id=([^&]+)/);
+                if (idMatch && idMatch[1] === activityId) {
+                    link.scrollIntoView({ behavior: 'smooth', block: 'center' });
+                    link.click();
+                    return { clicked: true, method: 'url_param_match', href };
+                }
+            }
+
+            return { clicked: false, method: 'not_found' };
+        },
+
+        // 列出页面上所有可输入元素（contenteditable/textarea/文本框）及其位置
+        collectInputs() {
+            const results = [];
+            const describe = (el, type, idx) => {
+                const rect = el.getBoundingClientRect();
+                return {
+                    type,
+                    index: idx,
+                    visible: rect.width > 0 && rect.height > 0,
+                    inViewport: rect.top >= 0 && rect.top <= window.innerHeight,
+                    width: rect.width,
+                    height: rect.height,
+                    top: rect.top,
+                    tag: el.tagName,
+                    className: el.className,
+                    id: el.id,
+                    placeholder: el.getAttribute('placeholder') || ''
+                };
+            };
+            document.querySelectorAll('[contenteditable="true"]').forEach((el, idx) => {
+                const computed = window.getComputedStyle(el);
+                results.push({
+                    ...describe(el, 'contenteditable', idx),
+                    display: computed.display,
+                    visibility: computed.visibility,
+                    textContent: el.textContent?.substring(0, 20) || ''
+                });
+            });
+            document.querySelectorAll('textarea').forEach((el, idx) => {
+                results.push(describe(el, 'textarea', idx));
+            });
+            document.querySelectorAll('input[type="text"], input:not([type])').forEach((el, idx) => {
+                results.push(describe(el, 'input', idx));
+            });
+            return results;
+        },
+
+        // 查找文本包含任一关键词的按钮
+        findButtons(selector, keywords) {
+            const results = [];
+            for (const btn of document.querySelectorAll(selector)) {
+                const text = btn.textContent?.trim() || '';
+                if (keywords.some(kw => text.includes(kw))) {
+                    results.push({ text, visible: isVisible(btn), className: btn.className, id: btn.id });
+                }
+            }
+            return results;
+        },
+
+        // 检查发布结果：成功/错误提示、输入框是否清空
+        checkPublishResult() {
+            const successEl = document.querySelector('.toast-success, .success-message, [class*="success"]');
+            const errorEl = document.querySelector('.toast-error, .error-message, [class*="error"]');
+            const inputs = document.querySelectorAll('[contenteditable="true"], textarea');
+            const isEmpty = Array.from(inputs).every(input => !input.textContent || input.textContent.trim() === '');
+            return {
+                hasSuccess: !!successEl,
+                hasError: !!errorEl,
+                inputCleared: isEmpty,
+                successText: successEl ? successEl.textContent : '',
+                errorText: errorEl ? errorEl.textContent : ''
+            };
+        },
+
+        // 获取页面上的错误提示文本
+        errorText() {
+            const errorEl = document.querySelector('.error-message, .toast-error, [class*="error"]');
+            return errorEl ? errorEl.textContent : '';
+        },
+
+        // 分析活动页面元素（输入框、发布按钮、活动卡片等）
+        analyzeActivityPage() {
+            const results = {
+                hasInput: false,
+                hasTextarea: false,
+                hasPublishButton: false,
+                hasActivityCard: false,
+                inputTypes: [],
+                buttonTexts: [],
+                pageTitle: '',
+                pageText: ''
+            };
+
+            const titleEl = document.querySelector('.activity-title, h1, .title');
+            if (titleEl) {
+                results.pageTitle = titleEl.textContent?.trim().substring(0, 50) || '';
+            }
+
+            const contenteditables = document.querySelectorAll('[contenteditable="true"]');
+            const textareas = document.querySelectorAll('textarea');
+            results.hasInput = contenteditables.length > 0 || textareas.length > 0;
+            // 各类输入框只记录前3个
+            for (let i = 0; i < Math.min(contenteditables.length, 3); i++) {
+                results.inputTypes.push('contenteditable');
+            }
+            for (let i = 0; i < Math.min(textareas.length, 3); i++) {
+                results.inputTypes.push('textarea');
+            }
+
+            const publishKeywords = ['发布', '发送', '提交', '确认', '立即参与'];
+            for (const btn of document.querySelectorAll('button, [role="button"]')) {
+                const text = btn.textContent?.trim() || '';
+                results.buttonTexts.push(text.substring(0, 20));
+                if (publishKeywords.some(kw => text.includes(kw))) {
+                    results.hasPublishButton = true;
+                }
+            }
+
+            results.hasActivityCard = document.querySelectorAll('a[href*="activity"]').length > 0;
+            results.pageText = document.body.innerText.substring(0, 1000);
+            return results;
+        }
+    };
+
+    Object.defineProperty(window, '__toutiaoAgent', { value: helpers, enumerable: false });
+})();
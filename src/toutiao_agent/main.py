@@ -1,11 +1,14 @@
-"""主模块 - CLI入口和业务逻辑"""
+"""主模块 - CLI入口和业务逻辑
+
+Playwright、活动抓取、存储等重量级模块均在命令内部按需导入，
+使 history/stats 等只读 SQLite 的命令快速启动（见 scripts/bench_cli_startup.py）。
+"""
 
-import asyncio
 import sys
 import click
 from collections import Counter
 from pathlib import Path
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 from .config import config
 
 # 修复 Windows 终端中文编码问题
@@ -15,42 +18,58 @@ if sys.platform == 'win32':
         sys.stderr.reconfigure(encoding='utf-8')
     except Exception:
         pass
-from .toutiao_client import get_client, close_client, ToutiaoClient
-from .generator import generator
-from .activity_fetcher import activity_fetcher, Activity
-from .activity_analyzer import ActivityAnalyzer
-from .activity_types import OperationType
+
+if TYPE_CHECKING:
+    from .toutiao_client import ToutiaoClient
+
+
+def run_async(main):
+    """运行异步命令入口（按需导入 asyncio，纯存储命令无需加载）
+
+    Args:
+        main: 无参数的协程函数
+    """
+    import asyncio
+    from .tracing import tracer
+    try:
+        return asyncio.run(main())
+    finally:
+        tracer.close()
 
 
 class ToutiaoAgent:
     """头条热点评论助手主类"""
 
     def __init__(self):
-        self.client: Optional[ToutiaoClient] = None
+        self.client: Optional['ToutiaoClient'] = None
 
     async def initialize(self):
         """初始化客户端"""
+        from .toutiao_client import get_client
         self.client = await get_client()
 
         # 确保已登录
         await self.client.ensure_login()
 
-    async def get_hot_news(self, limit: int = 20):
+    async def get_hot_news(self, limit: int = 20, mode: Optional[str] = None):
         """获取热点新闻"""
         print(f"\n正在获取热点新闻（最多{limit}条）...")
-        news_list = await self.client.get_hot_news(limit)
+        news_list = await self.client.get_hot_news(limit, mode=mode)
 
         print(f"\n获取到 {len(news_list)} 条热点新闻:\n")
 
         for i, news in enumerate(news_list[:10], 1):
             print(f"{i}. {news['title']}")
             print(f"   ID: {news['article_id']}")
+            if news.get('read_count') is not None:
+                print(f"   阅读: {news['read_count']}  评论: {news.get('comment_count', 0)}")
             print()
 
         return news_list
 
     async def generate_comment(self, title: str, abstract: str = "") -> str:
         """生成评论（返回提示词，由Claude Code处理）"""
+        from .generator import generator
         prompt = generator.generate_prompt(title, abstract)
         return prompt
 
@@ -60,7 +79,7 @@ class ToutiaoAgent:
         if result.get('success'):
             # 记录到数据库
             from .storage import storage
-            storage.add_comment(article_id, title, url, content)
+            await storage.a_add_comment(article_id, title, url, content)
             print(f"[成功] 评论成功! 文章ID: {article_id}")
         else:
             print(f"[失败] 评论失败: {result.get('error', '未知错误')}")
@@ -90,7 +109,7 @@ class ToutiaoAgent:
             from .storage import storage
             hashtags = topic or ""
             images_json = str(images) if images else None
-            storage.add_micro_headline(
+            await storage.a_add_micro_headline(
                 content=content,
                 activity_id=activity_id,
                 activity_title=activity_title,
@@ -105,6 +124,7 @@ class ToutiaoAgent:
 
     async def close(self):
         """关闭客户端"""
+        from .toutiao_client import close_client
         await close_client()
 
 
@@ -117,16 +137,18 @@ def cli():
 
 @cli.command('hot-news')
 @click.option('--limit', default=20, help='获取热点数量')
-def hot_news_cmd(limit):
+@click.option('--mode', type=click.Choice(['dom', 'network']), default=None,
+              help='获取方式: dom=解析页面链接, network=拦截信息流接口（默认读取配置）')
+def hot_news_cmd(limit, mode):
     """获取热点新闻"""
     async def run():
         agent = ToutiaoAgent()
         try:
             await agent.initialize()
-            await agent.get_hot_news(limit)
+            await agent.get_hot_news(limit, mode=mode)
         finally:
             await agent.close()
-    asyncio.run(run())
+    run_async(run)
 
 
 @cli.command()
@@ -144,13 +166,15 @@ def comment_cmd(article_id, content):
             await agent.post_comment(article_id, content)
         finally:
             await agent.close()
-    asyncio.run(run())
+    run_async(run)
 
 
 @cli.command()
 @click.option('--count', default=5, help='处理数量')
 def start_cmd(count):
     """启动自动评论流程"""
+    from .tracing import sleep as traced_sleep
+
     async def run():
         agent = ToutiaoAgent()
         try:
@@ -163,8 +187,13 @@ def start_cmd(count):
                 print("未获取到热点新闻")
                 return
 
+            # 并发预取文章正文作为提示词摘要（HTTP 快速通道并发，浏览器回退受页面池限制）
+            news_list = news_list[:count]
+            print(f"\n正在获取 {len(news_list)} 篇文章详情...")
+            details = await agent.client.get_article_details([n['article_id'] for n in news_list])
+
             # 逐个处理
-            for i, news in enumerate(news_list[:count], 1):
+            for i, (news, detail) in enumerate(zip(news_list, details), 1):
                 print(f"\n--- 处理第 {i}/{min(count, len(news_list))} 条 ---")
 
                 if config.behavior.get('confirmation_mode', True):
@@ -174,7 +203,7 @@ def start_cmd(count):
                         continue
 
                 # 生成提示词
-                prompt = await agent.generate_comment(news['title'])
+                prompt = await agent.generate_comment(news['title'], detail.get('content', ''))
 
                 if config.behavior.get('confirmation_mode', True):
                     print("\n提示词:")
@@ -199,7 +228,7 @@ def start_cmd(count):
                     if i < count:
                         interval = config.behavior.get('comment_interval', 30)
                         print(f"\n等待 {interval} 秒后继续...")
-                        await asyncio.sleep(interval)
+                        await traced_sleep(interval)
                 else:
                     # 非交互模式，只输出提示词
                     print(f"\n文章: {news['title']}")
@@ -207,7 +236,53 @@ def start_cmd(count):
 
         finally:
             await agent.close()
-    asyncio.run(run())
+    run_async(run)
+
+
+@cli.group('browser')
+def browser_cmd():
+    """常驻浏览器管理（启用 playwright.daemon.enabled 后各命令自动连接常驻浏览器）"""
+    pass
+
+
+@browser_cmd.command('start')
+def browser_start_cmd():
+    """启动常驻浏览器"""
+    from playwright.async_api import async_playwright
+    from .browser_daemon import start_daemon
+    from .toutiao_client import BROWSER_ARGS
+
+    async def run():
+        async with async_playwright() as p:
+            endpoint = await start_daemon(p, BROWSER_ARGS)
+            click.echo(f"常驻浏览器运行中: {endpoint}")
+    run_async(run)
+
+
+@browser_cmd.command('stop')
+def browser_stop_cmd():
+    """停止常驻浏览器"""
+    from .browser_daemon import stop_daemon
+
+    if stop_daemon():
+        click.echo("已停止常驻浏览器")
+    else:
+        click.echo("常驻浏览器未运行")
+
+
+@browser_cmd.command('status')
+def browser_status_cmd():
+    """查看常驻浏览器状态"""
+    from .browser_daemon import daemon_status
+
+    state = daemon_status()
+    if not state:
+        click.echo("常驻浏览器未运行")
+        return
+    click.echo(f"常驻浏览器运行中:")
+    click.echo(f"   PID: {state['pid']}")
+    click.echo(f"   端点: {state['endpoint']}")
+    click.echo(f"   用户数据目录: {state['user_data_dir']}")
 
 
 @cli.command('config-show')
@@ -286,7 +361,7 @@ def post_micro_headline_cmd(content, topic, activity_id, activity_title):
             )
         finally:
             await agent.close()
-    asyncio.run(run())
+    run_async(run)
 
 
 @cli.command('micro-headlines')
@@ -327,18 +402,37 @@ def micro_stats_cmd():
 @click.option('--limit', default=10, help='显示数量')
 @click.option('--category', default='全部', help='分类筛选')
 @click.option('--all', '-a', is_flag=True, help='显示全部活动（包括已参与和已过期）')
-def activities_cmd(limit, category, all):
+@click.option('--all-categories', '-C', is_flag=True, help='并发拉取所有分类并合并（忽略 --category）')
+@click.option('--refresh', is_flag=True, help='忽略接口缓存，重新请求')
+@click.option('--local', is_flag=True, help='从本地活动表读取（需先运行 sync-activities）')
+def activities_cmd(limit, category, all, all_categories, refresh, local):
     """查看活动列表"""
     from .storage import storage
+    from .activity_fetcher import activity_fetcher
+
+    activity_fetcher.force_refresh = refresh
 
     print(f"\n正在获取活动列表...")
 
-    activities = activity_fetcher.fetch_activities(
-        limit=limit,
-        category=category,
-        only_ongoing=not all,
-        only_unparticipated=not all
-    )
+    if local:
+        activities = activity_fetcher.load_local_activities(
+            only_ongoing=not all,
+            only_unparticipated=not all,
+            category=category,
+            limit=limit
+        )
+    elif all_categories:
+        activities = activity_fetcher.fetch_activities_by_category(
+            only_ongoing=not all,
+            only_unparticipated=not all
+        )
+    else:
+        activities = activity_fetcher.fetch_activities(
+            limit=limit,
+            category=category,
+            only_ongoing=not all,
+            only_unparticipated=not all
+        )
 
     if not activities:
         print("暂无可用活动")
@@ -346,19 +440,25 @@ def activities_cmd(limit, category, all):
 
     click.echo(f"\n[*] 找到 {len(activities)} 个活动:\n")
 
-    for i, activity in enumerate(activities[:limit], 1):
+    activities = activities[:limit]
+    statuses = storage.get_activity_statuses(str(a.activity_id) for a in activities)
+
+    for i, activity in enumerate(activities, 1):
         click.echo(f"{i}. {activity.title}")
         click.echo(f"   [简介] {activity.introduction}")
         if activity.hashtag_name:
             click.echo(f"   [话题] #{activity.hashtag_name}#")
+        if activity.categories:
+            click.echo(f"   [分类] {', '.join(activity.categories)}")
         click.echo(f"   [时间] {activity.activity_time}")
         click.echo(f"   [奖励] {activity.activity_reward}")
         click.echo(f"   [参与] {activity.activity_participants} 人参与")
 
         # 检查活动状态（已参与、已跳过、未参与）
-        if storage.is_activity_participated(str(activity.activity_id)):
+        status = statuses[str(activity.activity_id)]
+        if status['participated']:
             click.echo(f"   [状态] 已参与")
-        elif storage.is_activity_processed(str(activity.activity_id)):
+        elif status['processed']:
             # 已跳过的活动
             click.echo(f"   [状态] 已跳过")
         else:
@@ -368,11 +468,42 @@ def activities_cmd(limit, category, all):
         click.echo()
 
 
+@cli.command('sync-activities')
+@click.option('--refresh', is_flag=True, help='忽略接口缓存，重新请求')
+def sync_activities_cmd(refresh):
+    """同步活动到本地活动表，并显示新增/已参与/已结束的变化"""
+    from .activity_fetcher import activity_fetcher
+
+    activity_fetcher.force_refresh = refresh
+    print(f"\n正在同步活动列表...")
+    changes = activity_fetcher.sync_activities()
+
+    labels = [('new', '新增'), ('updated', '更新'), ('participated', '新参与'), ('ended', '已结束')]
+    click.echo(f"\n[同步] " + '，'.join(f"{label} {len(changes[key])}" for key, label in labels))
+
+    if changes['new']:
+        click.echo(f"\n新增活动:")
+        new_ids = set(changes['new'])
+        for activity in activity_fetcher.load_local_activities(only_ongoing=False, only_unparticipated=False):
+            if str(activity.activity_id) in new_ids:
+                click.echo(f"   - {activity.title} [ID] {activity.activity_id}")
+    click.echo()
+
+
 @cli.command('start-activities')
 @click.option('--count', default=5, help='参与活动数量')
-def start_activities_cmd(count):
+@click.option('--refresh', is_flag=True, help='忽略接口缓存，重新请求')
+@click.option('--local', is_flag=True, help='从本地活动表读取候选活动（需先运行 sync-activities）')
+def start_activities_cmd(count, refresh, local):
     """智能参与活动（AI分析活动类型并执行相应操作）"""
+    from .tracing import sleep as traced_sleep
     from .storage import storage
+    from .activity_fetcher import activity_fetcher
+    from .activity_analyzer import ActivityAnalyzer
+    from .activity_types import OperationType
+    from .readiness import WaitBudget, wait_for_dom_quiet
+
+    activity_fetcher.force_refresh = refresh
 
     async def run():
         agent = ToutiaoAgent()
@@ -380,29 +511,41 @@ def start_activities_cmd(count):
         try:
             await agent.initialize()
 
+            async def processed_ids(activity_ids):
+                """批量查询已处理的活动（包括已参与和已跳过的）"""
+                statuses = await storage.a_get_activity_statuses(activity_ids)
+                return {aid for aid, status in statuses.items() if status['processed']}
+
+            async def candidates():
+                """候选活动：本地活动表，或边拉取分页边产出（预取下一页与分析重叠）
+
+                已处理的活动按页批量排除。
+                """
+                if local:
+                    activities = await activity_fetcher.load_local_activities_async()
+                    exclude = await processed_ids([str(a.activity_id) for a in activities])
+                    for activity in activities:
+                        if str(activity.activity_id) not in exclude:
+                            yield activity
+                else:
+                    async for activity in activity_fetcher.iter_activities(
+                        only_ongoing=True,
+                        only_unparticipated=True,
+                        exclude=processed_ids
+                    ):
+                        yield activity
+
             # 获取活动列表
             print(f"\n正在获取活动列表...")
-            activities = activity_fetcher.fetch_activities(
-                limit=count * 2,  # 获取更多以便筛选
-                only_ongoing=True,
-                only_unparticipated=True
-            )
-
-            # 过滤已处理的活动（包括已参与和已跳过的）
-            new_activities = [
-                a for a in activities
-                if not storage.is_activity_processed(str(a.activity_id))
-            ]
-
-            if not new_activities:
-                print("暂无新的活动可参与")
-                return
-
-            click.echo(f"\n找到 {len(new_activities)} 个新活动\n")
-
-            # 逐个处理活动
-            for i, activity in enumerate(new_activities[:count], 1):
-                print(f"\n--- 处理第 {i}/{min(count, len(new_activities))} 个活动 ---")
+            stream = candidates()
+            i = 0
+
+            # 逐个处理活动（第一页到达即开始，后续分页在后台加载）
+            async for activity in stream:
+                if i >= count:
+                    break
+                i += 1
+                print(f"\n--- 处理第 {i}/{count} 个活动 ---")
                 print(f"活动: {activity.title}")
                 print(f"介绍: {activity.introduction}")
 
@@ -418,9 +561,9 @@ def start_activities_cmd(count):
                 # 构建活动 URL 并打开页面
                 activity_url = activity.href or f"https://mp.toutiao.com/profile_v3_public/public/activity/?activity_location=panel_invite_discuss_hot_mp&id={activity.activity_id}"
                 print(f"  访问活动页面: {activity_url}")
-                await agent.client.page.goto(activity_url, timeout=30000)
-                await agent.client.page.wait_for_load_state('networkidle', timeout=15000)
-                await asyncio.sleep(2)
+                budget = WaitBudget()
+                await agent.client.navigate(agent.client.page, activity_url, timeout=budget.timeout('navigation'))
+                await wait_for_dom_quiet(agent.client.page, budget)
 
                 # 使用当前页面进行分析（无需子进程调用）
                 result = await analyzer.analyze_from_page(activity, agent.client.page)
@@ -515,7 +658,7 @@ def start_activities_cmd(count):
                         )
 
                         # 只在用户确认并执行后才创建参与记录
-                        storage.add_activity_participation(
+                        await storage.a_add_activity_participation(
                             activity_id=str(activity.activity_id),
                             activity_title=activity.title,
                             operation_type=operation.value,
@@ -530,7 +673,7 @@ def start_activities_cmd(count):
                             if i < count:
                                 interval = config.behavior.get('comment_interval', 30)
                                 print(f"\n等待 {interval} 秒后继续...")
-                                await asyncio.sleep(interval)
+                                await traced_sleep(interval)
                     else:
                         # 非交互模式，只输出提示词
                         print(f"\n活动: {activity.title}")
@@ -543,7 +686,7 @@ def start_activities_cmd(count):
                     if config.behavior.get('confirmation_mode', True):
                         skip_confirm = input("\n是否记录此活动为已跳过? (y/n): ").strip().lower()
                         if skip_confirm == 'y':
-                            storage.add_activity_participation(
+                            await storage.a_add_activity_participation(
                                 activity_id=str(activity.activity_id),
                                 activity_title=activity.title,
                                 operation_type='not_implemented',
@@ -554,9 +697,14 @@ def start_activities_cmd(count):
                             )
                             print("  ✓ 已记录为已跳过")
 
+            await stream.aclose()
+            if i == 0:
+                print("暂无新的活动可参与")
+
         finally:
+            await activity_fetcher.aclose()
             await agent.close()
-    asyncio.run(run())
+    run_async(run)
 
 
 @cli.command('activity-history')
@@ -613,5 +761,37 @@ def activity_stats_cmd():
     click.echo()
 
 
+@cli.command('profile')
+@click.argument('trace_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--top', default=20, help='显示的操作数量')
+def profile_cmd(trace_file, top):
+    """分析耗时追踪文件（按操作统计分位耗时和关键路径）"""
+    from .tracing import load_spans, summarize, critical_path
+
+    spans = load_spans(trace_file)
+    if not spans:
+        click.echo("追踪文件为空")
+        return
+
+    wall_ms = (max(s['end'] for s in spans) - min(s['start'] for s in spans)) * 1000
+    click.echo(f"\n[统计] {len(spans)} 个 span，总墙钟耗时 {wall_ms:.0f} ms\n")
+
+    click.echo(f"   {'操作':<32} {'次数':>6} {'总耗时':>10} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for row in summarize(spans)[:top]:
+        click.echo(
+            f"   {row['name']:<32} {row['count']:>6} {row['total_ms']:>8.0f}ms "
+            f"{row['p50']:>7.1f}ms {row['p95']:>7.1f}ms {row['p99']:>7.1f}ms"
+        )
+
+    breakdown = critical_path(spans)
+    path_total = sum(breakdown.values())
+    if path_total <= 0:
+        return
+    click.echo(f"\n[关键路径] 共 {path_total:.0f} ms:\n")
+    for name, ms in sorted(breakdown.items(), key=lambda item: item[1], reverse=True)[:top]:
+        click.echo(f"   {name:<40} {ms:>8.0f}ms {ms / path_total * 100:>5.1f}%")
+    click.echo()
+
+
 if __name__ == '__main__':
     cli()
@@ -0,0 +1,69 @@
+"""页面辅助函数模块 - 预加载 JS 辅助函数库并按名调用
+
+辅助函数定义在 js/page_helpers.js 中，每个浏览器上下文通过 add_init_script 注册一次，
+调用时只传函数名和参数，避免每次发送大段脚本，也避免把参数拼接进脚本字符串。
+"""
+
+from functools import lru_cache
+from pathlib import Path
+
+from .tracing import tracer
+
+HELPERS_FILE = Path(__file__).parent / 'js' / 'page_helpers.js'
+
+# 调用辅助函数；辅助库未注册（如注册前已打开的页面）时返回 missing
+_CALL_JS = '''([name, args]) => {
+    const helpers = window.__toutiaoAgent;
+    if (!helpers) {
+        return { missing: true };
+    }
+    return { value: helpers[name](...args) };
+}'''
+
+
+@lru_cache(maxsize=1)
+def helpers_source() -> str:
+    """读取辅助函数库源码"""
+    return HELPERS_FILE.read_text(encoding='utf-8')
+
+
+async def install_helpers(context):
+    """在浏览器上下文中注册辅助函数库（对之后加载的所有页面生效）
+
+    Args:
+        context: Playwright BrowserContext
+    """
+    await context.add_init_script(script=helpers_source())
+
+
+async def call_helper(page, name: str, *args):
+    """调用页面中的辅助函数
+
+    Args:
+        page: Playwright 页面
+        name: 辅助函数名（见 js/page_helpers.js）
+        *args: 传给辅助函数的参数（需可 JSON 序列化）
+
+    Returns:
+        辅助函数返回值
+    """
+    with tracer.span(f'evaluate.{name}'):
+        result = await page.evaluate(_CALL_JS, [name, list(args)])
+        if result.get('missing'):
+            # 页面在注册前已加载，补充注入一次
+            await page.evaluate(helpers_source())
+            result = await page.evaluate(_CALL_JS, [name, list(args)])
+    return result.get('value')
+
+
+async def evaluate(page, expression: str, arg=None, label: str = 'inline'):
+    """执行一段内联脚本（记录 evaluate span）
+
+    Args:
+        page: Playwright 页面或元素
+        expression: JS 表达式或函数
+        arg: 传给 JS 函数的参数
+        label: span 名后缀
+    """
+    with tracer.span(f'evaluate.{label}'):
+        return await page.evaluate(expression, arg)
@@ -0,0 +1,156 @@
+"""自适应限流模块 - 统一控制发往 mp.toutiao.com 的请求速率
+
+每个受限主机一个令牌桶（GCRA 实现，允许 burst 个请求突发），速率按 AIMD 调整：
+请求成功时加性增加，遇到 HTTP 429、接口返回非零 code 或超时时乘性降低。
+活动接口、HTTP 快速通道和浏览器导航共用同一个限流器。
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .config import config
+from .tracing import tracer
+
+# 默认限流配置，可通过 rate_limit 配置段覆盖
+DEFAULT_RATE_LIMIT = {
+    "enabled": True,
+    "hosts": ["mp.toutiao.com"],  # 受限主机
+    "rate": 5.0,                  # 初始速率(请求/秒)
+    "min_rate": 0.5,              # 最低速率
+    "max_rate": 20.0,             # 最高速率
+    "burst": 5,                   # 允许的突发请求数
+    "increase": 0.2,              # 每次成功增加的速率
+    "decrease": 0.5,              # 受限时速率乘以该系数
+    "cooldown": 1.0,              # 两次降速的最小间隔(秒)，避免并发失败连续降速
+}
+
+
+class AdaptiveRateLimiter:
+    """AIMD 自适应令牌桶"""
+
+    def __init__(
+        self,
+        rate: float,
+        min_rate: float,
+        max_rate: float,
+        burst: int,
+        increase: float,
+        decrease: float,
+        cooldown: float,
+        name: str = ''
+    ):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = max(1, int(burst))
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.name = name
+        # 使用线程锁：同步包装每次调用都会新建事件循环，后台刷新线程也会使用限流器
+        self._lock = threading.Lock()
+        self._tat = 0.0  # GCRA 理论到达时间
+        self._last_decrease = 0.0
+
+    def _reserve(self) -> Tuple[float, float]:
+        """预约一个令牌
+
+        Returns:
+            Tuple[float, float]: (需要等待的秒数, 本次预约占用的发射间隔)
+        """
+        with self._lock:
+            now = time.monotonic()
+            interval = 1.0 / self.rate
+            tat = max(self._tat, now)
+            delay = max(0.0, tat - now - (self.burst - 1) * interval)
+            self._tat = tat + interval
+            return delay, interval
+
+    def _cancel(self, interval: float):
+        """归还未使用的预约，避免被取消的等待者推迟后续请求"""
+        with self._lock:
+            self._tat -= interval
+
+    async def acquire(self):
+        """等待直到可以发送请求（等待中被取消时归还预约）"""
+        delay, interval = self._reserve()
+        if delay > 0:
+            with tracer.span('ratelimit.wait', host=self.name, seconds=round(delay, 3)):
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    self._cancel(interval)
+                    raise
+
+    def acquire_blocking(self):
+        """同步等待直到可以发送请求（用于后台线程）"""
+        delay, _ = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_success(self):
+        """请求成功：加性提速"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, reason: str = ''):
+        """请求受限（429/非零 code/超时）：乘性降速，冷却期内只降一次
+
+        Args:
+            reason: 降速原因
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            # 已预约的请求顺延，使新的速率立即生效
+            self._tat = max(self._tat, now + 1.0 / self.rate)
+            rate = self.rate
+        print(f"[限流] {self.name} 请求受限（{reason}），速率降至 {rate:.1f} 次/秒")
+
+
+# 按主机共享的限流器
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def rate_limit_settings() -> Dict:
+    """获取限流配置（与默认配置合并）"""
+    return {**DEFAULT_RATE_LIMIT, **(config.get('rate_limit') or {})}
+
+
+def get_rate_limiter(url: str) -> Optional[AdaptiveRateLimiter]:
+    """获取 URL 所在主机的共享限流器
+
+    Args:
+        url: 请求或导航 URL
+
+    Returns:
+        Optional[AdaptiveRateLimiter]: 主机不受限或未启用限流时返回 None
+    """
+    host = urlsplit(url).hostname or ''
+    limiter = _limiters.get(host)
+    if limiter is not None:
+        return limiter
+
+    settings = rate_limit_settings()
+    if not settings['enabled'] or host not in settings['hosts']:
+        return None
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = AdaptiveRateLimiter(
+                rate=float(settings['rate']),
+                min_rate=float(settings['min_rate']),
+                max_rate=float(settings['max_rate']),
+                burst=settings['burst'],
+                increase=float(settings['increase']),
+                decrease=float(settings['decrease']),
+                cooldown=float(settings['cooldown']),
+                name=host
+            )
+        return _limiters[host]
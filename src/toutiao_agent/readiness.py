@@ -0,0 +1,175 @@
+"""页面就绪等待模块 - 用事件驱动的等待条件替代固定 sleep
+
+每个等待步骤都有独立的超时预算（毫秒），超时返回 False 而不是抛异常，
+由调用方决定是降级继续还是失败返回。
+"""
+
+import asyncio
+from typing import Awaitable, Callable
+
+from playwright.async_api import Page
+
+from .config import config
+from .tracing import traced
+
+# 各步骤默认超时（毫秒），可通过 playwright.wait_timeouts 覆盖
+DEFAULT_WAIT_TIMEOUTS = {
+    "navigation": 30000,      # 页面导航
+    "selector": 10000,        # 等待元素出现
+    "response": 10000,        # 等待网络响应
+    "dom_quiet": 5000,        # 等待 DOM 稳定的最长时间
+    "quiet_window": 500,      # DOM 无变化多久视为稳定
+    "publish_result": 10000,  # 等待发布/评论结果
+    "login": 10000,           # 等待登录 Cookie 写入
+}
+
+# 监听 DOM 变化，在 quietMs 内无变化时返回 true，超过 timeoutMs 返回 false
+_DOM_QUIET_JS = '''([quietMs, timeoutMs]) => new Promise(resolve => {
+    let quietTimer = null;
+    let hardTimer = null;
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => done(true), quietMs);
+    });
+    const done = (value) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(hardTimer);
+        resolve(value);
+    };
+    observer.observe(document, { childList: true, subtree: true, attributes: true, characterData: true });
+    quietTimer = setTimeout(() => done(true), quietMs);
+    hardTimer = setTimeout(() => done(false), timeoutMs);
+})'''
+
+
+class WaitBudget:
+    """单次操作的等待预算（每个步骤取配置的步骤超时）"""
+
+    def __init__(self):
+        """初始化等待预算（读取 playwright.wait_timeouts 覆盖默认值）"""
+        self.timeouts = {**DEFAULT_WAIT_TIMEOUTS, **(config.playwright.get('wait_timeouts') or {})}
+
+    def timeout(self, step: str) -> int:
+        """获取某个步骤的超时（毫秒）
+
+        Args:
+            step: 步骤名，见 DEFAULT_WAIT_TIMEOUTS
+
+        Returns:
+            int: 本步骤的超时
+        """
+        return int(self.timeouts.get(step, self.timeouts['selector']))
+
+
+@traced('wait.selector')
+async def wait_for_selector(
+    page: Page,
+    selector: str,
+    timeout: int,
+    state: str = "visible"
+) -> bool:
+    """等待元素达到指定状态
+
+    Args:
+        page: Playwright 页面
+        selector: CSS 选择器
+        timeout: 超时（毫秒）
+        state: attached/visible/hidden/detached
+
+    Returns:
+        bool: 是否在超时前就绪
+    """
+    try:
+        await page.wait_for_selector(selector, state=state, timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+
+@traced('wait.function')
+async def wait_for_function(page: Page, expression: str, timeout: int, arg=None) -> bool:
+    """等待页面内 JS 条件成立
+
+    Args:
+        page: Playwright 页面
+        expression: 返回真值即视为就绪的 JS 函数
+        timeout: 超时（毫秒）
+        arg: 传给 JS 函数的参数
+
+    Returns:
+        bool: 是否在超时前成立
+    """
+    try:
+        await page.wait_for_function(expression, arg=arg, timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+
+@traced('wait.url')
+async def wait_for_url(page: Page, predicate: Callable[[str], bool], timeout: int) -> bool:
+    """等待页面 URL 满足条件
+
+    Args:
+        page: Playwright 页面
+        predicate: 接收 URL 字符串的判断函数
+        timeout: 超时（毫秒）
+
+    Returns:
+        bool: 是否在超时前满足
+    """
+    if predicate(page.url):
+        return True
+    try:
+        await page.wait_for_url(predicate, wait_until="commit", timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+
+@traced('wait.dom_quiet')
+async def wait_for_dom_quiet(page: Page, budget: WaitBudget) -> bool:
+    """等待 DOM 停止变化（替代 networkidle + sleep）
+
+    Args:
+        page: Playwright 页面
+        budget: 等待预算，使用 dom_quiet 和 quiet_window 两项
+
+    Returns:
+        bool: DOM 是否在超时前稳定
+    """
+    timeout = budget.timeout('dom_quiet')
+    quiet = min(int(budget.timeouts['quiet_window']), timeout)
+    try:
+        await page.wait_for_load_state('domcontentloaded', timeout=timeout)
+        return bool(await page.evaluate(_DOM_QUIET_JS, [quiet, timeout]))
+    except Exception:
+        # 等待期间发生导航会销毁执行上下文
+        return False
+
+
+@traced('wait.until')
+async def wait_until(
+    predicate: Callable[[], Awaitable[bool]],
+    timeout: int,
+    interval: float = 0.2
+) -> bool:
+    """轮询异步条件（用于 Cookie 等无法从页面事件感知的状态）
+
+    Args:
+        predicate: 返回 bool 的异步函数
+        timeout: 超时（毫秒）
+        interval: 轮询间隔（秒）
+
+    Returns:
+        bool: 是否在超时前成立
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout / 1000
+    while True:
+        if await predicate():
+            return True
+        if loop.time() >= deadline:
+            return False
+        await asyncio.sleep(interval)
@@ -0,0 +1,128 @@
+"""请求过滤模块 - 通过 context.route 拦截自动化页面不需要的资源
+
+按资源类型和 URL 模式中止请求；不同类型的页面（如微头条编辑器）可以单独放行所需资源。
+"""
+
+from fnmatch import fnmatch
+from typing import Dict, List, Optional
+
+from .config import config
+
+# 默认过滤规则，可通过 playwright.block_requests 覆盖
+DEFAULT_BLOCK_RULES = {
+    "enabled": False,
+    # 中止的资源类型（Playwright request.resource_type）
+    "resource_types": ["image", "media", "font"],
+    # 中止的 URL 模式（fnmatch 通配符），主要是第三方统计
+    "url_patterns": [
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*hm.baidu.com*",
+        "*mcs.snssdk.com*",
+    ],
+    # 始终放行的 URL 模式（如登录验证码）
+    "allow_url_patterns": [
+        "*captcha*",
+        "*verify*",
+    ],
+    # 按页面类型放行资源：页面 URL 匹配 urls 时，allow 中的资源类型不被中止
+    "page_kinds": {
+        "editor": {
+            "urls": [
+                "*mp.toutiao.com/profile_v4/weitoutiao/*",
+                "*mp.toutiao.com/profile_v4/graphic/*",
+            ],
+            "allow": ["image", "font"],
+        },
+        "activity": {
+            "urls": ["*mp.toutiao.com/profile_v3_public/public/activity/*"],
+            "allow": ["font"],
+        },
+    },
+}
+
+
+class RequestFilter:
+    """请求过滤器"""
+
+    def __init__(self, rules: Optional[Dict] = None):
+        """初始化过滤器
+
+        Args:
+            rules: 过滤规则，默认读取 playwright.block_requests 并与默认规则合并
+        """
+        if rules is None:
+            rules = config.playwright.get('block_requests') or {}
+        rules = {**DEFAULT_BLOCK_RULES, **rules}
+
+        self.enabled = bool(rules['enabled'])
+        self.resource_types = set(rules['resource_types'])
+        self.url_patterns: List[str] = list(rules['url_patterns'])
+        self.allow_url_patterns: List[str] = list(rules['allow_url_patterns'])
+        self.page_kinds: Dict[str, Dict] = rules['page_kinds'] or {}
+
+    def page_kind(self, page_url: str) -> Optional[str]:
+        """根据页面 URL 判断页面类型
+
+        Args:
+            page_url: 发起请求的页面 URL
+
+        Returns:
+            Optional[str]: 页面类型名，未匹配返回 None
+        """
+        for kind, spec in self.page_kinds.items():
+            if any(fnmatch(page_url, pattern) for pattern in spec.get('urls', [])):
+                return kind
+        return None
+
+    def should_block(self, resource_type: str, url: str, page_url: str = '') -> bool:
+        """判断请求是否应被中止
+
+        Args:
+            resource_type: 资源类型
+            url: 请求 URL
+            page_url: 发起请求的页面 URL
+
+        Returns:
+            bool: 是否中止
+        """
+        # 页面主文档和脚本、接口请求始终放行
+        if resource_type in ('document', 'script', 'xhr', 'fetch'):
+            return any(fnmatch(url, pattern) for pattern in self.url_patterns)
+
+        if any(fnmatch(url, pattern) for pattern in self.allow_url_patterns):
+            return False
+
+        if any(fnmatch(url, pattern) for pattern in self.url_patterns):
+            return True
+
+        if resource_type not in self.resource_types:
+            return False
+
+        kind = self.page_kind(page_url) if page_url else None
+        if kind and resource_type in self.page_kinds[kind].get('allow', []):
+            return False
+        return True
+
+    async def handle(self, route):
+        """context.route 回调"""
+        request = route.request
+        try:
+            page_url = request.frame.page.url
+        except Exception:
+            # Service Worker 请求或页面已关闭
+            page_url = ''
+
+        if self.should_block(request.resource_type, request.url, page_url):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def install(self, context):
+        """在浏览器上下文上注册过滤（未启用时不注册，避免路由带来的额外开销）
+
+        Args:
+            context: Playwright BrowserContext
+        """
+        if self.enabled:
+            await context.route('**/*', self.handle)
@@ -0,0 +1,99 @@
+"""容错模块 - 重试退避与熔断器
+
+熔断器在连续失败达到阈值后打开，打开期间直接失败不发请求；
+经过 reset_timeout 后进入半开状态放行一个探测请求，成功则关闭、失败则重新打开。
+"""
+
+import random
+import threading
+import time
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """带完全抖动的指数退避时间
+
+    Args:
+        attempt: 第几次重试（从 1 开始）
+        base: 基础退避时间（秒）
+        cap: 退避时间上限（秒）
+
+    Returns:
+        float: 本次等待的秒数，在 [0, min(cap, base * 2^(attempt-1))] 内均匀分布
+    """
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    """熔断器"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, name: str = ''):
+        """初始化熔断器
+
+        Args:
+            failure_threshold: 连续失败多少次后打开，0 表示不熔断
+            reset_timeout: 打开后多久允许探测请求（秒）
+            name: 名称，用于提示信息
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """是否允许发送请求"""
+        if self.failure_threshold <= 0:
+            return True
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probing = False
+            # 半开状态只放行一个探测请求
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def retry_after(self) -> float:
+        """距离允许探测请求还有多少秒（未打开时为 0）"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        """记录一次成功"""
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self.state = self.CLOSED
+
+    def release(self):
+        """放弃本次请求的结果（如请求被取消），半开状态下允许下一个探测请求"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        """记录一次失败"""
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"[熔断] {self.name} 连续失败 {self._failures} 次，"
+                          f"{self.reset_timeout:.0f} 秒内直接失败")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
@@ -0,0 +1,85 @@
+"""接口响应缓存模块 - 按缓存键（完整请求 URL，调用方可附加账号标识）缓存 JSON 响应到磁盘
+
+每条缓存一个 JSON 文件，记录写入时间：
+- 未超过 ttl：新鲜，直接使用；
+- 超过 ttl 但未超过 stale_ttl：过期但可用，先返回旧数据，由调用方在后台刷新；
+- 超过 stale_ttl：视为未命中。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+
+class ResponseCache:
+    """磁盘响应缓存"""
+
+    def __init__(self, directory: str, ttl: float, stale_ttl: float):
+        """初始化缓存
+
+        Args:
+            directory: 缓存目录
+            ttl: 新鲜期（秒）
+            stale_ttl: 最长可用期（秒），超过后不再返回旧数据
+        """
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+
+    def _path(self, key: str) -> Path:
+        """缓存键对应的文件路径"""
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """读取缓存
+
+        Args:
+            key: 缓存键（完整请求 URL，可附加账号标识）
+
+        Returns:
+            Optional[Tuple[Any, bool]]: (数据, 是否新鲜)，未命中或已超过 stale_ttl 返回 None
+        """
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('key') != key:
+            return None
+        age = time.time() - entry.get('stored_at', 0)
+        if age > self.stale_ttl:
+            return None
+        return entry.get('data'), age <= self.ttl
+
+    def set(self, key: str, data: Any):
+        """写入缓存（先写临时文件再替换，避免并发读到半个文件）
+
+        Args:
+            key: 缓存键
+            data: 可 JSON 序列化的数据
+        """
+        path = self._path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f'.{os.getpid()}-{threading.get_ident()}.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'stored_at': time.time(), 'data': data}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[警告] 写入接口缓存失败: {e}")
+
+    def clear(self):
+        """清空缓存目录"""
+        if not self.directory.exists():
+            return
+        for path in self.directory.glob('*.json'):
+            try:
+                path.unlink()
+            except OSError:
+                pass
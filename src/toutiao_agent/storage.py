@@ -1,16 +1,156 @@
-"""SQLite 评论存储模块"""
+"""SQLite 评论存储模块
 
+同步方法可直接调用；异步代码中使用 await storage.a_<方法名>(...)，
+查询在读线程池、写入在唯一的写线程上执行，不阻塞事件循环。
+"""
+
+import atexit
+import contextvars
+import functools
 import sqlite3
+import hashlib
 import json
+import threading
+import time
+from itertools import groupby
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, Iterable, List, Dict, Optional, Set, Tuple
 
 from .config import config
+from .tracing import tracer, traced
+
+# 默认连接参数，可通过 storage 配置段覆盖
+DEFAULT_STORAGE_SETTINGS = {
+    "journal_mode": "wal",       # WAL 模式下读写互不阻塞（其他命令可在写入时查询）
+    "synchronous": "normal",     # WAL 下 NORMAL 只在检查点时 fsync，断电最多丢失最近的提交
+    "mmap_size": 64 * 1024 * 1024,  # 内存映射读取的字节数，0 表示不使用
+    "cache_size": -16000,        # 页缓存大小，负数表示 KiB
+    "busy_timeout": 5000,        # 数据库被其他连接锁定时的等待时间(毫秒)
+    # 写后队列：add_comment/add_micro_headline/add_activity_participation 只入队，
+    # 由后台线程按条数或时间批量写入；正常退出（close/进程结束）时写完全部记录，
+    # 进程崩溃时丢失队列中尚未写入的记录（通常约 write_behind_interval 秒内的记录，
+    # 写入持续失败、退避重试期间最多 write_behind_max_pending 条）
+    "write_behind": False,
+    "write_behind_batch": 100,   # 队列达到该条数时立即写入
+    "write_behind_interval": 1.0,  # 最长写入间隔(秒)
+    "write_behind_retries": 5,   # 写入失败后的重试次数（指数退避），仍失败则丢弃该批记录并报错
+    "write_behind_max_pending": 1000,  # 队列上限，写入持续失败时超出的新记录直接报错丢弃
+    "async_readers": 2,          # 异步接口的读线程数（每个线程一个数据库连接）
+}
+
+# 异步接口（storage.a_<方法名>）开放的方法：写入在写线程上按调用顺序执行，查询在读线程池中执行。
+# close/flush 等生命周期方法不开放（在线程池中关闭线程池自身会死锁）
+_WRITE_METHODS = frozenset({
+    'add_comment', 'add_comments_many',
+    'add_micro_headline', 'add_micro_headlines_many',
+    'add_activity_participation', 'add_activity_participations_many',
+    'sync_activities', 'mark_ended_activities',
+})
+_READ_METHODS = frozenset({
+    'is_commented', 'get_commented_ids', 'get_history', 'get_comment_count',
+    'get_micro_headlines', 'get_micro_headline_count',
+    'is_activity_participated', 'is_activity_processed', 'is_activity_skipped_for_app',
+    'get_activity_statuses', 'get_activity_participations', 'get_activities',
+})
+
+_JOURNAL_MODES = ('delete', 'truncate', 'persist', 'memory', 'wal', 'off')
+_SYNCHRONOUS_MODES = ('off', 'normal', 'full', 'extra')
+
+# 可批量写入的表及其插入语句
+_INSERT_SQL = {
+    'comments': '''
+        INSERT OR IGNORE INTO comments (article_id, title, url, content, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    ''',
+    'micro_headlines': '''
+        INSERT INTO micro_headlines (
+            activity_id, activity_title, content, hashtags, images, status, created_at
+        )
+        VALUES (?, ?, ?, ?, ?, 'published', ?)
+    ''',
+    'activity_participations': '''
+        INSERT INTO activity_participations
+        (activity_id, activity_title, operation_type, confidence, ai_analysis, user_confirmed, execution_result, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''',
+}
+
+# 数据库结构迁移：第 N 项把 user_version 从 N-1 升级到 N，只能追加不能修改
+SCHEMA_MIGRATIONS: List[List[str]] = [
+    # v1: 基础表（兼容 user_version 为 0 的旧数据库，均为 IF NOT EXISTS）
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS comments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            article_id TEXT NOT NULL UNIQUE,
+            title TEXT,
+            url TEXT,
+            content TEXT,
+            created_at TEXT NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS micro_headlines (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            activity_id TEXT,
+            activity_title TEXT,
+            content TEXT,
+            hashtags TEXT,
+            images TEXT,
+            status TEXT NOT NULL DEFAULT 'draft',
+            created_at TEXT NOT NULL,
+            published_at TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS activity_participations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            activity_id TEXT NOT NULL,
+            activity_title TEXT,
+            operation_type TEXT,
+            confidence REAL,
+            ai_analysis TEXT,
+            user_confirmed INTEGER DEFAULT 0,
+            execution_result TEXT,
+            created_at TEXT NOT NULL
+        )
+        ''',
+        # 活动表（由 sync_activities 按 activity_id 增量同步）
+        '''
+        CREATE TABLE IF NOT EXISTS activities (
+            activity_id TEXT PRIMARY KEY,
+            title TEXT,
+            status INTEGER,
+            part_in INTEGER NOT NULL DEFAULT 0,
+            activity_end_time INTEGER NOT NULL DEFAULT 0,
+            hashtag_name TEXT,
+            categories TEXT,
+            raw_data TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            ended INTEGER NOT NULL DEFAULT 0,
+            first_seen_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_activities_open ON activities (ended, part_in, activity_end_time)',
+    ],
+    # v2: 活动参与记录的覆盖索引（已参与/已处理/APP 跳过检查只查索引）和按时间倒序查询的索引
+    [
+        '''CREATE INDEX IF NOT EXISTS idx_participations_activity
+           ON activity_participations (activity_id, operation_type, user_confirmed)''',
+        'CREATE INDEX IF NOT EXISTS idx_participations_created ON activity_participations (created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_comments_created ON comments (created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_micro_headlines_created ON micro_headlines (created_at)',
+    ],
+]
 
 
 class CommentStorage:
-    """评论存储类"""
+    """评论存储类
+
+    每个线程使用自己的数据库连接（WAL 模式下读写互不阻塞）。
+    """
 
     def __init__(self, db_path: Optional[str] = None):
         """初始化存储
@@ -18,65 +158,136 @@ class CommentStorage:
         Args:
             db_path: 数据库文件路径，默认从配置读取
         """
-        self.db_path = db_path or config.storage.get('db_file', 'data/comments.db')
-        self._conn: Optional[sqlite3.Connection] = None
+        self.settings = {**DEFAULT_STORAGE_SETTINGS, **(config.storage or {})}
+        self.db_path = db_path or self.settings.get('db_file', 'data/comments.db')
+        self._local = threading.local()  # 当前线程的数据库连接
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._writer = None   # 异步接口的写线程（ThreadPoolExecutor，首次使用时创建）
+        self._readers = None  # 异步接口的读线程池
+        self._queue: Optional[WriteBehindQueue] = None
         self._init_db()
+        if self.settings['write_behind']:
+            self._queue = WriteBehindQueue(
+                self,
+                batch_size=int(self.settings['write_behind_batch']),
+                interval=float(self.settings['write_behind_interval']),
+                retries=int(self.settings['write_behind_retries']),
+                max_pending=int(self.settings['write_behind_max_pending'])
+            )
+            atexit.register(self.close)
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """打开一个应用了连接参数的数据库连接"""
+        # 确保目录存在
+        db_file = Path(self.db_path)
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+
+        busy_timeout = int(self.settings['busy_timeout'])
+        # 连接只在创建它的线程中使用；关闭 close 时可能在其他线程，因此不检查线程
+        conn = sqlite3.connect(str(db_file), timeout=busy_timeout / 1000, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # 支持字典访问
+        self._apply_profile(conn)
+        return conn
 
     def _get_connection(self) -> sqlite3.Connection:
-        """获取数据库连接"""
-        if self._conn is None:
-            # 确保目录存在
-            db_file = Path(self.db_path)
-            db_file.parent.mkdir(parents=True, exist_ok=True)
+        """获取当前线程的数据库连接
+
+        写后队列中有未写入的记录时先写入，保证读到自己的写入；
+        写入失败后由后台线程退避重试，读取不再尝试写入，查询结果合并 _queued 中的记录。
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._open_connection()
+            with self._connections_lock:
+                self._connections.append(conn)
+        if self._queue is not None and self._queue.pending and not self._queue.failing:
+            self._queue.flush(conn)
+        return conn
+
+    def _queued(self, table: str) -> List[Tuple]:
+        """写后队列中该表尚未提交的记录（写入失败退避期间，读取需合并这些记录）"""
+        if self._queue is None:
+            return []
+        return self._queue.queued(table)
+
+    # ============ 异步接口 ============
+
+    def _executor(self, write: bool):
+        """获取异步接口的线程池（首次使用时创建）"""
+        with self._connections_lock:
+            if write and self._writer is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='storage-writer')
+            elif not write and self._readers is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._readers = ThreadPoolExecutor(
+                    max_workers=max(1, int(self.settings['async_readers'])),
+                    thread_name_prefix='storage-reader'
+                )
+            return self._writer if write else self._readers
+
+    def __getattr__(self, name: str):
+        """异步接口：storage.a_is_commented(...) 等价于在线程中执行 storage.is_commented(...)
+
+        只开放 _WRITE_METHODS（在唯一的写线程上按调用顺序执行）和 _READ_METHODS
+        （在读线程池中执行）；await 返回时写入已提交，之后的查询能读到。
+        """
+        method_name = name[2:] if name.startswith('a_') else ''
+        write = method_name in _WRITE_METHODS
+        if not write and method_name not in _READ_METHODS:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        method = getattr(self, method_name)
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            import asyncio
+            loop = asyncio.get_running_loop()
+            # 复制上下文，线程中记录的 span 挂在调用方的 span 之下
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                self._executor(write),
+                functools.partial(context.run, method, *args, **kwargs)
+            )
+
+        setattr(self, name, call)
+        return call
 
-            self._conn = sqlite3.connect(str(db_file))
-            self._conn.row_factory = sqlite3.Row  # 支持字典访问
-        return self._conn
+    def _apply_profile(self, conn: sqlite3.Connection):
+        """应用连接参数（日志模式、同步级别、mmap、页缓存、忙等待）"""
+        settings = self.settings
+        journal_mode = str(settings['journal_mode']).lower()
+        synchronous = str(settings['synchronous']).lower()
+        if journal_mode not in _JOURNAL_MODES:
+            raise ValueError(f"storage.journal_mode 无效: {settings['journal_mode']}")
+        if synchronous not in _SYNCHRONOUS_MODES:
+            raise ValueError(f"storage.synchronous 无效: {settings['synchronous']}")
+
+        conn.execute(f'PRAGMA busy_timeout = {int(settings["busy_timeout"])}')
+        # journal_mode 返回实际生效的模式（如网络文件系统不支持 WAL 时保持原模式）
+        actual = conn.execute(f'PRAGMA journal_mode = {journal_mode}').fetchone()[0]
+        if actual.lower() != journal_mode:
+            print(f"[警告] 数据库不支持 {journal_mode} 日志模式，当前为 {actual}")
+        conn.execute(f'PRAGMA synchronous = {synchronous}')
+        conn.execute(f'PRAGMA mmap_size = {int(settings["mmap_size"])}')
+        conn.execute(f'PRAGMA cache_size = {int(settings["cache_size"])}')
 
     def _init_db(self):
-        """初始化数据库表"""
+        """初始化数据库表，并按 PRAGMA user_version 依次执行未应用的迁移"""
         conn = self._get_connection()
-        # 评论表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS comments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                article_id TEXT NOT NULL UNIQUE,
-                title TEXT,
-                url TEXT,
-                content TEXT,
-                created_at TEXT NOT NULL
-            )
-        ''')
-        # 微头条表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS micro_headlines (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                activity_id TEXT,
-                activity_title TEXT,
-                content TEXT,
-                hashtags TEXT,
-                images TEXT,
-                status TEXT NOT NULL DEFAULT 'draft',
-                created_at TEXT NOT NULL,
-                published_at TEXT
-            )
-        ''')
-        # 活动参与记录表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS activity_participations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                activity_id TEXT NOT NULL,
-                activity_title TEXT,
-                operation_type TEXT,
-                confidence REAL,
-                ai_analysis TEXT,
-                user_confirmed INTEGER DEFAULT 0,
-                execution_result TEXT,
-                created_at TEXT NOT NULL
-            )
-        ''')
-        conn.commit()
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        for target, statements in enumerate(SCHEMA_MIGRATIONS[version:], version + 1):
+            try:
+                conn.execute('BEGIN')
+                for sql in statements:
+                    conn.execute(sql)
+                conn.execute(f'PRAGMA user_version = {target}')
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
 
+    @traced('storage.is_commented')
     def is_commented(self, article_id: str) -> bool:
         """检查文章是否已评论
 
@@ -92,11 +303,43 @@ class CommentStorage:
                 'SELECT 1 FROM comments WHERE article_id = ? LIMIT 1',
                 (article_id,)
             )
-            return cursor.fetchone() is not None
+            if cursor.fetchone() is not None:
+                return True
+            return any(str(row[0]) == str(article_id) for row in self._queued('comments'))
         except Exception as e:
             print(f"检查评论状态失败: {e}")
             return False
 
+    @traced('storage.get_commented_ids')
+    def get_commented_ids(self, article_ids: Iterable[str]) -> Set[str]:
+        """批量检查文章是否已评论（一次查询）
+
+        Args:
+            article_ids: 文章ID列表
+
+        Returns:
+            Set[str]: 其中已评论的文章ID
+        """
+        ids = [str(i) for i in article_ids]
+        if not ids:
+            return set()
+        try:
+            conn = self._get_connection()
+            cursor = conn.execute(
+                'SELECT article_id FROM comments WHERE article_id IN (SELECT value FROM json_each(?))',
+                (json.dumps(ids),)
+            )
+            commented = {row[0] for row in cursor}
+            wanted = set(ids)
+            commented.update(
+                str(row[0]) for row in self._queued('comments') if str(row[0]) in wanted
+            )
+            return commented
+        except Exception as e:
+            print(f"批量检查评论状态失败: {e}")
+            return set()
+
+    @traced('storage.add_comment')
     def add_comment(self, article_id: str, title: str, url: str, content: str) -> bool:
         """添加评论记录
 
@@ -107,21 +350,29 @@ class CommentStorage:
             content: 评论内容
 
         Returns:
-            bool: 是否成功添加
+            bool: 是否成功添加（启用写后队列时表示已入队）
         """
-        try:
-            conn = self._get_connection()
-            created_at = datetime.now().isoformat()
-            conn.execute('''
-                INSERT OR IGNORE INTO comments (article_id, title, url, content, created_at)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (article_id, title, url, content, created_at))
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"添加评论记录失败: {e}")
-            return False
+        row = (article_id, title, url, content, datetime.now().isoformat())
+        return self._write('comments', row, '添加评论记录失败')
 
+    @traced('storage.add_comments_many')
+    def add_comments_many(self, comments: Iterable[Dict]) -> int:
+        """批量添加评论记录（一个事务内 executemany）
+
+        Args:
+            comments: 评论列表，每项包含 article_id, title, url, content
+
+        Returns:
+            int: 新增的记录数（已评论的文章会被忽略），失败返回 0
+        """
+        created_at = datetime.now().isoformat()
+        rows = [
+            (c['article_id'], c.get('title'), c.get('url'), c.get('content'), created_at)
+            for c in comments
+        ]
+        return self._insert_many('comments', rows, '批量添加评论记录失败')
+
+    @traced('storage.get_history')
     def get_history(self, limit: Optional[int] = None) -> List[Dict]:
         """获取评论历史
 
@@ -152,6 +403,7 @@ class CommentStorage:
             print(f"获取评论历史失败: {e}")
             return []
 
+    @traced('storage.get_comment_count')
     def get_comment_count(self) -> int:
         """获取评论总数
 
@@ -166,14 +418,64 @@ class CommentStorage:
             print(f"获取评论总数失败: {e}")
             return 0
 
+    # ============ 批量写入 ============
+
+    def _write(self, table: str, row: Tuple, error_message: str) -> bool:
+        """写入一条记录：启用写后队列时入队，否则（或队列已关闭）立即插入并提交"""
+        if self._queue is not None and not self._queue.stopped:
+            return self._queue.put(table, row)
+        try:
+            conn = self._get_connection()
+            with conn:
+                conn.execute(_INSERT_SQL[table], row)
+            return True
+        except Exception as e:
+            print(f"{error_message}: {e}")
+            return False
+
+    def _insert_many(self, table: str, rows: List[Tuple], error_message: str) -> int:
+        """在一个事务内批量插入，返回新增的记录数"""
+        if not rows:
+            return 0
+        try:
+            conn = self._get_connection()
+            with conn:
+                return conn.executemany(_INSERT_SQL[table], rows).rowcount
+        except Exception as e:
+            print(f"{error_message}: {e}")
+            return 0
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Tuple[str, Tuple]]):
+        """在一个事务内写入写后队列中的记录（按入队顺序，连续同表的记录合并为一次 executemany）"""
+        with tracer.span('storage.flush', rows=len(batch)):
+            with conn:
+                for table, items in groupby(batch, key=lambda item: item[0]):
+                    conn.executemany(_INSERT_SQL[table], [row for _, row in items])
+
+    def flush(self):
+        """立即写入写后队列中的全部记录（忽略退避；失败时丢弃并报错）"""
+        if self._queue is not None and self._queue.pending:
+            self._queue.flush(self._get_connection(), force=True)
+
     def close(self):
-        """关闭数据库连接"""
-        if self._conn:
-            self._conn.close()
-            self._conn = None
+        """等待异步调用完成，写完写后队列中的记录并关闭所有数据库连接"""
+        with self._connections_lock:
+            executors = [e for e in (self._writer, self._readers) if e is not None]
+            self._writer = self._readers = None
+        for executor in executors:
+            executor.shutdown(wait=True)
+        if self._queue is not None:
+            self._queue.stop()
+            self.flush()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
 
     # ============ 微头条相关方法 ============
 
+    @traced('storage.add_micro_headline')
     def add_micro_headline(
         self,
         content: str,
@@ -192,23 +494,30 @@ class CommentStorage:
             images: 图片列表（JSON 字符串）
 
         Returns:
-            bool: 是否成功添加
+            bool: 是否成功添加（启用写后队列时表示已入队）
         """
-        try:
-            conn = self._get_connection()
-            created_at = datetime.now().isoformat()
-            conn.execute('''
-                INSERT INTO micro_headlines (
-                    activity_id, activity_title, content, hashtags, images, status, created_at
-                )
-                VALUES (?, ?, ?, ?, ?, 'published', ?)
-            ''', (activity_id, activity_title, content, hashtags, images, created_at))
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"添加微头条记录失败: {e}")
-            return False
+        row = (activity_id, activity_title, content, hashtags, images, datetime.now().isoformat())
+        return self._write('micro_headlines', row, '添加微头条记录失败')
+
+    @traced('storage.add_micro_headlines_many')
+    def add_micro_headlines_many(self, headlines: Iterable[Dict]) -> int:
+        """批量添加微头条记录（一个事务内 executemany）
+
+        Args:
+            headlines: 微头条列表，每项包含 content，可选 activity_id, activity_title, hashtags, images
+
+        Returns:
+            int: 新增的记录数，失败返回 0
+        """
+        created_at = datetime.now().isoformat()
+        rows = [
+            (h.get('activity_id'), h.get('activity_title'), h['content'],
+             h.get('hashtags'), h.get('images'), created_at)
+            for h in headlines
+        ]
+        return self._insert_many('micro_headlines', rows, '批量添加微头条记录失败')
 
+    @traced('storage.get_micro_headlines')
     def get_micro_headlines(self, limit: Optional[int] = None) -> List[Dict]:
         """获取微头条历史
 
@@ -239,6 +548,7 @@ class CommentStorage:
             print(f"获取微头条历史失败: {e}")
             return []
 
+    @traced('storage.get_micro_headline_count')
     def get_micro_headline_count(self) -> int:
         """获取微头条总数
 
@@ -253,6 +563,7 @@ class CommentStorage:
             print(f"获取微头条总数失败: {e}")
             return 0
 
+    @traced('storage.is_activity_participated')
     def is_activity_participated(self, activity_id: str) -> bool:
         """检查活动是否已参与（检查 activity_participations 表）
 
@@ -265,15 +576,21 @@ class CommentStorage:
         try:
             conn = self._get_connection()
             cursor = conn.execute(
-                'SELECT COUNT(*) FROM activity_participations WHERE activity_id = ? AND user_confirmed = 1',
+                '''SELECT EXISTS (SELECT 1 FROM activity_participations
+                                  WHERE activity_id = ? AND user_confirmed = 1)''',
                 (activity_id,)
             )
-            count = cursor.fetchone()[0]
-            return count > 0
+            if cursor.fetchone()[0]:
+                return True
+            return any(
+                str(row[0]) == str(activity_id) and row[5]
+                for row in self._queued('activity_participations')
+            )
         except Exception as e:
             print(f"检查活动参与状态失败: {e}")
             return False
 
+    @traced('storage.is_activity_processed')
     def is_activity_processed(self, activity_id: str) -> bool:
         """检查活动是否已处理过（包括已参与和已跳过）
 
@@ -286,15 +603,19 @@ class CommentStorage:
         try:
             conn = self._get_connection()
             cursor = conn.execute(
-                'SELECT COUNT(*) FROM activity_participations WHERE activity_id = ?',
+                'SELECT EXISTS (SELECT 1 FROM activity_participations WHERE activity_id = ?)',
                 (activity_id,)
             )
-            count = cursor.fetchone()[0]
-            return count > 0
+            if cursor.fetchone()[0]:
+                return True
+            return any(
+                str(row[0]) == str(activity_id) for row in self._queued('activity_participations')
+            )
         except Exception as e:
             print(f"检查活动处理状态失败: {e}")
             return False
 
+    @traced('storage.is_activity_skipped_for_app')
     def is_activity_skipped_for_app(self, activity_id: str) -> bool:
         """检查活动是否因为需要APP而被跳过
 
@@ -307,18 +628,67 @@ class CommentStorage:
         try:
             conn = self._get_connection()
             cursor = conn.execute(
-                '''SELECT COUNT(*) FROM activity_participations
-                   WHERE activity_id = ? AND operation_type = ?''',
+                '''SELECT EXISTS (SELECT 1 FROM activity_participations
+                                  WHERE activity_id = ? AND operation_type = ?)''',
                 (activity_id, 'skip_requires_app')
             )
-            count = cursor.fetchone()[0]
-            return count > 0
+            if cursor.fetchone()[0]:
+                return True
+            return any(
+                str(row[0]) == str(activity_id) and row[2] == 'skip_requires_app'
+                for row in self._queued('activity_participations')
+            )
         except Exception as e:
             print(f"检查活动APP跳过状态失败: {e}")
             return False
 
+    @traced('storage.get_activity_statuses')
+    def get_activity_statuses(self, activity_ids: Iterable[str]) -> Dict[str, Dict[str, bool]]:
+        """批量获取活动的参与状态（一次查询，走 idx_participations_activity 覆盖索引）
+
+        Args:
+            activity_ids: 活动 ID 列表
+
+        Returns:
+            Dict[str, Dict[str, bool]]: 活动 ID -> {participated, processed, skipped_for_app}，
+                与 is_activity_participated/is_activity_processed/is_activity_skipped_for_app 含义相同
+        """
+        ids = [str(i) for i in activity_ids]
+        statuses = {
+            i: {'participated': False, 'processed': False, 'skipped_for_app': False}
+            for i in ids
+        }
+        if not ids:
+            return statuses
+        try:
+            conn = self._get_connection()
+            cursor = conn.execute('''
+                SELECT activity_id,
+                       MAX(user_confirmed = 1),
+                       MAX(operation_type = 'skip_requires_app')
+                FROM activity_participations
+                WHERE activity_id IN (SELECT value FROM json_each(?))
+                GROUP BY activity_id
+            ''', (json.dumps(ids),))
+            for activity_id, participated, skipped_for_app in cursor:
+                statuses[activity_id] = {
+                    'participated': bool(participated),
+                    'processed': True,
+                    'skipped_for_app': bool(skipped_for_app),
+                }
+            for row in self._queued('activity_participations'):
+                status = statuses.get(str(row[0]))
+                if status is not None:
+                    status['processed'] = True
+                    status['participated'] |= bool(row[5])
+                    status['skipped_for_app'] |= row[2] == 'skip_requires_app'
+        except Exception as e:
+            print(f"批量检查活动状态失败: {e}")
+        return statuses
+
     # ============ 活动参与相关方法 ============
 
+    @traced('storage.add_activity_participation')
     def add_activity_participation(
         self,
         activity_id: str,
@@ -340,32 +710,60 @@ class CommentStorage:
             user_confirmed: 用户是否确认
             execution_result: 执行结果
         """
-        try:
-            conn = self._get_connection()
+        row = self._participation_row(
+            activity_id, activity_title, operation_type, confidence,
+            ai_analysis, user_confirmed, execution_result, datetime.now().isoformat()
+        )
+        self._write('activity_participations', row, '记录活动参与失败')
 
-            # 如果 ai_analysis 是 dict，转换为 JSON 字符串
-            ai_analysis_json = ai_analysis
-            if isinstance(ai_analysis, dict):
-                ai_analysis_json = json.dumps(ai_analysis, ensure_ascii=False)
-
-            conn.execute('''
-                INSERT INTO activity_participations
-                (activity_id, activity_title, operation_type, confidence, ai_analysis, user_confirmed, execution_result, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                activity_id,
-                activity_title,
-                operation_type,
-                confidence,
-                ai_analysis_json,
-                1 if user_confirmed else 0,
-                execution_result,
-                datetime.now().isoformat()
-            ))
-            conn.commit()
-        except Exception as e:
-            print(f"记录活动参与失败: {e}")
+    @traced('storage.add_activity_participations_many')
+    def add_activity_participations_many(self, participations: Iterable[Dict]) -> int:
+        """批量记录活动参与（一个事务内 executemany）
+
+        Args:
+            participations: 参与记录列表，每项的键与 add_activity_participation 的参数相同
 
+        Returns:
+            int: 新增的记录数，失败返回 0
+        """
+        created_at = datetime.now().isoformat()
+        rows = [
+            self._participation_row(
+                p['activity_id'], p.get('activity_title'), p.get('operation_type'),
+                p.get('confidence', 0.0), p.get('ai_analysis'), p.get('user_confirmed', False),
+                p.get('execution_result'), created_at
+            )
+            for p in participations
+        ]
+        return self._insert_many('activity_participations', rows, '批量记录活动参与失败')
+
+    @staticmethod
+    def _participation_row(
+        activity_id: str,
+        activity_title: Optional[str],
+        operation_type: Optional[str],
+        confidence: float,
+        ai_analysis: Any,
+        user_confirmed: bool,
+        execution_result: Optional[str],
+        created_at: str
+    ) -> Tuple:
+        """活动参与记录的插入参数"""
+        # 如果 ai_analysis 是 dict，转换为 JSON 字符串
+        if isinstance(ai_analysis, dict):
+            ai_analysis = json.dumps(ai_analysis, ensure_ascii=False)
+        return (
+            activity_id,
+            activity_title,
+            operation_type,
+            confidence,
+            ai_analysis,
+            1 if user_confirmed else 0,
+            execution_result,
+            created_at
+        )
+
+    @traced('storage.get_activity_participations')
     def get_activity_participations(self, limit: int = 20) -> List[Dict]:
         """获取活动参与记录
 
@@ -403,6 +801,329 @@ class CommentStorage:
             return []
 
 
+    # ============ 活动列表相关方法 ============
+
+    @traced('storage.sync_activities')
+    def sync_activities(self, activities: Iterable, with_categories: bool = True) -> Dict[str, List[str]]:
+        """将抓取到的活动增量同步到活动表
+
+        只有内容（原始数据或分类）变化的活动才会写入；同时把已到结束时间的活动标记为已结束。
+
+        Args:
+            activities: Activity 列表（需以 keep_raw=True 创建，保留 raw_data）
+            with_categories: activities 是否按分类抓取（activity.categories 为完整分类，
+                空元组表示不属于任何分类）；为 False 时保留已有分类
+
+        Returns:
+            Dict[str, List[str]]: 变化的活动 ID，键为 new（新活动）、updated（内容变化）、
+                participated（新变为已参与）、ended（新变为已结束）
+        """
+        changes: Dict[str, List[str]] = {'new': [], 'updated': [], 'participated': [], 'ended': []}
+        try:
+            conn = self._get_connection()
+            existing = {
+                row['activity_id']: row
+                for row in conn.execute(
+                    'SELECT activity_id, content_hash, part_in, categories FROM activities'
+                )
+            }
+            now = datetime.now().isoformat()
+            rows = []
+            for activity in activities:
+                activity_id = str(activity.activity_id)
+                old = existing.get(activity_id)
+                if with_categories:
+                    categories = sorted(activity.categories)
+                else:
+                    # 哈希与写入使用同一个分类值，未变化的活动不会被误判为已更新
+                    categories = json.loads(old['categories']) if old else []
+                content_hash = hashlib.sha1(json.dumps(
+                    [activity.raw_data, categories], ensure_ascii=False, sort_keys=True
+                ).encode('utf-8')).hexdigest()
+
+                if old is None:
+                    changes['new'].append(activity_id)
+                elif old['content_hash'] == content_hash:
+                    continue
+                else:
+                    changes['updated'].append(activity_id)
+                    if activity.part_in and not old['part_in']:
+                        changes['participated'].append(activity_id)
+
+                rows.append((
+                    activity_id,
+                    activity.title,
+                    activity.status,
+                    1 if activity.part_in else 0,
+                    int(activity.activity_end_time or 0),
+                    activity.hashtag_name,
+                    json.dumps(categories, ensure_ascii=False),
+                    json.dumps(activity.raw_data, ensure_ascii=False),
+                    content_hash,
+                    now,
+                    now
+                ))
+
+            conn.executemany('''
+                INSERT INTO activities
+                (activity_id, title, status, part_in, activity_end_time, hashtag_name,
+                 categories, raw_data, content_hash, first_seen_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(activity_id) DO UPDATE SET
+                    title = excluded.title,
+                    status = excluded.status,
+                    part_in = excluded.part_in,
+                    activity_end_time = excluded.activity_end_time,
+                    hashtag_name = excluded.hashtag_name,
+                    categories = excluded.categories,
+                    raw_data = excluded.raw_data,
+                    content_hash = excluded.content_hash,
+                    updated_at = excluded.updated_at
+            ''', rows)
+            conn.commit()
+            changes['ended'] = self.mark_ended_activities()
+        except Exception as e:
+            print(f"同步活动列表失败: {e}")
+        return changes
+
+    @traced('storage.mark_ended_activities')
+    def mark_ended_activities(self, now: Optional[float] = None) -> List[str]:
+        """将已到结束时间的活动标记为已结束
+
+        Args:
+            now: 当前 Unix 时间戳，默认取系统时间
+
+        Returns:
+            List[str]: 本次新标记为已结束的活动 ID
+        """
+        now = time.time() if now is None else now
+        try:
+            conn = self._get_connection()
+            ended = [
+                row[0] for row in conn.execute(
+                    '''SELECT activity_id FROM activities
+                       WHERE ended = 0 AND activity_end_time > 0 AND activity_end_time < ?''',
+                    (now,)
+                )
+            ]
+            if ended:
+                conn.executemany(
+                    'UPDATE activities SET ended = 1, updated_at = ? WHERE activity_id = ?',
+                    [(datetime.now().isoformat(), activity_id) for activity_id in ended]
+                )
+                conn.commit()
+            return ended
+        except Exception as e:
+            print(f"标记已结束活动失败: {e}")
+            return []
+
+    @traced('storage.get_activities')
+    def get_activities(
+        self,
+        only_ongoing: bool = True,
+        only_unparticipated: bool = True,
+        category: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """从活动表查询活动
+
+        Args:
+            only_ongoing: 仅返回未结束的活动
+            only_unparticipated: 仅返回未参与的活动
+            category: 分类筛选（"全部" 或 None 表示不筛选）
+            limit: 返回条数限制
+
+        Returns:
+            List[Dict]: 活动原始数据（附加 categories 字段），按结束时间升序
+        """
+        conditions = []
+        params: List = []
+        if only_ongoing:
+            # 结束时间为 0 表示长期活动
+            conditions.append('ended = 0 AND (activity_end_time = 0 OR activity_end_time >= ?)')
+            params.append(time.time())
+        if only_unparticipated:
+            conditions.append('part_in = 0')
+        if category and category != '全部':
+            conditions.append('EXISTS (SELECT 1 FROM json_each(activities.categories) WHERE value = ?)')
+            params.append(category)
+
+        sql = 'SELECT raw_data, categories FROM activities'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY activity_end_time = 0, activity_end_time'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        try:
+            conn = self._get_connection()
+            results = []
+            for row in conn.execute(sql, params):
+                data = json.loads(row['raw_data'])
+                data['categories'] = json.loads(row['categories'] or '[]')
+                results.append(data)
+            return results
+        except Exception as e:
+            print(f"查询活动列表失败: {e}")
+            return []
+
+
+class WriteBehindQueue:
+    """写后队列：记录先入队，由后台线程按条数或时间在一个事务内批量写入
+
+    后台线程使用自己的数据库连接；其他线程调用 flush 时使用调用方的连接，
+    写入过程由锁串行化，保证按入队顺序写入且 flush 返回后记录均已提交。
+    写入失败时记录放回队首，按指数退避重试 retries 次后丢弃并报错；
+    队列达到 max_pending 条时拒绝新记录，避免数据库持续不可写时无限增长。
+    退避期间读取不等待写入，由 queued 提供尚未提交的记录，避免重复评论/参与。
+    """
+
+    # 失败重试的最长退避时间(秒)
+    MAX_BACKOFF = 60.0
+
+    def __init__(
+        self,
+        storage: CommentStorage,
+        batch_size: int,
+        interval: float,
+        retries: int = 5,
+        max_pending: int = 1000
+    ):
+        """初始化队列（后台线程在首条记录入队时启动）
+
+        Args:
+            storage: 所属存储
+            batch_size: 队列达到该条数时立即写入
+            interval: 最长写入间隔(秒)
+            retries: 同一批记录写入失败后的重试次数
+            max_pending: 未写入记录数上限
+        """
+        self.storage = storage
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self.retries = max(0, retries)
+        self.max_pending = max(self.batch_size, max_pending)
+        self._items: List[Tuple[str, Tuple]] = []
+        self._writing: List[Tuple[str, Tuple]] = []  # 正在写入的一批记录
+        self._lock = threading.Lock()        # 保护 _items 和 _writing
+        self._flush_lock = threading.Lock()  # 串行化写入
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._failures = 0       # 连续失败次数（成功后清零）
+        self._attempts = 0       # 队首这批记录已失败的次数
+        self._retry_at = 0.0     # 退避结束时间（time.monotonic）
+
+    @property
+    def pending(self) -> int:
+        """未写入的记录数"""
+        return len(self._items)
+
+    @property
+    def failing(self) -> bool:
+        """最近一次写入是否失败（失败期间只由后台线程退避重试）"""
+        return self._failures > 0
+
+    @property
+    def stopped(self) -> bool:
+        """队列是否已关闭"""
+        return self._stopped
+
+    def queued(self, table: str) -> List[Tuple]:
+        """某张表尚未提交的记录（包括正在写入的一批），供读取时合并
+
+        Args:
+            table: 表名
+
+        Returns:
+            List[Tuple]: 插入参数列表，按入队顺序
+        """
+        with self._lock:
+            return [row for name, row in self._writing + self._items if name == table]
+
+    def put(self, table: str, row: Tuple) -> bool:
+        """记录入队（不等待写入）
+
+        Returns:
+            bool: 是否已入队，队列已满时返回 False
+        """
+        with self._lock:
+            if len(self._items) >= self.max_pending:
+                print(f"写后队列已满（{len(self._items)} 条未写入），丢弃新记录")
+                return False
+            self._items.append((table, row))
+            full = len(self._items) >= self.batch_size
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(
+                    target=self._run, name='storage-write-behind', daemon=True
+                )
+                self._thread.start()
+        if full:
+            self._wakeup.set()
+        return True
+
+    def flush(self, conn: sqlite3.Connection, force: bool = False):
+        """用给定连接写入当前队列中的全部记录
+
+        Args:
+            conn: 数据库连接
+            force: 忽略退避立即写入，失败时直接丢弃（关闭时使用）
+        """
+        with self._flush_lock:
+            if not force and time.monotonic() < self._retry_at:
+                return
+            with self._lock:
+                batch, self._items = self._items, []
+                self._writing = batch
+            if not batch:
+                return
+            try:
+                self.storage._write_batch(conn, batch)
+            except Exception as e:
+                self._failures += 1
+                self._attempts += 1
+                delay = min(self.MAX_BACKOFF, self.interval * 2 ** (self._failures - 1))
+                self._retry_at = time.monotonic() + delay
+                with self._lock:
+                    self._writing = []
+                    if force or self._attempts > self.retries:
+                        dropped = True
+                        self._attempts = 0
+                    else:
+                        dropped = False
+                        self._items[:0] = batch
+                if dropped:
+                    print(f"写入队列中的记录失败，丢弃 {len(batch)} 条: {e}")
+                else:
+                    print(f"写入队列中的记录失败（{len(batch)} 条，{delay:.1f} 秒后重试）: {e}")
+                return
+            with self._lock:
+                self._writing = []
+            self._failures = 0
+            self._attempts = 0
+            self._retry_at = 0.0
+
+    def _run(self):
+        """后台线程：每 interval 秒或队列满时写入"""
+        conn = self.storage._open_connection()
+        try:
+            while not self._stopped:
+                self._wakeup.wait(self.interval)
+                self._wakeup.clear()
+                self.flush(conn)
+        finally:
+            conn.close()
+
+    def stop(self):
+        """停止后台线程（剩余记录由调用方 flush）"""
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+
 # 全局单例
 _storage: Optional[CommentStorage] = None
 
@@ -415,5 +1136,8 @@ def get_storage() -> CommentStorage:
     return _storage
 
 
-# 导出便捷实例
-storage = get_storage()
+def __getattr__(name: str):
+    """按需创建便捷实例 storage（导入模块时不打开数据库）"""
+    if name == 'storage':
+        return get_storage()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
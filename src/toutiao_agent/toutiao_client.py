@@ -1,12 +1,268 @@
 """头条客户端 - 使用Playwright实现"""
 
 import asyncio
+import html
 import json
 import re
-from pathlib import Path
 from typing import Optional, List, Dict
+
+import httpx
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from .config import config
+from .cookie_jar import get_cookie_jar
+from .rate_limiter import get_rate_limiter
+from .request_filter import RequestFilter
+from .page_helpers import install_helpers, call_helper, evaluate
+from .tracing import tracer, traced, sleep as traced_sleep
+from .browser_daemon import daemon_settings, start_daemon
+from .readiness import (
+    WaitBudget,
+    wait_for_selector,
+    wait_for_function,
+    wait_for_url,
+    wait_for_dom_quiet,
+    wait_until,
+)
+
+# 浏览器和 HTTP 客户端共用的 User-Agent
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# 浏览器启动参数（直接启动和常驻浏览器共用）
+BROWSER_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+]
+
+# 登录相关的 Cookie 名
+LOGIN_COOKIE_NAMES = ['sessionid', 'sid_tt', 'uid_tt', 'sessionid_sig', 'sid_guard']
+
+# 评论/发布输入框是否已清空（用于判断提交完成）
+_INPUTS_CLEARED_JS = '''() => {
+    const inputs = document.querySelectorAll('[contenteditable="true"], textarea');
+    return inputs.length > 0 && Array.from(inputs).every(
+        input => !(input.value || input.textContent || '').trim()
+    );
+}'''
+
+# 发布后出现成功/错误提示或输入框清空
+_PUBLISH_SETTLED_JS = '''() => {
+    if (document.querySelector('.toast-success, .success-message, .toast-error, .error-message')) {
+        return true;
+    }
+    const inputs = document.querySelectorAll('[contenteditable="true"], textarea');
+    return inputs.length > 0 && Array.from(inputs).every(
+        input => !(input.value || input.textContent || '').trim()
+    );
+}'''
+
+# 信息流中查找新闻链接的选择器（按优先级）
+FEED_LINK_SELECTORS = [
+    'a[href*="/group/"]',
+    'a[href*="/article/"]',
+    '.title-link',
+    'a[class*="title"]'
+]
+
+# 首页信息流接口（PC 端）
+FEED_API_PATTERN = re.compile(r'/api/pc/(list/feed|feed/)')
+
+
+def _to_count(value) -> Optional[int]:
+    """计数字段转为整数（接口可能返回字符串），无法解析时返回 None"""
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_feed_item(raw: Dict) -> Optional[Dict]:
+    """解析信息流接口中的单条数据
+
+    Args:
+        raw: 接口返回的条目（部分条目的 content 字段是 JSON 字符串）
+
+    Returns:
+        Optional[Dict]: 文章信息，非文章条目（广告、视频合集等）返回 None
+    """
+    if isinstance(raw.get('content'), str):
+        try:
+            raw = json.loads(raw['content'])
+        except ValueError:
+            return None
+        if not isinstance(raw, dict):
+            return None
+
+    article_id = str(raw.get('group_id') or raw.get('item_id') or '')
+    title = (raw.get('title') or '').strip()
+    if not article_id.isdigit() or len(title) <= 5:
+        return None
+
+    return {
+        'title': title[:100],
+        'article_id': article_id,
+        'url': raw.get('article_url') or raw.get('display_url') or f"https://www.toutiao.com/article/{article_id}/",
+        'abstract': raw.get('abstract') or '',
+        'read_count': _to_count(raw.get('read_count')),
+        'comment_count': _to_count(raw.get('comment_count')),
+    }
+
+
+def _strip_tags(fragment: str) -> str:
+    """去除 HTML 标签并反转义实体"""
+    text = re.sub(r'<(script|style)\b.*?</\1>', ' ', fragment, flags=re.S | re.I)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    return re.sub(r'\s+', ' ', html.unescape(text)).strip()
+
+
+def _parse_article_html(page_html: str) -> Optional[Dict]:
+    """从文章页 HTML 中解析标题和正文开头
+
+    Args:
+        page_html: 文章页 HTML
+
+    Returns:
+        Optional[Dict]: {title, content}，页面不可用（反爬验证页、无正文等）返回 None
+    """
+    # 反爬验证页需要执行 JS，无法直接解析
+    if '__ac_nonce' in page_html[:2000]:
+        return None
+
+    title_match = re.search(r'<h1[^>]*>(.*?)</h1>', page_html, re.S | re.I)
+    content_match = re.search(r'<article[^>]*>(.*?)</article>', page_html, re.S | re.I)
+    if not title_match or not content_match:
+        return None
+
+    title = _strip_tags(title_match.group(1))
+    content = _strip_tags(content_match.group(1))
+    if not title or not content:
+        return None
+    return {'title': title, 'content': content[:500]}
+
+
+class FeedCapture:
+    """信息流接口响应捕获器 - 通过 page.on('response') 直接解析文章列表 JSON"""
+
+    def __init__(self, page: Page):
+        """初始化捕获器
+
+        Args:
+            page: 要监听的页面（需在导航前 attach）
+        """
+        self.page = page
+        self.items: Dict[str, Dict] = {}
+        self._arrived = asyncio.Event()
+
+    def attach(self):
+        """开始监听响应"""
+        self.page.on('response', self._on_response)
+
+    def detach(self):
+        """停止监听响应"""
+        self.page.remove_listener('response', self._on_response)
+
+    async def _on_response(self, response):
+        """处理信息流接口响应"""
+        if not FEED_API_PATTERN.search(response.url):
+            return
+        try:
+            data = await response.json()
+        except Exception:
+            return
+        if not isinstance(data, dict) or not isinstance(data.get('data'), list):
+            return
+
+        for raw in data['data']:
+            if not isinstance(raw, dict):
+                continue
+            try:
+                item = _parse_feed_item(raw)
+            except Exception as e:
+                # 单条数据格式异常不影响同一批的其他条目
+                print(f"  [WARN] 解析信息流条目失败: {e}")
+                continue
+            if item and item['article_id'] not in self.items:
+                self.items[item['article_id']] = item
+        self._arrived.set()
+
+    async def wait_for_batch(self, timeout: int) -> bool:
+        """等待下一批信息流数据
+
+        Args:
+            timeout: 超时（毫秒）
+
+        Returns:
+            bool: 是否收到新的一批数据
+        """
+        try:
+            await asyncio.wait_for(self._arrived.wait(), timeout / 1000)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._arrived.clear()
+
+
+class PagePool:
+    """页面池 - 在同一浏览器上下文中复用有限数量的页面
+
+    通过 acquire/release 借还页面，允许抓取热点、预加载文章和发表评论并发进行。
+    """
+
+    def __init__(self, context: BrowserContext, max_size: int = 3):
+        """初始化页面池
+
+        Args:
+            context: 页面所属的浏览器上下文
+            max_size: 最多同时打开的页面数
+        """
+        self.context = context
+        self.max_size = max(1, max_size)
+        self._semaphore = asyncio.Semaphore(self.max_size)
+        self._idle: List[Page] = []
+        self._pages: List[Page] = []
+
+    async def acquire(self) -> Page:
+        """借出一个页面（池满时等待其他调用方归还）
+
+        Returns:
+            Page: 可用的页面
+        """
+        await self._semaphore.acquire()
+        try:
+            while self._idle:
+                page = self._idle.pop()
+                if not page.is_closed():
+                    return page
+            page = await self.context.new_page()
+            self._pages.append(page)
+            return page
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def release(self, page: Page):
+        """归还页面
+
+        Args:
+            page: acquire() 借出的页面
+        """
+        if page.is_closed():
+            self._pages = [p for p in self._pages if p is not page]
+        else:
+            self._idle.append(page)
+        self._semaphore.release()
+
+    async def close(self):
+        """关闭池中所有页面"""
+        for page in self._pages:
+            if not page.is_closed():
+                await page.close()
+        self._pages = []
+        self._idle = []
 
 
 class ToutiaoClient:
@@ -16,59 +272,128 @@ class ToutiaoClient:
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        self.page_pool: Optional[PagePool] = None
         self.playwright = None
+        self.daemon_mode = False  # 是否连接的是常驻浏览器
+        self._http: Optional[httpx.AsyncClient] = None  # 文章详情 HTTP 快速通道
+        self._http_lock = asyncio.Lock()  # 并发调用时只创建一个 HTTP 客户端
 
+    @traced('client.start')
     async def start(self):
         """启动浏览器"""
         self.playwright = await async_playwright().start()
 
+        if daemon_settings()['enabled']:
+            # 连接常驻浏览器（未运行则先启动），复用已登录的浏览器
+            endpoint = await start_daemon(self.playwright, BROWSER_ARGS)
+            self.browser = await self.playwright.chromium.connect_over_cdp(
+                endpoint,
+                slow_mo=config.playwright.get('slow_mo', 0)
+            )
+            self.daemon_mode = True
+            await self._attach_daemon_context()
+            return
+
         # 启动浏览器（默认非headless，因为登录可能需要手动处理验证码）
         self.browser = await self.playwright.chromium.launch(
             headless=config.playwright.get('headless', False),
             slow_mo=config.playwright.get('slow_mo', 0),  # 慢动作模式，便于调试
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-            ]
+            args=BROWSER_ARGS
         )
 
-        # 创建或加载浏览器上下文
-        cookies_file = Path(config.playwright.get('cookies_file'))
-        if cookies_file.exists():
-            # 从Cookie文件加载
-            self.context = await self.browser.new_context(
-                storage_state=str(cookies_file),
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            )
-        else:
-            # 创建新上下文
-            self.context = await self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            )
+        # 创建浏览器上下文（从共享 Cookie 存储恢复登录态）
+        await self._open_context()
+
+    async def _attach_daemon_context(self):
+        """使用常驻浏览器的默认上下文（登录态保存在 user_data_dir 中，缺失时从共享 Cookie 存储导入）"""
+        contexts = self.browser.contexts
+        self.context = contexts[0] if contexts else await self.browser.new_context()
+
+        if not await self._has_login_cookie():
+            cookies = get_cookie_jar().cookies()
+            if cookies:
+                await self.context.add_cookies(cookies)
+
+        await RequestFilter().install(self.context)
+        await install_helpers(self.context)
+
+        self.page = await self.context.new_page()
+        self.page_pool = PagePool(self.context, config.playwright.get('page_pool_size', 3))
+
+    async def _open_context(self):
+        """创建浏览器上下文（使用共享 Cookie 存储中的登录态）、注册请求过滤，并初始化主页面和页面池"""
+        state = get_cookie_jar().storage_state()
+        self.context = await self.browser.new_context(
+            storage_state=state if state['cookies'] or state['origins'] else None,
+            viewport={'width': 1920, 'height': 1080},
+            user_agent=USER_AGENT
+        )
+        await RequestFilter().install(self.context)
+        await install_helpers(self.context)
 
         self.page = await self.context.new_page()
+        self.page_pool = PagePool(self.context, config.playwright.get('page_pool_size', 3))
 
+    @traced('client.close')
     async def close(self):
         """关闭浏览器"""
-        if self.context:
-            # 保存Cookie状态
-            cookies_file = Path(config.playwright.get('cookies_file'))
-            cookies_file.parent.mkdir(parents=True, exist_ok=True)
-            await self.context.storage_state(path=str(cookies_file))
+        await self._close_http_client()
 
-        if self.browser:
+        if self.page_pool:
+            await self.page_pool.close()
+            self.page_pool = None
+
+        if self.context:
+            # 同步 Cookie 状态（无变化时不写文件）
+            await self.sync_cookies()
+
+        if self.daemon_mode:
+            # 常驻浏览器只关闭本次打开的页面，断开连接但不退出浏览器
+            if self.page and not self.page.is_closed():
+                await self.page.close()
+        elif self.browser:
             await self.browser.close()
         if self.playwright:
             await self.playwright.stop()
 
+    async def navigate(self, page: Page, url: str, **kwargs):
+        """页面导航（记录 navigate span；受限主机经过共享限流器）
+
+        Args:
+            page: Playwright 页面
+            url: 目标 URL
+            **kwargs: 透传给 page.goto
+        """
+        limiter = get_rate_limiter(url)
+        if limiter:
+            await limiter.acquire()
+        with tracer.span('navigate', url=url):
+            try:
+                response = await page.goto(url, **kwargs)
+            except PlaywrightTimeoutError:
+                if limiter:
+                    limiter.on_throttle('导航超时')
+                raise
+        if limiter and response is not None:
+            if response.status == 429:
+                limiter.on_throttle('HTTP 429')
+            elif response.ok:
+                limiter.on_success()
+        # 页面可能刷新了登录 Cookie，同步到共享存储供 HTTP 客户端使用（退出时写回文件）
+        await self.sync_cookies(save=False)
+        return response
+
+    @traced('client.check_login_status')
     async def check_login_status(self) -> bool:
         """检查登录状态"""
         try:
-            await self.page.goto('https://www.toutiao.com/', timeout=30000)
-            await self.page.wait_for_load_state('networkidle', timeout=10000)
+            budget = WaitBudget()
+            await self.navigate(self.page, 'https://www.toutiao.com/', timeout=budget.timeout('navigation'))
+            # 头像或登录按钮任一出现即可判断登录状态
+            await wait_for_selector(
+                self.page, '.user-avatar, .avatar, .login-button',
+                budget.timeout('selector'), state='attached'
+            )
 
             # 检查是否有用户头像（已登录标志）
             user_avatar = await self.page.query_selector('.user-avatar, .avatar')
@@ -77,23 +402,40 @@ class ToutiaoClient:
             print(f"检查登录状态失败: {e}")
             return False
 
+    async def sync_cookies(self, save: bool = True) -> bool:
+        """把浏览器上下文中的 Cookie 同步到共享 Cookie 存储
+
+        共享存储以上下文状态为准（浏览器已删除或过期的 Cookie 同时移除），
+        HTTP 客户端每次请求都从共享存储取 Cookie，同步后立即使用新的登录态。
+
+        Args:
+            save: 是否写回 Cookie 文件（包括之前 save=False 同步后尚未写回的变化）
+
+        Returns:
+            bool: 本次同步 Cookie 是否有变化
+        """
+        jar = get_cookie_jar()
+        state = await self.context.storage_state()
+        changed = jar.replace(state.get('cookies', []), state.get('origins', []))
+        if save:
+            # 无未写回的变化时 save() 不写文件
+            jar.save()
+        return changed
+
+    async def _has_login_cookie(self) -> bool:
+        """上下文中是否已有登录 Cookie"""
+        cookies = await self.context.cookies()
+        return any(c.get('name') in LOGIN_COOKIE_NAMES for c in cookies)
+
     async def _check_login_success(self) -> bool:
         """检查登录是否真正成功（通过Cookie和页面元素）"""
         # 1. 检查是否有登录相关的 Cookie（主要指标）
-        cookies = await self.context.cookies()
-        login_cookie_names = ['sessionid', 'sid_tt', 'uid_tt', 'sessionid_sig', 'sid_guard']
-
-        has_login_cookie = any(
-            any(c.get('name') == name for c in cookies)
-            for name in login_cookie_names
-        )
-
-        if has_login_cookie:
+        if await self._has_login_cookie():
             print(f"  [OK] 检测到登录 Cookie")
             return True
 
         # 2. 检查 localStorage 中的登录数据（辅助指标）
-        local_storage = await self.page.evaluate('''() => {
+        local_storage = await evaluate(self.page, '''() => {
             return {
                 hasUserId: !!localStorage.getItem('SLARDARweb_login_sdk'),
                 hasPassportData: !!Object.keys(localStorage).filter(k => k.includes('passport')).length
@@ -104,14 +446,12 @@ class ToutiaoClient:
             print(f"  [OK] 检测到 localStorage 登录数据")
 
             # localStorage 有数据，但等待 Cookie 更新
-            await asyncio.sleep(2)
-            cookies = await self.context.cookies()
-            if any(any(c.get('name') == name for c in cookies) for name in login_cookie_names):
+            if await wait_until(self._has_login_cookie, 2000):
                 print(f"  [OK] Cookie 已更新")
                 return True
 
         # 3. 检查页面状态（备用）
-        page_state = await self.page.evaluate('''() => {
+        page_state = await evaluate(self.page, '''() => {
             const loginBtn = document.querySelector('.login-button');
             const loginLink = Array.from(document.querySelectorAll('a')).find(a => a.textContent.includes('登录'));
             return {
@@ -128,11 +468,9 @@ class ToutiaoClient:
         print(f"  登录状态未确认")
         return False
 
+    @traced('client.load_cookies_from_string')
     async def load_cookies_from_string(self, cookies_str: str):
         """从Cookie字符串加载Cookie"""
-        cookies_file = Path(config.playwright.get('cookies_file'))
-        cookies_file.parent.mkdir(parents=True, exist_ok=True)
-
         # 解析Cookie字符串
         cookies = []
         for item in cookies_str.split(';'):
@@ -146,39 +484,39 @@ class ToutiaoClient:
                     'path': '/',
                 })
 
-        # 保存为storage_state格式
-        storage_state = {
-            'cookies': cookies,
-            'origins': []
-        }
+        # 替换共享 Cookie 存储并写回文件，HTTP 客户端的下一个请求即使用新 Cookie
+        jar = get_cookie_jar()
+        jar.replace(cookies)
+        jar.save()
 
-        with open(cookies_file, 'w') as f:
-            json.dump(storage_state, f)
+        # 常驻浏览器的默认上下文不能关闭，直接替换 Cookie
+        if self.daemon_mode:
+            await self.context.clear_cookies()
+            await self.context.add_cookies(cookies)
+            return
 
         # 重新加载上下文
+        if self.page_pool:
+            await self.page_pool.close()
         if self.context:
             await self.context.close()
-        self.context = await self.browser.new_context(
-            storage_state=str(cookies_file),
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        )
-        self.page = await self.context.new_page()
+        await self._open_context()
 
+    @traced('client.login')
     async def login(self, username: str, password: str) -> bool:
         """使用账号密码登录头条"""
-        from pathlib import Path
-
         try:
             print(f"正在登录账号: {username}")
 
+            budget = WaitBudget()
+
             # 访问头条首页
-            await self.page.goto('https://www.toutiao.com/', timeout=30000)
-            await asyncio.sleep(3)
+            await self.navigate(self.page, 'https://www.toutiao.com/', timeout=budget.timeout('navigation'))
+            await wait_for_selector(self.page, '.login-button', budget.timeout('selector'), state='attached')
 
             print("  点击登录按钮...")
             # 使用JavaScript点击登录按钮（CSS尺寸为0，必须用JS点击）
-            click_result = await self.page.evaluate('''() => {
+            click_result = await evaluate(self.page, '''() => {
                 const loginBtn = document.querySelector('.login-button');
                 if (loginBtn) {
                     loginBtn.click();
@@ -193,14 +531,9 @@ class ToutiaoClient:
 
             print("  [OK] 已点击登录按钮")
 
-            # 等待登录弹窗完全加载
-            await asyncio.sleep(5)
-
-            # 确保账密登录元素已加载
+            # 等待登录弹窗中的账密登录元素加载
             print("  等待账密登录选项加载...")
-            try:
-                await self.page.wait_for_selector('[aria-label="账密登录"]', timeout=10000)
-            except Exception:
+            if not await wait_for_selector(self.page, '[aria-label="账密登录"]', budget.timeout('selector')):
                 print("  [ERROR] 账密登录选项加载超时")
                 await self.page.screenshot(path="debug/debug_wait_account_login.png")
                 return False
@@ -214,7 +547,7 @@ class ToutiaoClient:
                     print("  [OK] 已点击账密登录 (Playwright)")
                 except Exception as e:
                     # 降级到JavaScript点击
-                    js_result = await self.page.evaluate('''() => {
+                    js_result = await evaluate(self.page, '''() => {
                         const el = document.querySelector('[aria-label="账密登录"]');
                         if (el) {
                             el.dispatchEvent(new MouseEvent('mousedown', { bubbles: true, cancelable: true }));
@@ -236,30 +569,22 @@ class ToutiaoClient:
                 await self.page.screenshot(path="debug/debug_no_account_login.png")
                 return False
 
-            await asyncio.sleep(2)
+            # 等待账号输入框出现
+            await wait_for_selector(
+                self.page,
+                'input[placeholder*="手机号"], input[name="mobile"], input[name="username"], .web-login-account-input__input',
+                budget.timeout('selector')
+            )
 
             # 查找并填写手机号/邮箱
             print("  填写手机号...")
-            phone_filled = await self.page.evaluate(f'''() => {{
-                const selectors = [
-                    'input[placeholder="手机号/邮箱"]',
-                    'input[placeholder*="手机号"]',
-                    'input[name="mobile"]',
-                    'input[name="username"]',
-                    '.web-login-account-input__input'
-                ];
-
-                for (const selector of selectors) {{
-                    const input = document.querySelector(selector);
-                    if (input && input.offsetParent !== null) {{
-                        input.value = '{username}';
-                        input.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                        input.dispatchEvent(new Event('blur', {{ bubbles: true }}));
-                        return {{ filled: true, selector }};
-                    }}
-                }}
-                return {{ filled: false }};
-            }}''')
+            phone_filled = await call_helper(self.page, 'fillFirstVisible', [
+                'input[placeholder="手机号/邮箱"]',
+                'input[placeholder*="手机号"]',
+                'input[name="mobile"]',
+                'input[name="username"]',
+                '.web-login-account-input__input'
+            ], username)
 
             if phone_filled.get('filled'):
                 print(f"  [OK] 已填写手机号 ({phone_filled.get('selector')})")
@@ -268,28 +593,13 @@ class ToutiaoClient:
                 await self.page.screenshot(path="debug/debug_no_phone_input.png")
                 return False
 
-            await asyncio.sleep(0.5)
-
             # 查找并填写密码
             print("  填写密码...")
-            password_filled = await self.page.evaluate('''() => {
-                const selectors = [
-                    'input[type="password"]',
-                    'input[name="password"]',
-                    '.web-login-password-input__input'
-                ];
-
-                for (const selector of selectors) {
-                    const input = document.querySelector(selector);
-                    if (input && input.offsetParent !== null) {
-                        input.value = '__PASSWORD__';
-                        input.dispatchEvent(new Event('input', { bubbles: true }));
-                        input.dispatchEvent(new Event('blur', { bubbles: true }));
-                        return { filled: true, selector };
-                    }
-                }
-                return { filled: false };
-            }'''.replace('__PASSWORD__', password))
+            password_filled = await call_helper(self.page, 'fillFirstVisible', [
+                'input[type="password"]',
+                'input[name="password"]',
+                '.web-login-password-input__input'
+            ], password)
 
             if password_filled.get('filled'):
                 print(f"  [OK] 已填写密码 ({password_filled.get('selector')})")
@@ -298,11 +608,9 @@ class ToutiaoClient:
                 await self.page.screenshot(path="debug/debug_no_password_input.png")
                 return False
 
-            await asyncio.sleep(0.5)
-
             # 点击登录提交按钮
             print("  点击登录按钮...")
-            submit_clicked = await self.page.evaluate('''() => {
+            submit_clicked = await evaluate(self.page, '''() => {
                 const buttons = document.querySelectorAll('button');
                 for (const btn of buttons) {
                     if (btn.textContent && btn.textContent.includes('登录')) {
@@ -320,13 +628,14 @@ class ToutiaoClient:
                 await self.page.screenshot(path="debug/debug_no_submit_btn.png")
                 return False
 
-            # 等待登录结果
+            # 等待登录结果（登录 Cookie 写入即可判断）
             print("  等待登录结果...")
-            await asyncio.sleep(5)
+            await wait_until(self._has_login_cookie, budget.timeout('login'))
 
             # 检查是否登录成功（使用 Cookie 和页面元素检查）
             if await self._check_login_success():
                 print("  [SUCCESS] 登录成功!")
+                await self.sync_cookies()
                 return True
             else:
                 current_url = self.page.url
@@ -336,9 +645,10 @@ class ToutiaoClient:
                 # 等待用户手动完成（非headless模式）
                 print("  等待30秒，请在浏览器中完成验证...")
                 for i in range(30):
-                    await asyncio.sleep(1)
+                    await traced_sleep(1)
                     if await self._check_login_success():
                         print("  [SUCCESS] 登录成功!")
+                        await self.sync_cookies()
                         return True
 
                 print("  [ERROR] 登录超时，验证未完成")
@@ -348,8 +658,14 @@ class ToutiaoClient:
             print(f"[ERROR] 登录失败: {e}")
             return False
 
+    @traced('client.ensure_login')
     async def ensure_login(self) -> bool:
         """确保已登录（先检查Cookie，未登录则尝试账号密码登录）"""
+        # 常驻浏览器已有登录 Cookie 时无需再访问首页验证
+        if self.daemon_mode and await self._has_login_cookie():
+            print("[SUCCESS] 已登录（常驻浏览器）")
+            return True
+
         # 先检查是否已登录
         if await self.check_login_status():
             print("[SUCCESS] 已登录（使用已保存的Cookie）")
@@ -365,84 +681,171 @@ class ToutiaoClient:
         print("提示: 如果登录过程中需要验证码，请在打开的浏览器中完成")
         return await self.login(username, password)
 
-    async def get_hot_news(self, limit: int = 20) -> List[Dict]:
-        """获取热点新闻（过滤已评论的文章）"""
+    @traced('client.get_hot_news')
+    async def get_hot_news(self, limit: int = 20, mode: Optional[str] = None) -> List[Dict]:
+        """获取热点新闻（过滤已评论的文章）
+
+        Args:
+            limit: 返回条数
+            mode: dom=解析页面链接；network=拦截信息流接口 JSON（含阅读数等元数据），
+                默认读取 behavior.hot_news_mode
+
+        Returns:
+            List[Dict]: 新闻列表，network 模式下额外包含 abstract/read_count/comment_count
+        """
+        mode = mode or config.behavior.get('hot_news_mode', 'dom')
+        max_items = limit * 3  # 多抓取一些，因为过滤后可能不足
+        page = await self.page_pool.acquire()
+        capture = FeedCapture(page) if mode == 'network' else None
         try:
-            await self.page.goto('https://www.toutiao.com/', timeout=30000)
-            await asyncio.sleep(3)  # 等待页面渲染
-
-            # 尝试多种选择器查找新闻链接
-            selectors = [
-                'a[href*="/group/"]',
-                'a[href*="/article/"]',
-                '.title-link',
-                'a[class*="title"]'
-            ]
+            budget = WaitBudget()
+            if capture:
+                capture.attach()
+            await self.navigate(page, 'https://www.toutiao.com/', timeout=budget.timeout('navigation'))
 
             news_items = []
+            if capture:
+                news_items = await self._collect_feed(page, capture, max_items, budget)
+                if not news_items:
+                    print("  [WARN] 未捕获到信息流接口数据，改为解析页面链接")
+            if not news_items:
+                news_items = await self._scrape_feed(page, max_items, budget)
+
+            # 过滤阅读量不足的文章（仅当接口提供阅读数时）
+            min_read_count = config.behavior.get('min_read_count', 0)
+            news_items = [
+                item for item in news_items
+                if item.get('read_count') is None or item['read_count'] >= min_read_count
+            ]
 
-            for selector in selectors:
-                links = await self.page.query_selector_all(selector)
-                if not links:
-                    continue
+            # 过滤已评论的文章（一次批量查询）
+            from .storage import storage
+            commented = await storage.a_get_commented_ids([item['article_id'] for item in news_items])
+            return [item for item in news_items if item['article_id'] not in commented][:limit]
 
-                for link in links[:limit * 3]:  # 多抓取一些，因为过滤后可能不足
-                    try:
-                        url = await link.get_attribute('href')
-                        if url and ('/group/' in url or '/article/' in url):
-                            match = re.search(r'/(group|article)/(\d+)/', url)
-                            if match:
-                                article_id = match.group(2)
-                                title_elem = await link.query_selector('.title, h1, h2, h3')
-                                if title_elem:
-                                    title = await title_elem.text_content()
-                                else:
-                                    title = await link.text_content()
-                                title = title.strip() if title else ''
-                                if title and len(title) > 5:
-                                    news_items.append({
-                                        'title': title[:100],
-                                        'article_id': article_id,
-                                        'url': url
-                                    })
-                                    if len(news_items) >= limit * 2:
-                                        break
-                    except Exception:
-                        continue
+        except Exception as e:
+            print(f"获取热点新闻失败: {e}")
+            return []
+        finally:
+            if capture:
+                capture.detach()
+            await self.page_pool.release(page)
+
+    async def _scrape_feed(self, page: Page, max_items: int, budget: WaitBudget) -> List[Dict]:
+        """从页面链接中解析信息流文章"""
+        # 等待信息流中的文章链接渲染
+        await wait_for_selector(
+            page, 'a[href*="/group/"], a[href*="/article/"]',
+            budget.timeout('selector'), state='attached'
+        )
 
-                if len(news_items) >= limit * 2:
-                    break
+        # 在页面内一次性完成链接提取、ID 解析、标题获取和去重
+        return await call_helper(page, 'extractFeed', FEED_LINK_SELECTORS, max_items)
 
-            # 过滤已评论的文章
-            from .storage import storage
-            filtered_items = []
-            seen_ids = set()
+    async def _collect_feed(
+        self,
+        page: Page,
+        capture: FeedCapture,
+        max_items: int,
+        budget: WaitBudget
+    ) -> List[Dict]:
+        """收集信息流接口数据，不足时滚动页面触发加载下一页"""
+        max_scrolls = config.behavior.get('feed_max_scrolls', 5)
 
-            for item in news_items:
-                article_id = item['article_id']
-                if article_id in seen_ids:
-                    continue
-                seen_ids.add(article_id)
+        if not await capture.wait_for_batch(budget.timeout('response')):
+            return []
 
-                if not storage.is_commented(article_id):
-                    filtered_items.append(item)
-                    if len(filtered_items) >= limit:
-                        break
+        for _ in range(max_scrolls):
+            if len(capture.items) >= max_items:
+                break
+            await evaluate(page, 'window.scrollTo(0, document.body.scrollHeight)', label='scroll')
+            if not await capture.wait_for_batch(budget.timeout('response')):
+                break
+
+        return list(capture.items.values())[:max_items]
+
+    async def _get_http_client(self) -> httpx.AsyncClient:
+        """获取使用共享 Cookie 存储的长连接 HTTP 客户端（首次调用时创建）"""
+        if self._http is not None:
+            return self._http
+        async with self._http_lock:
+            if self._http is None:
+                # 先把浏览器中的最新 Cookie 同步到共享存储，之后每个请求由钩子按 URL 取 Cookie 头
+                await self.sync_cookies(save=False)
+                jar = get_cookie_jar()
+                max_connections = config.playwright.get('http_max_connections', 10)
+                self._http = httpx.AsyncClient(
+                    headers={'User-Agent': USER_AGENT, 'Referer': 'https://www.toutiao.com/'},
+                    event_hooks={'request': [jar.apply_header]},
+                    limits=httpx.Limits(
+                        max_connections=max_connections,
+                        max_keepalive_connections=max_connections
+                    ),
+                    timeout=10.0,
+                    follow_redirects=True
+                )
+            return self._http
+
+    async def _close_http_client(self):
+        """关闭 HTTP 客户端"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _fetch_article_http(self, article_id: str) -> Optional[Dict]:
+        """通过 HTTP 直接获取文章详情
 
-            return filtered_items
+        Args:
+            article_id: 文章ID
 
-        except Exception as e:
-            print(f"获取热点新闻失败: {e}")
-            return []
+        Returns:
+            Optional[Dict]: 文章详情，响应不可用时返回 None（由调用方回退到浏览器）
+        """
+        url = f"https://www.toutiao.com/article/{article_id}/"
+        limiter = get_rate_limiter(url)
+        try:
+            client = await self._get_http_client()
+            if limiter:
+                await limiter.acquire()
+            response = await client.get(url)
+        except httpx.TimeoutException:
+            if limiter:
+                limiter.on_throttle('超时')
+            return None
+        except httpx.HTTPError:
+            return None
+
+        if limiter:
+            if response.status_code == 429:
+                limiter.on_throttle('HTTP 429')
+            elif response.status_code == 200:
+                limiter.on_success()
+        if response.status_code != 200:
+            return None
+        detail = _parse_article_html(response.text)
+        if not detail:
+            return None
+        return {'article_id': article_id, **detail, 'url': str(response.url)}
 
+    @traced('client.get_article_detail')
     async def get_article_detail(self, article_id: str) -> Dict:
-        """获取文章详情"""
+        """获取文章详情（优先走 HTTP 快速通道，不可用时回退到浏览器）"""
+        if config.playwright.get('http_fast_path', True):
+            detail = await self._fetch_article_http(article_id)
+            if detail:
+                return detail
+
+        page = await self.page_pool.acquire()
         try:
             url = f"https://www.toutiao.com/group/{article_id}/"
-            await self.page.goto(url, timeout=30000)
-            await self.page.wait_for_load_state('networkidle', timeout=15000)
+            budget = WaitBudget()
+            await self.navigate(page, url, timeout=budget.timeout('navigation'))
+            await wait_for_selector(
+                page, '.article-content, .content, article',
+                budget.timeout('selector'), state='attached'
+            )
 
-            detail = await self.page.evaluate('''() => {
+            detail = await evaluate(page, '''() => {
                 const titleEl = document.querySelector('.article-title, h1, .title');
                 const contentEl = document.querySelector('.article-content, .content, article');
 
@@ -460,10 +863,30 @@ class ToutiaoClient:
         except Exception as e:
             print(f"获取文章详情失败: {e}")
             return {'article_id': article_id, 'title': '', 'content': ''}
+        finally:
+            await self.page_pool.release(page)
+
+    @traced('client.get_article_details')
+    async def get_article_details(self, article_ids: List[str]) -> List[Dict]:
+        """并发获取多篇文章详情（HTTP 并发受连接池限制，浏览器回退受页面池限制）
+
+        Args:
+            article_ids: 文章ID列表
+
+        Returns:
+            List[Dict]: 与 article_ids 顺序一致的文章详情列表
+        """
+        return list(await asyncio.gather(
+            *(self.get_article_detail(article_id) for article_id in article_ids)
+        ))
 
+    @traced('client.post_comment')
     async def post_comment(self, article_id: str, content: str) -> Dict:
         """发表评论"""
+        page = await self.page_pool.acquire()
         try:
+            budget = WaitBudget()
+
             # 尝试不同的文章 URL 格式
             urls = [
                 f"https://www.toutiao.com/article/{article_id}/",
@@ -472,35 +895,33 @@ class ToutiaoClient:
 
             for url in urls:
                 try:
-                    await self.page.goto(url, timeout=30000)
-                    await asyncio.sleep(3)
+                    await self.navigate(page, url, timeout=budget.timeout('navigation'))
                     break
                 except:
                     continue
 
-            # 滚动到评论区
-            await self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-            await asyncio.sleep(2)
+            # 滚动到评论区（评论区为懒加载）
+            await evaluate(page, 'window.scrollTo(0, document.body.scrollHeight)', label='scroll')
+            await wait_for_selector(page, '.ttp-comment-input, .comment-input', budget.timeout('selector'))
 
             # 点击评论输入区域
-            comment_area = await self.page.query_selector('.ttp-comment-input, .comment-input')
+            comment_area = await page.query_selector('.ttp-comment-input, .comment-input')
             if not comment_area:
                 return {'success': False, 'error': '未找到评论区'}
 
             await comment_area.click()
-            await asyncio.sleep(1)
+            await wait_for_selector(page, '[contenteditable="true"]', budget.timeout('selector'))
 
             # 使用 contenteditable 输入框
-            editable = await self.page.query_selector('[contenteditable="true"]')
+            editable = await page.query_selector('[contenteditable="true"]')
             if not editable:
                 return {'success': False, 'error': '未找到可编辑输入框'}
 
             await editable.fill(content)
-            await asyncio.sleep(1)
 
-            # 尝试按回车发送
+            # 尝试按回车发送，等待输入框清空
             await editable.press('Enter')
-            await asyncio.sleep(3)
+            await wait_for_function(page, _INPUTS_CLEARED_JS, budget.timeout('publish_result'))
 
             # 检查是否发送成功（输入框是否清空）
             input_value = await editable.evaluate('el => el.textContent')
@@ -510,7 +931,7 @@ class ToutiaoClient:
                 # 如果回车无效，尝试点击发送按钮
                 try:
                     # 查找评论区域的发送按钮
-                    send_btn = await self.page.evaluate('''() => {
+                    send_btn = await evaluate(page, '''() => {
                         const commentBlock = document.querySelector('.ttp-comment-block, .ttp-comment-wrapper');
                         if (!commentBlock) return null;
                         return Array.from(commentBlock.querySelectorAll('button')).find(btn =>
@@ -518,14 +939,14 @@ class ToutiaoClient:
                         )?.outerHTML;
                     }''')
                     if send_btn:
-                        await self.page.evaluate('''() => {
+                        await evaluate(page, '''() => {
                             const commentBlock = document.querySelector('.ttp-comment-block, .ttp-comment-wrapper');
                             const btn = Array.from(commentBlock.querySelectorAll('button')).find(btn =>
                                 btn.textContent && btn.textContent.includes('评论')
                             );
                             if (btn) btn.click();
                         }''')
-                        await asyncio.sleep(3)
+                        await wait_for_function(page, _INPUTS_CLEARED_JS, budget.timeout('publish_result'))
                 except:
                     pass
 
@@ -533,18 +954,22 @@ class ToutiaoClient:
 
         except Exception as e:
             return {'success': False, 'error': str(e)}
+        finally:
+            await self.page_pool.release(page)
 
+    @traced('client.open_creator_center')
     async def open_creator_center(self) -> bool:
         """打开创作者中心首页"""
         try:
-            await self.page.goto('https://mp.toutiao.com/profile_v4/index', timeout=30000)
-            await self.page.wait_for_load_state('networkidle', timeout=15000)
-            await asyncio.sleep(2)
+            budget = WaitBudget()
+            await self.navigate(self.page, 'https://mp.toutiao.com/profile_v4/index', timeout=budget.timeout('navigation'))
+            await wait_for_dom_quiet(self.page, budget)
             return True
         except Exception as e:
             print(f"打开创作者中心失败: {e}")
             return False
 
+    @traced('client.verify_page_loaded')
     async def verify_page_loaded(self) -> bool:
         """验证页面是否成功加载
 
@@ -558,7 +983,7 @@ class ToutiaoClient:
         """
         try:
             # 检查页面内容长度
-            page_info = await self.page.evaluate('''() => {
+            page_info = await evaluate(self.page, '''() => {
                 const bodyText = document.body?.innerText || '';
                 const title = document.title || '';
                 const url = window.location.href;
@@ -594,6 +1019,7 @@ class ToutiaoClient:
             print(f"  [ERROR] 页面加载验证失败: {e}")
             return False
 
+    @traced('client.click_activity_card')
     async def click_activity_card(self, activity_id: str, max_retries: int = 3) -> bool:
         """从创作者中心点击活动卡片
 
@@ -610,99 +1036,32 @@ class ToutiaoClient:
                     print(f"重试第 {attempt + 1} 次...")
 
                 print(f"正在点击活动卡片: {activity_id}")
+                budget = WaitBudget()
 
                 # 确保在创作者中心页面
                 if 'profile_v4' not in self.page.url:
                     await self.open_creator_center()
 
                 # 等待活动列表加载
-                await asyncio.sleep(3)
+                await wait_for_selector(self.page, 'a[href*="activity"]', budget.timeout('selector'), state='attached')
 
                 # 先滚动页面确保活动卡片在视口中
                 print("滚动页面查找活动卡片...")
-                await self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                await asyncio.sleep(1)
+                await evaluate(self.page, 'window.scrollTo(0, document.body.scrollHeight)', label='scroll')
+                await wait_for_dom_quiet(self.page, budget)
 
                 # 改进的JavaScript选择器，更精确地匹配活动卡片
-                click_result = await self.page.evaluate(f'''() => {{
-                    console.log('开始查找活动卡片...', '{activity_id}');
-
-                    // 方法1: 通过活动ID精确匹配href
-                    const allLinks = Array.from(document.querySelectorAll('a[href*="activity"]'));
-                    console.log('找到活动链接数量:', allLinks.length);
-
-                    // 首先尝试精确匹配activity_id
-                    for (const link of allLinks) {{
-                        const href = link.getAttribute('href') || '';
-
-                        // 检查href中是否包含目标activity_id
-                        if (href.includes('id={activity_id}') || href.includes('activity/' + '{activity_id}')) {{
-                            // 找到精确匹配
-                            link.scrollIntoView({{ behavior: 'smooth', block: 'center' }});
-
-                            // 检查是否可见
-                            const rect = link.getBoundingClientRect();
-                            if (rect.width > 0 && rect.height > 0) {{
-                                link.click();
-                                return {{
-                                    clicked: true,
-                                    method: 'exact_match',
-                                    href: href
-                                }};
-                            }}
-                        }}
-                    }}
-
-                    // 方法2: 如果精确匹配失败，尝试模糊匹配（通过data属性或文本内容）
-                    const activityCards = Array.from(document.querySelectorAll('[data-activity-id], [class*="activity-card"], [class*="ActivityCard"]'));
-
-                    for (const card of activityCards) {{
-                        const dataId = card.getAttribute('data-activity-id');
-                        if (dataId === '{activity_id}') {{
-                            // 找到匹配的卡片，查找其中的链接
-                            const link = card.querySelector('a[href*="activity"]');
-                            if (link) {{
-                                link.scrollIntoView({{ behavior: 'smooth', block: 'center' }});
-                                link.click();
-                                return {{
-                                    clicked: true,
-                                    method: 'data_attribute',
-                                    href: link.getAttribute('href')
-                                }};
-                            }}
-                        }}
-                    }}
-
-                    // 方法3: 通过文本内容匹配（活动标题包含特定关键词）
-                    for (const link of allLinks) {{
-                        const href = link.getAttribute('href') || '';
-                        const text = link.textContent?.trim() || '';
-
-                        // 检查是否是活动链接且包含活动ID（可能在URL参数中）
-                        if (href.includes('activity') && href.includes('id=')) {{
-                            // 尝试从URL中提取activity_id
-                            const idMatch = href.match(/id=([^&]+)/);
-                            if (idMatch && idMatch[1] === '{activity_id}') {{
-                                link.scrollIntoView({{ behavior: 'smooth', block: 'center' }});
-                                link.click();
-                                return {{
-                                    clicked: true,
-                                    method: 'url_param_match',
-                                    href: href
-                                }};
-                            }}
-                        }}
-                    }}
-
-                    return {{ clicked: false, method: 'not_found' }};
-                }}''')
+                click_result = await call_helper(self.page, 'clickActivityCard', str(activity_id))
 
                 if click_result['clicked']:
                     print(f"  [OK] 已点击活动卡片 (方法: {click_result['method']})")
                     print(f"  目标href: {click_result.get('href', 'N/A')}")
 
                     # 等待页面跳转
-                    await asyncio.sleep(3)
+                    await wait_for_url(
+                        self.page, lambda url: activity_id in url, budget.timeout('navigation')
+                    )
+                    await wait_for_dom_quiet(self.page, budget)
 
                     # 验证是否成功跳转到活动详情页
                     current_url = self.page.url
@@ -730,8 +1089,8 @@ class ToutiaoClient:
                     print(f"  [ERROR] 未找到活动卡片 (尝试 {attempt + 1}/{max_retries})")
                     if attempt < max_retries - 1:
                         # 滚动到顶部再试一次
-                        await self.page.evaluate('window.scrollTo(0, 0)')
-                        await asyncio.sleep(2)
+                        await evaluate(self.page, 'window.scrollTo(0, 0)', label='scroll')
+                        await wait_for_dom_quiet(self.page, budget)
                         continue
 
                     # 最后一次尝试失败，保存调试信息
@@ -744,12 +1103,13 @@ class ToutiaoClient:
                 traceback.print_exc()
 
                 if attempt < max_retries - 1:
-                    await asyncio.sleep(2)
+                    await traced_sleep(2)
                     continue
                 return False
 
         return False
 
+    @traced('client.open_activity_page')
     async def open_activity_page(self, activity_id: str) -> bool:
         """打开活动页面（正确的URL格式）
 
@@ -770,9 +1130,9 @@ class ToutiaoClient:
             print(f"正在访问活动页面: {activity_url}")
             print("  [WARN] 注意：如果返回404，请使用 open_creator_center() + click_activity_card()")
 
-            await self.page.goto(activity_url, timeout=30000)
-            await self.page.wait_for_load_state('networkidle', timeout=15000)
-            await asyncio.sleep(2)
+            budget = WaitBudget()
+            await self.navigate(self.page, activity_url, timeout=budget.timeout('navigation'))
+            await wait_for_dom_quiet(self.page, budget)
 
             print(f"  [OK] 当前URL: {self.page.url}")
             return True
@@ -781,6 +1141,7 @@ class ToutiaoClient:
             print(f"打开活动页面失败: {e}")
             return False
 
+    @traced('client.find_and_click_input')
     async def find_and_click_input(self, timeout: int = 5000) -> Optional[Dict]:
         """E003进化：智能查找并点击输入框（支持iframe、shadow DOM）
 
@@ -793,25 +1154,22 @@ class ToutiaoClient:
         try:
             print(f"[E003进化] 智能查找输入框（超时{timeout}ms）...")
 
-            # 先等待页面稳定
-            await asyncio.sleep(1)
-
             # 尝试多种策略查找输入框
             # （省略详细实现，简化版）
-            if await self.page.wait_for_load_state('networkidle', timeout=1000):
+            if await wait_for_selector(self.page, '[contenteditable="true"]', timeout):
                 # 查找contenteditable
                 elem = await self.page.query_selector('[contenteditable="true"]')
                 if elem:
                     await elem.click()
-                    await asyncio.sleep(1)
                     return {'found': True, 'tag': 'contenteditable'}
-            
+
             return None
 
         except Exception as e:
             print(f"[E003进化] 查找输入框异常: {e}")
             return None
 
+    @traced('client.participate_from_activity_page')
     async def participate_from_activity_page(self, activity_id: str, content: str) -> Dict:
         """从活动页面参与活动
 
@@ -878,6 +1236,7 @@ class ToutiaoClient:
                 "message": f"参与活动失败: {str(e)}"
             }
 
+    @traced('client.publish_micro_headline_in_current_page')
     async def publish_micro_headline_in_current_page(self, content: str, topic: str = None) -> Dict:
         """在当前页面（活动弹窗）中发布微头条
 
@@ -893,9 +1252,10 @@ class ToutiaoClient:
         """
         try:
             print("正在当前页面中查找输入框...")
+            budget = WaitBudget()
 
-            # 等待活动弹窗/页面完全加载
-            await asyncio.sleep(2)
+            # 等待活动弹窗/页面中的输入框出现
+            await wait_for_selector(self.page, '[contenteditable="true"], textarea', budget.timeout('selector'))
 
             # 尝试查找输入框（活动弹窗中的输入框）
             input_found = False
@@ -908,9 +1268,7 @@ class ToutiaoClient:
                     is_visible = await editable.is_visible()
                     if is_visible:
                         await editable.click()
-                        await asyncio.sleep(1)
                         await editable.fill(content)
-                        await asyncio.sleep(2)
                         input_found = True
                         print("  [OK] 已填写内容到 contenteditable 元素")
                         break
@@ -925,9 +1283,7 @@ class ToutiaoClient:
                         is_visible = await textarea.is_visible()
                         if is_visible:
                             await textarea.click()
-                            await asyncio.sleep(1)
                             await textarea.fill(content)
-                            await asyncio.sleep(2)
                             input_found = True
                             print("  [OK] 已填写内容到 textarea 元素")
                             break
@@ -945,22 +1301,10 @@ class ToutiaoClient:
             publish_clicked = False
 
             # 通过JavaScript查找并点击发布按钮
-            button_result = await self.page.evaluate('''() => {
-                const buttons = Array.from(document.querySelectorAll('button, [role="button"]'));
-                const keywords = ['发布', '发送', '提交', '确认参与'];
-
-                for (const btn of buttons) {
-                    const text = btn.textContent?.trim() || '';
-                    if (keywords.some(kw => text.includes(kw))) {
-                        return {
-                            found: true,
-                            text: text,
-                            className: btn.className
-                        };
-                    }
-                }
-                return { found: false };
-            }''')
+            buttons = await call_helper(
+                self.page, 'findButtons', 'button, [role="button"]', ['发布', '发送', '提交', '确认参与']
+            )
+            button_result = {'found': True, **buttons[0]} if buttons else {'found': False}
 
             if button_result.get('found'):
                 print(f"  [OK] 找到发布按钮: {button_result.get('text')}")
@@ -995,30 +1339,14 @@ class ToutiaoClient:
                 print("  使用 Ctrl+Enter 发布")
                 publish_clicked = True
 
-            # 等待发布完成
-            await asyncio.sleep(5)
+            # 等待发布完成（出现提示或输入框清空）
+            await wait_for_function(self.page, _PUBLISH_SETTLED_JS, budget.timeout('publish_result'))
 
             # 检查发布结果
             current_url = self.page.url
 
             # 检查是否有成功提示或错误信息
-            result_check = await self.page.evaluate('''() => {
-                // 检查成功提示
-                const successEl = document.querySelector('.toast-success, .success-message, [class*="success"]');
-                // 检查错误信息
-                const errorEl = document.querySelector('.toast-error, .error-message, [class*="error"]');
-                // 检查输入框是否清空
-                const inputs = document.querySelectorAll('[contenteditable="true"], textarea');
-                const isEmpty = Array.from(inputs).every(input => !input.textContent || input.textContent.trim() === '');
-
-                return {
-                    hasSuccess: !!successEl,
-                    hasError: !!errorEl,
-                    inputCleared: isEmpty,
-                    successText: successEl ? successEl.textContent : '',
-                    errorText: errorEl ? errorEl.textContent : ''
-                };
-            }''')
+            result_check = await call_helper(self.page, 'checkPublishResult')
 
             if result_check.get('inputCleared'):
                 return {
@@ -1052,103 +1380,41 @@ class ToutiaoClient:
                 "message": f"发布失败: {str(e)}"
             }
 
+    @traced('client.publish_micro_headline')
     async def publish_micro_headline(self, content: str, topic: str = None, images: List[str] = None) -> Dict:
         """发布微头条"""
+        page = await self.page_pool.acquire()
         try:
             print("正在访问微头条发布页面...")
+            budget = WaitBudget()
             # 使用正确的微头条发布页面 URL
-            await self.page.goto(
+            await self.navigate(
+                page,
                 "https://mp.toutiao.com/profile_v4/weitoutiao/publish",
-                wait_until="networkidle",
-                timeout=60000
+                timeout=budget.timeout('navigation')
             )
 
-            print(f"当前 URL: {self.page.url}")
+            print(f"当前 URL: {page.url}")
 
             # 检查登录状态
-            if "login" in self.page.url:
-                # 等待一下，可能是页面跳转过程中
-                await asyncio.sleep(3)
-                print(f"等待后 URL: {self.page.url}")
-                if "login" in self.page.url:
+            if "login" in page.url:
+                # 可能是页面跳转过程中，等待离开登录页
+                await wait_for_url(page, lambda url: "login" not in url, budget.timeout('selector'))
+                print(f"等待后 URL: {page.url}")
+                if "login" in page.url:
                     return {
                         "success": False,
                         "message": "需要重新登录，请更新 Cookie"
                     }
 
-            # 等待页面加载
-            await asyncio.sleep(5)
+            # 等待编辑器渲染
+            await wait_for_selector(page, '[contenteditable="true"], textarea', budget.timeout('selector'))
 
             # 尝试使用更全面的方式查找输入框
             print("正在查找输入框...")
 
             # 先尝试通过 JavaScript 查找所有可能的输入元素
-            input_info = await self.page.evaluate('''() => {
-                const results = [];
-
-                // 查找所有 contenteditable 元素
-                const editables = document.querySelectorAll('[contenteditable="true"]');
-                editables.forEach((el, idx) => {
-                    const rect = el.getBoundingClientRect();
-                    const computed = window.getComputedStyle(el);
-                    results.push({
-                        type: 'contenteditable',
-                        index: idx,
-                        visible: rect.width > 0 && rect.height > 0,
-                        inViewport: rect.top >= 0 && rect.top <= window.innerHeight,
-                        width: rect.width,
-                        height: rect.height,
-                        top: rect.top,
-                        display: computed.display,
-                        visibility: computed.visibility,
-                        tag: el.tagName,
-                        className: el.className,
-                        id: el.id,
-                        placeholder: el.getAttribute('placeholder') || '',
-                        textContent: el.textContent?.substring(0, 20) || ''
-                    });
-                });
-
-                // 查找 textarea
-                const textareas = document.querySelectorAll('textarea');
-                textareas.forEach((el, idx) => {
-                    const rect = el.getBoundingClientRect();
-                    results.push({
-                        type: 'textarea',
-                        index: idx,
-                        visible: rect.width > 0 && rect.height > 0,
-                        inViewport: rect.top >= 0 && rect.top <= window.innerHeight,
-                        width: rect.width,
-                        height: rect.height,
-                        top: rect.top,
-                        tag: el.tagName,
-                        className: el.className,
-                        id: el.id,
-                        placeholder: el.placeholder || ''
-                    });
-                });
-
-                // 查找 input[type=text]
-                const inputs = document.querySelectorAll('input[type="text"], input:not([type])');
-                inputs.forEach((el, idx) => {
-                    const rect = el.getBoundingClientRect();
-                    results.push({
-                        type: 'input',
-                        index: idx,
-                        visible: rect.width > 0 && rect.height > 0,
-                        inViewport: rect.top >= 0 && rect.top <= window.innerHeight,
-                        width: rect.width,
-                        height: rect.height,
-                        top: rect.top,
-                        tag: el.tagName,
-                        className: el.className,
-                        id: el.id,
-                        placeholder: el.placeholder || ''
-                    });
-                });
-
-                return results;
-            }''')
+            input_info = await call_helper(page, 'collectInputs')
 
             print(f"找到的可输入元素 ({len(input_info)} 个):")
             for elem in input_info[:10]:  # 只打印前10个
@@ -1165,18 +1431,18 @@ class ToutiaoClient:
                 # 优先选择 contenteditable
                 for elem_info in visible_elements:
                     if elem_info['type'] == 'contenteditable':
-                        editable = self.page.locator('[contenteditable="true"]').nth(elem_info['index'])
+                        editable = page.locator('[contenteditable="true"]').nth(elem_info['index'])
                         print(f"\n选择 contenteditable[{elem_info['index']}]: {elem_info}")
                         break
                     elif elem_info['type'] == 'textarea':
-                        editable = self.page.locator('textarea').nth(elem_info['index'])
+                        editable = page.locator('textarea').nth(elem_info['index'])
                         print(f"\n选择 textarea[{elem_info['index']}]: {elem_info}")
                         break
 
             if not editable:
                 # 保存截图和 HTML 用于调试
-                await self.page.screenshot(path="data/debug/weic_page.png", full_page=True)
-                html_content = await self.page.content()
+                await page.screenshot(path="data/debug/weic_page.png", full_page=True)
+                html_content = await page.content()
                 with open("data/debug/weic_page.html", "w", encoding="utf-8") as f:
                     f.write(html_content)
                 print("\n未找到可见的输入框，已保存调试文件")
@@ -1188,34 +1454,18 @@ class ToutiaoClient:
             # 点击输入框并输入内容
             print("\n点击输入框...")
             await editable.click()
-            await asyncio.sleep(1)
 
             print("输入内容...")
             await editable.fill(content)
-            await asyncio.sleep(2)
 
             # 查找并点击发布按钮
             print("查找发布按钮...")
             publish_button = None
 
             # 通过 JavaScript 查找发布按钮
-            button_info = await self.page.evaluate('''() => {
-                const buttons = Array.from(document.querySelectorAll('button, [role="button"], .btn'));
-                const results = [];
-                buttons.forEach(btn => {
-                    const text = btn.textContent?.trim() || '';
-                    const rect = btn.getBoundingClientRect();
-                    if (text.includes('发布') || text.includes('发送') || text.includes('提交')) {
-                        results.push({
-                            text: text,
-                            visible: rect.width > 0 && rect.height > 0,
-                            className: btn.className,
-                            id: btn.id
-                        });
-                    }
-                });
-                return results;
-            }''')
+            button_info = await call_helper(
+                page, 'findButtons', 'button, [role="button"], .btn', ['发布', '发送', '提交']
+            )
 
             print(f"找到的发布按钮: {button_info}")
 
@@ -1229,7 +1479,7 @@ class ToutiaoClient:
 
             for selector in button_selectors:
                 try:
-                    btn = self.page.locator(selector).first
+                    btn = page.locator(selector).first
                     if await btn.count() > 0 and await btn.is_visible():
                         publish_button = btn
                         print(f"找到发布按钮: {selector}")
@@ -1242,14 +1492,18 @@ class ToutiaoClient:
                 print("已点击发布按钮")
             else:
                 # 尝试使用快捷键发布
-                await self.page.keyboard.press("Control+Enter")
+                await page.keyboard.press("Control+Enter")
                 print("使用 Ctrl+Enter 发布")
 
-            # 等待发布完成
-            await asyncio.sleep(5)
+            # 等待发布完成（跳转离开发布页，或出现提示/输入框清空）
+            await wait_for_function(
+                page,
+                f"() => !location.href.includes('weitoutiao') || location.href.includes('success') || ({_PUBLISH_SETTLED_JS})()",
+                budget.timeout('publish_result')
+            )
 
             # 检查是否发布成功
-            current_url = self.page.url
+            current_url = page.url
             if "weitoutiao" not in current_url or "success" in current_url:
                 print("微头条发布成功")
                 return {
@@ -1258,10 +1512,7 @@ class ToutiaoClient:
                 }
             else:
                 # 检查是否有错误提示
-                error_msg = await self.page.evaluate('''() => {
-                    const errorEl = document.querySelector('.error-message, .toast-error, [class*="error"]');
-                    return errorEl ? errorEl.textContent : '';
-                }''')
+                error_msg = await call_helper(page, 'errorText')
                 if error_msg:
                     return {
                         "success": False,
@@ -1282,6 +1533,8 @@ class ToutiaoClient:
                 "success": False,
                 "message": f"发布失败: {str(e)}"
             }
+        finally:
+            await self.page_pool.release(page)
 
 
 # 单例模式
@@ -0,0 +1,240 @@
+"""耗时追踪模块 - 记录带嵌套关系的 span 并输出到 JSONL
+
+启用方式：配置 tracing.enabled: true，或设置环境变量 TOUTIAO_TRACE=1。
+每次运行写入 tracing.dir 下的一个 trace-*.jsonl 文件，
+用 `toutiao-agent profile <trace>` 查看各操作的分位耗时和关键路径。
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import config
+
+# 当前 span ID（asyncio 任务创建时会复制上下文，子任务自动继承父 span）
+_current_span: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar('current_span', default=None)
+
+
+class Tracer:
+    """span 记录器"""
+
+    def __init__(self):
+        self._enabled: Optional[bool] = None
+        self._file = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self.path: Optional[Path] = None
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用追踪（首次访问时读取配置）"""
+        if self._enabled is None:
+            self._enabled = bool(os.getenv('TOUTIAO_TRACE') or config.get('tracing.enabled', False))
+        return self._enabled
+
+    def _open(self):
+        """打开本次运行的 trace 文件"""
+        trace_dir = Path(config.get('tracing.dir', 'data/traces'))
+        trace_dir.mkdir(parents=True, exist_ok=True)
+        run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+        self.path = trace_dir / f"trace-{run_id}.jsonl"
+        self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+        print(f"[trace] 耗时追踪写入: {self.path}")
+
+    def _emit(self, record: Dict):
+        """写入一条 span 记录"""
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """记录一个 span（未启用时几乎无开销）
+
+        Args:
+            name: 操作名，如 navigate、wait.selector、storage.add_comment
+            **attrs: 附加属性（需可 JSON 序列化）
+        """
+        if not self.enabled:
+            yield
+            return
+
+        with self._lock:
+            self._next_id += 1
+            span_id = self._next_id
+        parent = _current_span.get()
+        token = _current_span.set(span_id)
+        start = time.time()
+        t0 = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            record = {
+                'id': span_id,
+                'parent': parent,
+                'name': name,
+                'start': start,
+                'dur_ms': (time.perf_counter() - t0) * 1000,
+            }
+            if attrs:
+                record['attrs'] = attrs
+            if error:
+                record['error'] = error
+            self._emit(record)
+
+    def close(self):
+        """关闭 trace 文件"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+tracer = Tracer()
+
+
+def traced(name: Optional[str] = None):
+    """为同步或异步函数记录 span 的装饰器
+
+    Args:
+        name: span 名，默认使用函数的 __qualname__
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return await func(*args, **kwargs)
+                with tracer.span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+async def sleep(seconds: float):
+    """带 span 记录的 asyncio.sleep"""
+    import asyncio
+    with tracer.span('sleep', seconds=seconds):
+        await asyncio.sleep(seconds)
+
+
+# ============ trace 分析 ============
+
+def load_spans(path: str) -> List[Dict]:
+    """读取 trace 文件
+
+    Args:
+        path: trace JSONL 文件路径
+
+    Returns:
+        List[Dict]: span 记录列表（补充 end 字段，单位秒）
+    """
+    spans = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            span = json.loads(line)
+            span['end'] = span['start'] + span['dur_ms'] / 1000
+            spans.append(span)
+    return spans
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """最近秩法计算分位数
+
+    Args:
+        sorted_values: 已排序的数值
+        p: 分位（0-100）
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(spans: List[Dict]) -> List[Dict]:
+    """按操作名统计次数、总耗时和 p50/p95/p99
+
+    Returns:
+        List[Dict]: 按总耗时倒序的统计列表
+    """
+    durations: Dict[str, List[float]] = {}
+    for span in spans:
+        durations.setdefault(span['name'], []).append(span['dur_ms'])
+
+    rows = []
+    for name, values in durations.items():
+        values.sort()
+        rows.append({
+            'name': name,
+            'count': len(values),
+            'total_ms': sum(values),
+            'p50': percentile(values, 50),
+            'p95': percentile(values, 95),
+            'p99': percentile(values, 99),
+        })
+    rows.sort(key=lambda r: r['total_ms'], reverse=True)
+    return rows
+
+
+def critical_path(spans: List[Dict]) -> Dict[str, float]:
+    """计算关键路径上各操作的耗时（毫秒）
+
+    从每个根 span 的结束时刻向前回溯：每次选取在游标之前最晚结束的子 span
+    计入关键路径并递归展开，子 span 之间的空隙计为父 span 的自身耗时。
+
+    Returns:
+        Dict[str, float]: 操作名 -> 关键路径耗时（"<名称> (self)" 表示自身耗时）
+    """
+    children: Dict[Optional[int], List[Dict]] = {}
+    for span in spans:
+        children.setdefault(span['parent'], []).append(span)
+
+    breakdown: Dict[str, float] = {}
+
+    def add(name: str, seconds: float):
+        if seconds > 0:
+            breakdown[name] = breakdown.get(name, 0.0) + seconds * 1000
+
+    def walk(span: Dict):
+        cursor = span['end']
+        kids = sorted(children.get(span['id'], []), key=lambda s: s['end'], reverse=True)
+        for kid in kids:
+            if kid['end'] > cursor or kid['start'] < span['start']:
+                continue
+            add(f"{span['name']} (self)", cursor - kid['end'])
+            walk(kid)
+            cursor = kid['start']
+        add(f"{span['name']} (self)" if kids else span['name'], cursor - span['start'])
+
+    for root in children.get(None, []):
+        walk(root)
+    return breakdown
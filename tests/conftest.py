@@ -0,0 +1,49 @@
+"""测试公共 fixture"""
+
+import pytest
+
+from toutiao_agent import storage as storage_module
+from toutiao_agent.storage import CommentStorage
+
+
+class FakeClock:
+    """可手动推进的时钟，替换被测模块的 time 属性（不影响事件循环的计时）"""
+
+    def __init__(self, monkeypatch, now: float = 100.0):
+        self._monkeypatch = monkeypatch
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def install(self, *modules) -> 'FakeClock':
+        """让给定模块使用此时钟"""
+        for module in modules:
+            self._monkeypatch.setattr(module, 'time', self)
+        return self
+
+
+@pytest.fixture
+def fake_clock(monkeypatch) -> FakeClock:
+    """共享的假时钟，测试中用 fake_clock.install(module) 替换模块的 time"""
+    return FakeClock(monkeypatch)
+
+
+@pytest.fixture
+def make_storage(tmp_path, monkeypatch):
+    """创建使用临时数据库的 CommentStorage，关键字参数覆盖 storage 配置"""
+    created = []
+
+    def factory(**settings) -> CommentStorage:
+        for key, value in settings.items():
+            monkeypatch.setitem(storage_module.DEFAULT_STORAGE_SETTINGS, key, value)
+        instance = CommentStorage(str(tmp_path / 'comments.db'))
+        created.append(instance)
+        return instance
+
+    yield factory
+    for instance in created:
+        instance.close()
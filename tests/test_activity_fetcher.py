@@ -0,0 +1,335 @@
+"""活动分页拉取、分类并发与流式产出测试"""
+
+import asyncio
+from typing import Dict, List
+
+import httpx
+import pytest
+
+from toutiao_agent import activity_fetcher
+from toutiao_agent.activity_fetcher import Activity, ActivityFetcher, filter_activities
+
+PAGE_SIZE = 10
+
+
+class FakeActivityApi:
+    """按 offset/limit/category 返回活动列表的模拟接口"""
+
+    def __init__(self, catalogue: Dict[str, List[int]], fail_offsets=(), categories=()):
+        self.catalogue = catalogue
+        self.fail_offsets = set(fail_offsets)
+        self.categories = list(categories)
+        self.requests = []  # (category, offset)
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith('/get_all_category/'):
+            return httpx.Response(200, json={
+                'code': 0, 'data': [{'name': name} for name in self.categories]
+            })
+        params = request.url.params
+        category, offset, limit = params['category'], int(params['offset']), int(params['limit'])
+        self.requests.append((category, offset))
+        if offset in self.fail_offsets:
+            return httpx.Response(500)
+        ids = self.catalogue.get(category, [])[offset:offset + limit]
+        return httpx.Response(200, json={'code': 0, 'data': {'activity_list': [
+            {'activity_id': activity_id, 'title': f'活动{activity_id}'} for activity_id in ids
+        ]}})
+
+    def offsets(self, category: str = '全部') -> List[int]:
+        return sorted(offset for name, offset in self.requests if name == category)
+
+
+def make_fetcher(tmp_path, **settings) -> ActivityFetcher:
+    fetcher = ActivityFetcher(cookie_file=str(tmp_path / 'cookies.json'))
+    # 不受限流的主机，测试不等待令牌
+    fetcher.API_BASE = 'https://api.test/mp/agw/activity'
+    fetcher.cache = None
+    fetcher.settings.update({
+        'retries': 0, 'hedge_after': 0, 'page_size': PAGE_SIZE, 'max_pages': 20, **settings
+    })
+    return fetcher
+
+
+def run(fetcher: ActivityFetcher, api, coro_fn):
+    """在新事件循环中让 fetcher 使用模拟接口运行 coro_fn()"""
+    async def main():
+        fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(api))
+        fetcher._client_loop = asyncio.get_running_loop()
+        try:
+            return await coro_fn()
+        finally:
+            await fetcher.aclose()
+
+    return asyncio.run(main())
+
+
+def ids(activities) -> List[int]:
+    return [a.activity_id for a in activities]
+
+
+# ============ fetch_all_activities_async ============
+
+def test_fetches_every_page_and_stops_at_short_page(tmp_path):
+    fetcher = make_fetcher(tmp_path, max_in_flight=3)
+    api = FakeActivityApi({'全部': list(range(1, 46))})
+
+    activities = run(fetcher, api, lambda: fetcher.fetch_all_activities_async(only_ongoing=False))
+
+    assert ids(activities) == list(range(1, 46))
+    # 第 5 页（offset 40）不满即停止；窗口内已发出的后续请求最多 max_in_flight 个
+    assert api.offsets()[:5] == [0, 10, 20, 30, 40]
+    assert max(api.offsets()) <= 40 + 3 * PAGE_SIZE
+
+
+def test_dedupes_activities_that_shift_between_pages(tmp_path):
+    fetcher = make_fetcher(tmp_path)
+    # 分页期间新增活动导致第 2 页开头重复第 1 页末尾
+    api = FakeActivityApi({'全部': list(range(1, 11)) + [10] + list(range(11, 15))})
+
+    activities = run(fetcher, api, lambda: fetcher.fetch_all_activities_async(only_ongoing=False))
+
+    assert ids(activities) == list(range(1, 15))
+
+
+def test_max_pages_bounds_the_window(tmp_path):
+    fetcher = make_fetcher(tmp_path, max_in_flight=8)
+    api = FakeActivityApi({'全部': list(range(1, 1000))})
+
+    activities = run(fetcher, api, lambda: fetcher.fetch_all_activities_async(
+        only_ongoing=False, max_pages=3
+    ))
+
+    assert ids(activities) == list(range(1, 31))
+    assert api.offsets() == [0, 10, 20]
+
+
+def test_failed_page_returns_none_instead_of_truncating(tmp_path, capsys):
+    fetcher = make_fetcher(tmp_path, max_in_flight=2)
+    api = FakeActivityApi({'全部': list(range(1, 46))}, fail_offsets=[20])
+
+    assert run(fetcher, api, lambda: fetcher.fetch_all_activities_async(only_ongoing=False)) is None
+    assert '第 3 页获取失败' in capsys.readouterr().out
+
+
+def test_failure_after_the_last_page_is_ignored(tmp_path):
+    fetcher = make_fetcher(tmp_path, max_in_flight=4)
+    # 第 2 页已不满，之后的请求即使失败也不影响结果
+    api = FakeActivityApi({'全部': list(range(1, 16))}, fail_offsets=[20, 30])
+
+    activities = run(fetcher, api, lambda: fetcher.fetch_all_activities_async(only_ongoing=False))
+
+    assert ids(activities) == list(range(1, 16))
+
+
+# ============ fetch_activities_by_category_async ============
+
+def test_fans_out_across_categories_and_tags_activities(tmp_path):
+    fetcher = make_fetcher(tmp_path)
+    api = FakeActivityApi({
+        '全部': [1, 2, 3, 4],
+        '科技': [1, 2],
+        '体育': [2, 3],
+    }, categories=['科技', '体育'])
+
+    activities = run(fetcher, api, lambda: fetcher.fetch_activities_by_category_async(only_ongoing=False))
+
+    assert {a.activity_id: a.categories for a in activities} == {
+        1: ('科技',),
+        2: ('科技', '体育'),
+        3: ('体育',),
+        4: (),  # 只出现在"全部"中，不作为标签
+    }
+    assert {name for name, _ in api.requests} == {'全部', '科技', '体育'}
+
+
+def test_explicit_categories_skip_the_category_request(tmp_path):
+    fetcher = make_fetcher(tmp_path)
+    api = FakeActivityApi({'全部': [1, 2], '科技': [2]}, categories=['科技', '体育'])
+
+    activities = run(fetcher, api, lambda: fetcher.fetch_activities_by_category_async(
+        ['全部', '科技', ''], only_ongoing=False
+    ))
+
+    assert {a.activity_id: a.categories for a in activities} == {1: (), 2: ('科技',)}
+    assert {name for name, _ in api.requests} == {'全部', '科技'}
+
+
+def test_category_requests_run_concurrently(tmp_path):
+    # 每个分类同时只发一个分页请求，峰值即为同时拉取的分类数
+    fetcher = make_fetcher(tmp_path, max_in_flight=1)
+    in_flight = 0
+    peak = 0
+    api = FakeActivityApi({'全部': [1], '科技': [1], '体育': [1]})
+
+    async def slow_api(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return api(request)
+
+    run(fetcher, slow_api, lambda: fetcher.fetch_activities_by_category_async(
+        ['科技', '体育'], only_ongoing=False
+    ))
+
+    assert peak == 3
+
+
+def test_failed_category_returns_empty_list(tmp_path):
+    fetcher = make_fetcher(tmp_path)
+    api = FakeActivityApi({'全部': [1, 2], '科技': [1]})
+
+    def flaky(request):
+        if request.url.params.get('category') == '科技':
+            return httpx.Response(503)
+        return api(request)
+
+    assert run(fetcher, flaky, lambda: fetcher.fetch_activities_by_category_async(
+        ['科技'], only_ongoing=False
+    )) == []
+
+
+# ============ filter_activities / Activity ============
+
+def make_activity(activity_id, end_time=0, part_in=0, categories=()):
+    return Activity.from_api(
+        {'activity_id': activity_id, 'activity_end_time': end_time, 'part_in': part_in},
+        categories=categories
+    )
+
+
+def test_filter_activities_combines_conditions():
+    now = 1000.0
+    activities = [
+        make_activity(1),                           # 长期活动
+        make_activity(2, end_time=999),             # 已过期
+        make_activity(3, end_time=2000, part_in=1), # 已参与
+        make_activity(4, end_time=2000, categories=('科技',)),
+        make_activity(5, end_time=2000, categories=('体育',)),
+    ]
+
+    assert ids(filter_activities(activities, now=now)) == [1, 2, 3, 4, 5]
+    assert ids(filter_activities(activities, only_ongoing=True, now=now)) == [1, 3, 4, 5]
+    assert ids(filter_activities(activities, only_unparticipated=True, now=now)) == [1, 2, 4, 5]
+    assert ids(filter_activities(activities, category='科技', now=now)) == [4]
+    assert ids(filter_activities(activities, category='全部', now=now)) == [1, 2, 3, 4, 5]
+    assert ids(filter_activities(activities, exclude_ids=['1', '5'], now=now)) == [2, 3, 4]
+    assert ids(filter_activities(
+        activities, only_ongoing=True, only_unparticipated=True, exclude_ids={'4'}, now=now
+    )) == [1, 5]
+
+
+def test_filter_activities_uses_one_now_per_batch(fake_clock, monkeypatch):
+    clock = fake_clock.install(activity_fetcher)
+    clock.now = 1000.0
+    calls = []
+    monkeypatch.setattr(clock, 'time', lambda: calls.append(1) or clock.now)
+    activities = [make_activity(i, end_time=999 + i) for i in range(5)]
+
+    assert ids(filter_activities(activities, only_ongoing=True)) == [1, 2, 3, 4]
+    assert len(calls) == 1
+
+
+def test_activity_is_a_compact_frozen_record():
+    activity = Activity.from_api({'activity_id': 1, 'title': '话题 #测试#'}, keep_raw=True)
+    assert not hasattr(activity, '__dict__')
+    with pytest.raises(AttributeError):
+        activity.title = 'x'
+    assert activity.raw_data == {'activity_id': 1, 'title': '话题 #测试#'}
+    assert Activity.from_api({'activity_id': 1}).raw_data is None
+    assert activity.get_hashtag() == '#测试#'
+    assert activity.is_expired(now=1e12) is False
+
+
+# ============ iter_activities ============
+
+def collect(fetcher, api, **kwargs):
+    async def main():
+        return [a async for a in fetcher.iter_activities(only_ongoing=False, **kwargs)]
+
+    return run(fetcher, api, main)
+
+
+def test_iter_yields_pages_in_order_and_stops_at_short_page(tmp_path):
+    fetcher = make_fetcher(tmp_path)
+    api = FakeActivityApi({'全部': list(range(1, 26))})
+
+    assert ids(collect(fetcher, api, prefetch=2)) == list(range(1, 26))
+    # 第 3 页不满；预取窗口内最多多请求 prefetch 页
+    assert api.offsets()[:3] == [0, 10, 20]
+    assert max(api.offsets()) <= 20 + 2 * PAGE_SIZE
+
+
+def test_iter_prefetches_the_next_page_while_consuming(tmp_path):
+    fetcher = make_fetcher(tmp_path)
+    api = FakeActivityApi({'全部': list(range(1, 100))})
+
+    async def main():
+        stream = fetcher.iter_activities(only_ongoing=False, prefetch=1)
+        first = await stream.__anext__()
+        # 消费第一页时下一页已在请求，不等调用方取完本页
+        await asyncio.sleep(0.01)
+        requested = api.offsets()
+        await stream.aclose()
+        return first, requested
+
+    first, requested = run(fetcher, api, main)
+    assert first.activity_id == 1
+    assert 10 in requested
+
+
+def test_iter_exclude_accepts_sync_and_async_callables(tmp_path):
+    api = FakeActivityApi({'全部': list(range(1, 16))})
+    pages = []
+
+    def exclude(page_ids):
+        pages.append(page_ids)
+        return {'2', '12'}
+
+    async def exclude_async(page_ids):
+        return {'3'}
+
+    fetcher = make_fetcher(tmp_path)
+    assert ids(collect(fetcher, api, exclude=exclude)) == [i for i in range(1, 16) if i not in (2, 12)]
+    # 每页只查询一次，传入字符串 ID
+    assert pages == [[str(i) for i in range(1, 11)], [str(i) for i in range(11, 16)]]
+
+    fetcher = make_fetcher(tmp_path)
+    assert ids(collect(fetcher, api, exclude=exclude_async)) == [i for i in range(1, 16) if i != 3]
+
+
+def test_iter_early_exit_cancels_prefetched_requests(tmp_path):
+    fetcher = make_fetcher(tmp_path)
+    api = FakeActivityApi({'全部': list(range(1, 100))})
+    cancelled = []
+
+    async def blocking_api(request):
+        if int(request.url.params['offset']) > 0:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(int(request.url.params['offset']))
+                raise
+        return api(request)
+
+    async def main():
+        stream = fetcher.iter_activities(only_ongoing=False, prefetch=2)
+        async for activity in stream:
+            if activity.activity_id == 3:
+                break
+        await stream.aclose()
+        await asyncio.sleep(0)
+        return len(asyncio.all_tasks()) - 1
+
+    assert run(fetcher, blocking_api, main) == 0
+    assert {10, 20} <= set(cancelled)
+
+
+def test_iter_reports_a_failed_page_and_stops(tmp_path, capsys):
+    fetcher = make_fetcher(tmp_path)
+    api = FakeActivityApi({'全部': list(range(1, 46))}, fail_offsets=[10])
+
+    assert ids(collect(fetcher, api, prefetch=1)) == list(range(1, 11))
+    assert '第 2 页获取失败' in capsys.readouterr().out
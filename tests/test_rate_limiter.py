@@ -0,0 +1,75 @@
+"""AdaptiveRateLimiter（GCRA + AIMD）测试"""
+
+import asyncio
+
+import pytest
+
+from toutiao_agent import rate_limiter
+from toutiao_agent.rate_limiter import AdaptiveRateLimiter
+
+
+def make_limiter(fake_clock, **overrides):
+    clock = fake_clock.install(rate_limiter)
+    params = dict(rate=10.0, min_rate=1.0, max_rate=20.0, burst=3,
+                  increase=1.0, decrease=0.5, cooldown=1.0, name='test')
+    params.update(overrides)
+    return AdaptiveRateLimiter(**params), clock
+
+
+def test_burst_then_spacing(fake_clock):
+    limiter, _ = make_limiter(fake_clock)
+    delays = [limiter._reserve()[0] for _ in range(5)]
+    assert delays[:3] == [0.0, 0.0, 0.0]
+    assert delays[3] > 0
+    assert delays[4] - delays[3] == pytest.approx(0.1)
+
+
+def test_tokens_refill_over_time(fake_clock):
+    limiter, clock = make_limiter(fake_clock)
+    for _ in range(3):
+        limiter._reserve()
+    clock.now += 1.0
+    assert limiter._reserve()[0] == 0.0
+
+
+def test_success_increases_rate_up_to_max(fake_clock):
+    limiter, _ = make_limiter(fake_clock, rate=19.5)
+    limiter.on_success()
+    assert limiter.rate == 20.0
+    limiter.on_success()
+    assert limiter.rate == 20.0
+
+
+def test_throttle_decreases_once_per_cooldown(fake_clock):
+    limiter, clock = make_limiter(fake_clock)
+    limiter.on_throttle('HTTP 429')
+    assert limiter.rate == 5.0
+    limiter.on_throttle('HTTP 429')
+    assert limiter.rate == 5.0
+    clock.now += 1.5
+    limiter.on_throttle('HTTP 429')
+    assert limiter.rate == 2.5
+
+
+def test_throttle_respects_min_rate(fake_clock):
+    limiter, _ = make_limiter(fake_clock, rate=1.5)
+    limiter.on_throttle('超时')
+    assert limiter.rate == 1.0
+
+
+def test_cancelled_waiters_return_their_reservations():
+    limiter = AdaptiveRateLimiter(rate=10.0, min_rate=1.0, max_rate=20.0, burst=1,
+                                  increase=0.0, decrease=0.5, cooldown=1.0)
+
+    async def run():
+        await limiter.acquire()
+        waiters = [asyncio.create_task(limiter.acquire()) for _ in range(20)]
+        await asyncio.sleep(0.01)
+        for task in waiters:
+            task.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        # 20 个被取消的预约都已归还，下一个请求只需等待一个间隔
+        delay, _ = limiter._reserve()
+        return delay
+
+    assert asyncio.run(run()) < 0.2
@@ -0,0 +1,252 @@
+"""熔断器、重试与对冲请求测试"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from toutiao_agent import activity_fetcher, resilience
+from toutiao_agent.activity_fetcher import ActivityFetcher
+from toutiao_agent.resilience import CircuitBreaker, backoff_delay
+from toutiao_agent.response_cache import ResponseCache
+
+# 不受限流的主机，测试不等待令牌
+URL = 'https://api.test/mp/agw/activity/list'
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock.install(resilience)
+
+
+# ============ CircuitBreaker ============
+
+def test_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.record_failure()
+        assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.retry_after() == pytest.approx(30)
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_probe_success_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_probe_failure_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_release_frees_the_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_zero_threshold_never_opens(clock):
+    breaker = CircuitBreaker(failure_threshold=0, reset_timeout=30)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.allow()
+
+
+def test_backoff_delay_bounds():
+    for attempt in range(1, 10):
+        delay = backoff_delay(attempt, base=0.5, cap=5.0)
+        assert 0 <= delay <= min(5.0, 0.5 * 2 ** (attempt - 1))
+
+
+# ============ ActivityFetcher 重试/对冲 ============
+
+def make_fetcher(tmp_path, **settings) -> ActivityFetcher:
+    fetcher = ActivityFetcher(cookie_file=str(tmp_path / 'cookies.json'))
+    fetcher.cache = ResponseCache(str(tmp_path / 'cache'), ttl=60, stale_ttl=3600)
+    fetcher.settings.update({'retry_backoff': 0, 'retry_backoff_max': 0, 'hedge_after': 0, **settings})
+    fetcher.breaker = CircuitBreaker(
+        int(fetcher.settings['breaker_threshold']), float(fetcher.settings['breaker_reset'])
+    )
+    return fetcher
+
+
+def use_transport(fetcher: ActivityFetcher, handler):
+    """让 fetcher 在当前事件循环中使用 MockTransport（在协程内调用）"""
+    fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    fetcher._client_loop = asyncio.get_running_loop()
+
+
+def test_retries_retryable_status_then_succeeds(tmp_path):
+    fetcher = make_fetcher(tmp_path, retries=2)
+    statuses = iter([503, 429, 200])
+
+    def handler(request):
+        status = next(statuses)
+        return httpx.Response(status, json={'code': 0} if status == 200 else {})
+
+    async def run():
+        use_transport(fetcher, handler)
+        return await fetcher._request(URL)
+
+    assert asyncio.run(run()) == {'code': 0}
+    assert fetcher.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_exhausted_retries_count_as_one_breaker_failure(tmp_path):
+    fetcher = make_fetcher(tmp_path, retries=1, breaker_threshold=2)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500)
+
+    async def run():
+        use_transport(fetcher, handler)
+        first = await fetcher._request(URL)
+        second = await fetcher._request(URL)
+        third = await fetcher._request(URL)
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first['success'] is False and second['success'] is False
+    assert len(calls) == 4  # 两次请求各重试一次，第三次被熔断
+    assert '熔断' in third['error']
+
+
+def test_non_retryable_status_is_not_retried(tmp_path):
+    fetcher = make_fetcher(tmp_path, retries=3)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(404)
+
+    async def run():
+        use_transport(fetcher, handler)
+        return await fetcher._request(URL)
+
+    assert asyncio.run(run())['error'] == 'HTTP 错误: 404'
+    assert len(calls) == 1
+
+
+def test_unparseable_responses_trip_the_breaker(tmp_path):
+    fetcher = make_fetcher(tmp_path, retries=1, breaker_threshold=2)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, text='<html>维护中</html>')
+
+    async def run():
+        use_transport(fetcher, handler)
+        return [await fetcher._request(URL) for _ in range(3)]
+
+    first, _, third = asyncio.run(run())
+    assert first['error'].startswith('响应异常')
+    assert len(calls) == 4
+    assert fetcher.breaker.state == CircuitBreaker.OPEN
+    assert '熔断' in third['error']
+
+
+def test_hedge_returns_first_success_and_cancels_the_other(tmp_path):
+    fetcher = make_fetcher(tmp_path, hedge_after=0.01)
+    cancelled = []
+
+    async def attempt(url):
+        first = not hasattr(attempt, 'started')
+        attempt.started = True
+        if first:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(url)
+                raise
+        return {'code': 0, 'hedged': True}, False
+
+    fetcher._attempt = attempt
+    assert asyncio.run(fetcher._attempt_hedged(URL)) == ({'code': 0, 'hedged': True}, False)
+    assert cancelled == [URL]
+
+
+def test_cancelled_caller_cancels_hedged_requests_and_releases_probe(tmp_path, clock):
+    fetcher = make_fetcher(tmp_path, hedge_after=0.01, breaker_threshold=1, breaker_reset=30)
+    fetcher.breaker.record_failure()
+    clock.now += 31
+    started, cancelled = [], []
+
+    async def attempt(url):
+        started.append(url)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(url)
+            raise
+        return {}, False
+
+    fetcher._attempt = attempt
+
+    async def run():
+        task = asyncio.create_task(fetcher._request(URL))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return len(asyncio.all_tasks()) - 1
+
+    assert asyncio.run(run()) == 0
+    assert len(started) == 2 and len(cancelled) == 2
+    # 探测机会已释放，下一个请求可以继续探测
+    assert fetcher.breaker.allow()
+
+
+@pytest.mark.parametrize('response, state', [
+    (httpx.Response(500), CircuitBreaker.OPEN),
+    (httpx.Response(429), CircuitBreaker.OPEN),
+    (httpx.Response(200, content=b'not json'), CircuitBreaker.OPEN),
+    (httpx.Response(200, json={'code': 0}), CircuitBreaker.CLOSED),
+])
+def test_background_refresh_settles_the_probe(tmp_path, clock, monkeypatch, response, state):
+    fetcher = make_fetcher(tmp_path, breaker_threshold=1, breaker_reset=30)
+    fetcher.breaker.record_failure()
+    clock.now += 31
+    response.request = httpx.Request('GET', URL)
+    monkeypatch.setattr(activity_fetcher.httpx, 'get', lambda *args, **kwargs: response)
+
+    fetcher._refresh_blocking(URL)
+
+    assert fetcher.breaker.state == state
+    assert not fetcher.breaker._probing
@@ -0,0 +1,92 @@
+"""ResponseCache 新鲜期/过期可用期测试"""
+
+import asyncio
+import json
+
+import httpx
+
+from toutiao_agent import response_cache
+from toutiao_agent.activity_fetcher import ActivityFetcher
+from toutiao_agent.response_cache import ResponseCache
+
+
+def make_cache(tmp_path, fake_clock, ttl=60, stale_ttl=3600):
+    clock = fake_clock.install(response_cache)
+    return ResponseCache(str(tmp_path / 'cache'), ttl=ttl, stale_ttl=stale_ttl), clock
+
+
+def test_miss_returns_none(tmp_path, fake_clock):
+    cache, _ = make_cache(tmp_path, fake_clock)
+    assert cache.get('https://example.com/a') is None
+
+
+def test_fresh_then_stale_then_expired(tmp_path, fake_clock):
+    cache, clock = make_cache(tmp_path, fake_clock)
+    cache.set('https://example.com/a', {'code': 0, 'data': [1]})
+
+    assert cache.get('https://example.com/a') == ({'code': 0, 'data': [1]}, True)
+
+    clock.now += 61
+    assert cache.get('https://example.com/a') == ({'code': 0, 'data': [1]}, False)
+
+    clock.now += 3600
+    assert cache.get('https://example.com/a') is None
+
+
+def test_stale_ttl_never_shorter_than_ttl(tmp_path, fake_clock):
+    cache, clock = make_cache(tmp_path, fake_clock, ttl=120, stale_ttl=10)
+    cache.set('k', 1)
+    clock.now += 100
+    assert cache.get('k') == (1, True)
+
+
+def test_key_mismatch_is_a_miss(tmp_path, fake_clock):
+    cache, _ = make_cache(tmp_path, fake_clock)
+    cache.set('k1', 'v')
+    # 模拟哈希冲突：文件内容属于另一个键
+    cache._path('k1').rename(cache._path('k2'))
+    assert cache.get('k2') is None
+
+
+def test_corrupt_file_is_a_miss(tmp_path, fake_clock):
+    cache, _ = make_cache(tmp_path, fake_clock)
+    cache.set('k', 'v')
+    cache._path('k').write_text('{not json', encoding='utf-8')
+    assert cache.get('k') is None
+
+
+def test_clear_removes_entries(tmp_path, fake_clock):
+    cache, _ = make_cache(tmp_path, fake_clock)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.clear()
+    assert cache.get('a') is None and cache.get('b') is None
+
+
+def test_fetcher_cache_is_keyed_by_login_session(tmp_path):
+    cookie_file = tmp_path / 'cookies.json'
+
+    def login(sessionid):
+        cookie_file.write_text(json.dumps({'cookies': [
+            {'name': 'sessionid', 'value': sessionid, 'domain': '.api.test', 'path': '/'},
+        ]}), encoding='utf-8')
+        fetcher = ActivityFetcher(cookie_file=str(cookie_file))
+        fetcher.cache = ResponseCache(str(tmp_path / 'cache'), ttl=60, stale_ttl=3600)
+        return fetcher
+
+    def run(fetcher, sessionid):
+        def handler(request):
+            return httpx.Response(200, json={'code': 0, 'session': sessionid})
+
+        async def request():
+            fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            fetcher._client_loop = asyncio.get_running_loop()
+            return await fetcher._make_request('https://api.test/list')
+
+        return asyncio.run(request())
+
+    assert run(login('a'), 'a')['session'] == 'a'
+    # 同一会话命中缓存
+    assert run(login('a'), 'other')['session'] == 'a'
+    # 重新登录后不读上一个会话的缓存
+    assert run(login('b'), 'b')['session'] == 'b'
@@ -0,0 +1,94 @@
+"""本地活动表同步测试"""
+
+import time
+
+from toutiao_agent.activity_fetcher import Activity
+
+
+def activity(activity_id, categories=(), **data):
+    return Activity.from_api(
+        {'activity_id': activity_id, 'title': f'活动{activity_id}', **data},
+        categories=categories, keep_raw=True
+    )
+
+
+def stored(storage, activity_id):
+    rows = storage.get_activities(only_ongoing=False, only_unparticipated=False)
+    return next(row for row in rows if row['activity_id'] == activity_id)
+
+
+def test_sync_reports_new_updated_and_participated(make_storage):
+    storage = make_storage()
+    assert storage.sync_activities([activity(1), activity(2)]) == {
+        'new': ['1', '2'], 'updated': [], 'participated': [], 'ended': [],
+    }
+
+    # 内容未变化的活动不写入也不上报
+    assert storage.sync_activities([activity(1), activity(2)]) == {
+        'new': [], 'updated': [], 'participated': [], 'ended': [],
+    }
+
+    changes = storage.sync_activities([
+        activity(1, title='新标题'),
+        activity(2, part_in=1),
+        activity(3),
+    ])
+    assert changes == {'new': ['3'], 'updated': ['1', '2'], 'participated': ['2'], 'ended': []}
+    assert stored(storage, 1)['title'] == '新标题'
+    assert stored(storage, 2)['part_in'] == 1
+
+
+def test_sync_marks_ended_activities(make_storage):
+    storage = make_storage()
+    past = int(time.time()) - 60
+    future = int(time.time()) + 3600
+    changes = storage.sync_activities([
+        activity(1, activity_end_time=past),
+        activity(2, activity_end_time=future),
+        activity(3),
+    ])
+    assert changes['ended'] == ['1']
+    # 已标记的活动不会重复上报
+    assert storage.mark_ended_activities() == []
+    assert [row['activity_id'] for row in storage.get_activities()] == [2, 3]
+
+
+def test_mark_ended_activities_uses_given_time(make_storage):
+    storage = make_storage()
+    base = int(time.time()) + 3600
+    storage.sync_activities([
+        activity(1, activity_end_time=base + 100),
+        activity(2, activity_end_time=base + 200),
+        activity(3),
+    ])
+    assert storage.mark_ended_activities(now=base + 150) == ['1']
+    assert storage.mark_ended_activities(now=base + 250) == ['2']
+    # 长期活动（结束时间为 0）不会被标记
+    assert storage.mark_ended_activities(now=1e12) == []
+
+
+def test_categories_change_and_clear(make_storage):
+    storage = make_storage()
+    storage.sync_activities([activity(1, categories=('科技',))])
+    assert stored(storage, 1)['categories'] == ['科技']
+
+    assert storage.sync_activities([activity(1, categories=('体育', '科技'))])['updated'] == ['1']
+    assert stored(storage, 1)['categories'] == ['体育', '科技']
+
+    # 按分类抓取时空分类表示不再属于任何分类
+    assert storage.sync_activities([activity(1)])['updated'] == ['1']
+    assert stored(storage, 1)['categories'] == []
+    assert storage.sync_activities([activity(1)])['updated'] == []
+
+
+def test_sync_without_categories_keeps_stored_ones(make_storage):
+    storage = make_storage()
+    storage.sync_activities([activity(1, categories=('科技',))])
+
+    # 不是按分类抓取：保留已有分类，内容未变化时不算更新
+    assert storage.sync_activities([activity(1)], with_categories=False)['updated'] == []
+    assert storage.sync_activities(
+        [activity(1, title='新标题')], with_categories=False
+    )['updated'] == ['1']
+    assert stored(storage, 1)['categories'] == ['科技']
+    assert storage.get_activities(category='科技')[0]['title'] == '新标题'
@@ -0,0 +1,104 @@
+"""存储异步接口（storage.a_*）测试"""
+
+import asyncio
+import threading
+
+import pytest
+
+
+def test_async_calls_run_off_the_event_loop(make_storage):
+    storage = make_storage()
+    seen = {}
+
+    original = storage.is_commented
+
+    def is_commented(article_id):
+        seen['thread'] = threading.current_thread().name
+        return original(article_id)
+
+    storage.is_commented = is_commented
+
+    async def run():
+        assert await storage.a_add_comment('1', 't', 'u', 'c') is True
+        # await 返回时写入已提交，随后的查询能读到
+        return await storage.a_is_commented('1')
+
+    assert asyncio.run(run()) is True
+    assert seen['thread'].startswith('storage-reader')
+
+
+def test_writes_run_in_call_order_on_one_thread(make_storage):
+    storage = make_storage()
+
+    async def run():
+        await asyncio.gather(*(
+            storage.a_add_activity_participation(str(i), operation_type='x') for i in range(20)
+        ))
+        return await storage.a_get_activity_participations(limit=50)
+
+    records = asyncio.run(run())
+    assert [r['activity_id'] for r in reversed(records)] == [str(i) for i in range(20)]
+
+
+def test_concurrent_reads(make_storage):
+    storage = make_storage(async_readers=3)
+    storage.add_comments_many([{'article_id': str(i)} for i in range(10)])
+
+    async def run():
+        return await asyncio.gather(*(storage.a_get_commented_ids([str(i), 'x']) for i in range(20)))
+
+    results = asyncio.run(run())
+    assert results == [{str(i)} for i in range(10)] + [set()] * 10
+
+
+def test_sync_api_still_works_alongside(make_storage):
+    storage = make_storage()
+
+    async def run():
+        await storage.a_add_comment('1', 't', 'u', 'c')
+
+    asyncio.run(run())
+    assert storage.is_commented('1')
+    assert storage.get_comment_count() == 1
+
+
+@pytest.mark.parametrize('name', ['a_close', 'a_flush', 'a__init_db', 'a_settings', 'a_missing'])
+def test_only_allowlisted_methods_are_exposed(make_storage, name):
+    storage = make_storage()
+    with pytest.raises(AttributeError):
+        getattr(storage, name)
+
+
+def test_close_shuts_down_executors(make_storage):
+    storage = make_storage()
+
+    async def run():
+        await storage.a_add_comment('1', 't', 'u', 'c')
+
+    asyncio.run(run())
+    storage.close()
+    assert storage._writer is None and storage._readers is None
+    # 关闭后仍可继续使用（重新打开连接）
+    assert storage.is_commented('1')
+
+
+def test_slow_query_does_not_block_the_loop(make_storage):
+    storage = make_storage()
+    release = threading.Event()
+    original = storage.get_comment_count
+
+    def slow_count():
+        release.wait(2)
+        return original()
+
+    storage.get_comment_count = slow_count
+
+    async def run():
+        task = asyncio.ensure_future(storage.a_get_comment_count())
+        # 查询阻塞在线程池中时，事件循环仍能调度其他协程
+        await asyncio.sleep(0.01)
+        assert not task.done()
+        release.set()
+        return await task
+
+    assert asyncio.run(run()) == 0
@@ -0,0 +1,59 @@
+"""批量查询（已评论/活动参与状态）测试"""
+
+
+def count_queries(storage):
+    """记录当前线程连接上执行的 SELECT 语句"""
+    queries = []
+    storage._get_connection().set_trace_callback(
+        lambda sql: queries.append(sql) if sql.lstrip().upper().startswith('SELECT') else None
+    )
+    return queries
+
+
+def test_get_commented_ids_in_one_query(make_storage):
+    storage = make_storage()
+    storage.add_comments_many([{'article_id': str(i)} for i in range(0, 500, 2)])
+    queries = count_queries(storage)
+
+    result = storage.get_commented_ids(str(i) for i in range(500))
+
+    assert result == {str(i) for i in range(0, 500, 2)}
+    assert len(queries) == 1
+
+
+def test_get_commented_ids_edge_cases(make_storage):
+    storage = make_storage()
+    storage.add_comment('1', 't', 'u', 'c')
+    assert storage.get_commented_ids([]) == set()
+    # 整数 ID 与重复 ID
+    assert storage.get_commented_ids([1, '1', 2]) == {'1'}
+
+
+def test_get_activity_statuses_matches_single_lookups(make_storage):
+    storage = make_storage()
+    storage.add_activity_participations_many([
+        {'activity_id': '1', 'operation_type': 'post', 'user_confirmed': True},
+        {'activity_id': '2', 'operation_type': 'skip_requires_app'},
+        {'activity_id': '3', 'operation_type': 'post'},
+        {'activity_id': '3', 'operation_type': 'post', 'user_confirmed': True},
+    ])
+    ids = ['1', '2', '3', '4']
+    queries = count_queries(storage)
+
+    statuses = storage.get_activity_statuses(ids)
+
+    assert len(queries) == 1
+    assert statuses == {
+        activity_id: {
+            'participated': storage.is_activity_participated(activity_id),
+            'processed': storage.is_activity_processed(activity_id),
+            'skipped_for_app': storage.is_activity_skipped_for_app(activity_id),
+        }
+        for activity_id in ids
+    }
+    assert statuses['3'] == {'participated': True, 'processed': True, 'skipped_for_app': False}
+    assert statuses['4'] == {'participated': False, 'processed': False, 'skipped_for_app': False}
+
+
+def test_get_activity_statuses_empty(make_storage):
+    assert make_storage().get_activity_statuses([]) == {}
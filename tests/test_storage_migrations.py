@@ -0,0 +1,104 @@
+"""SQLite 结构迁移测试"""
+
+import sqlite3
+
+import pytest
+
+from toutiao_agent import storage as storage_module
+from toutiao_agent.storage import SCHEMA_MIGRATIONS
+
+# 引入 user_version 之前的数据库结构（user_version = 0）
+LEGACY_SCHEMA = [
+    '''CREATE TABLE comments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        article_id TEXT NOT NULL UNIQUE,
+        title TEXT, url TEXT, content TEXT,
+        created_at TEXT NOT NULL
+    )''',
+    '''CREATE TABLE micro_headlines (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        activity_id TEXT, activity_title TEXT, content TEXT, hashtags TEXT, images TEXT,
+        status TEXT NOT NULL DEFAULT 'draft',
+        created_at TEXT NOT NULL, published_at TEXT
+    )''',
+    '''CREATE TABLE activity_participations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        activity_id TEXT NOT NULL, activity_title TEXT, operation_type TEXT,
+        confidence REAL, ai_analysis TEXT, user_confirmed INTEGER DEFAULT 0,
+        execution_result TEXT, created_at TEXT NOT NULL
+    )''',
+]
+
+
+def create_legacy_db(path):
+    conn = sqlite3.connect(path)
+    for sql in LEGACY_SCHEMA:
+        conn.execute(sql)
+    conn.execute("INSERT INTO comments (article_id, title, created_at) VALUES ('100', '旧评论', '2024-01-01')")
+    conn.execute(
+        "INSERT INTO activity_participations (activity_id, operation_type, user_confirmed, created_at) "
+        "VALUES ('7', 'skip_requires_app', 0, '2024-01-01')"
+    )
+    conn.commit()
+    conn.close()
+
+
+def index_names(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    finally:
+        conn.close()
+
+
+def user_version(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_migrates_version_zero_database(tmp_path, make_storage):
+    create_legacy_db(tmp_path / 'comments.db')
+
+    storage = make_storage()
+
+    assert user_version(tmp_path / 'comments.db') == len(SCHEMA_MIGRATIONS)
+    assert {
+        'idx_activities_open', 'idx_participations_activity', 'idx_participations_created',
+        'idx_comments_created', 'idx_micro_headlines_created',
+    } <= index_names(tmp_path / 'comments.db')
+    # 旧数据保留，新表可用
+    assert storage.is_commented('100')
+    assert storage.get_activity_statuses(['7'])['7'] == {
+        'participated': False, 'processed': True, 'skipped_for_app': True,
+    }
+    assert storage.get_activities() == []
+
+
+def test_fresh_database_and_reopen_are_idempotent(tmp_path, make_storage):
+    make_storage().close()
+    storage = make_storage()
+    assert user_version(tmp_path / 'comments.db') == len(SCHEMA_MIGRATIONS)
+    assert storage.add_comment('1', 't', 'u', 'c')
+
+
+def test_failed_migration_rolls_back(tmp_path, make_storage, monkeypatch):
+    make_storage().close()
+    version = user_version(tmp_path / 'comments.db')
+    monkeypatch.setattr(storage_module, 'SCHEMA_MIGRATIONS', SCHEMA_MIGRATIONS + [[
+        'CREATE TABLE extra (id INTEGER)',
+        'CREATE TABLE broken (',
+    ]])
+
+    with pytest.raises(sqlite3.OperationalError):
+        make_storage()
+
+    assert user_version(tmp_path / 'comments.db') == version
+    conn = sqlite3.connect(tmp_path / 'comments.db')
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        conn.close()
+    assert 'extra' not in tables
@@ -0,0 +1,152 @@
+"""批量写入与写后队列测试"""
+
+import time
+
+from toutiao_agent.storage import CommentStorage
+
+
+def rows(storage: CommentStorage, sql: str):
+    return [tuple(row) for row in storage._get_connection().execute(sql)]
+
+
+def test_add_many_in_one_transaction(make_storage):
+    storage = make_storage()
+    assert storage.add_comments_many([
+        {'article_id': '1', 'title': 'a'},
+        {'article_id': '2', 'title': 'b'},
+    ]) == 2
+    # 已评论的文章被忽略
+    assert storage.add_comments_many([{'article_id': '2'}, {'article_id': '3'}]) == 1
+    assert storage.add_micro_headlines_many([{'content': 'x'}, {'content': 'y'}]) == 2
+    assert storage.add_activity_participations_many([
+        {'activity_id': '9', 'ai_analysis': {'type': 'post'}, 'user_confirmed': True},
+    ]) == 1
+    assert storage.get_commented_ids(['1', '2', '3', '4']) == {'1', '2', '3'}
+    assert storage.get_activity_statuses(['9'])['9']['participated'] is True
+
+
+def test_queued_writes_keep_order_across_tables(make_storage):
+    storage = make_storage(write_behind=True, write_behind_batch=1000, write_behind_interval=60)
+    storage.add_activity_participation('1', operation_type='a')
+    storage.add_comment('c1', 't', 'u', 'c')
+    storage.add_activity_participation('2', operation_type='b')
+    storage.add_activity_participation('3', operation_type='c')
+    assert storage._queue.pending == 4
+
+    storage.flush()
+
+    assert storage._queue.pending == 0
+    assert rows(storage, 'SELECT activity_id FROM activity_participations ORDER BY id') == [
+        ('1',), ('2',), ('3',),
+    ]
+    assert storage.is_commented('c1')
+
+
+def test_reads_see_queued_writes(make_storage):
+    storage = make_storage(write_behind=True, write_behind_batch=1000, write_behind_interval=60)
+    storage.add_comment('c1', 't', 'u', 'c')
+    assert storage._queue.pending == 1
+    assert storage.is_commented('c1')
+    assert storage._queue.pending == 0
+
+
+def test_flushes_on_batch_size(make_storage):
+    storage = make_storage(write_behind=True, write_behind_batch=3, write_behind_interval=60)
+    for i in range(3):
+        storage.add_comment(f'c{i}', 't', 'u', 'c')
+    deadline = time.monotonic() + 2
+    while storage._queue.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert storage._queue.pending == 0
+
+
+def test_flushes_on_interval(make_storage):
+    storage = make_storage(write_behind=True, write_behind_batch=1000, write_behind_interval=0.05)
+    storage.add_comment('c1', 't', 'u', 'c')
+    deadline = time.monotonic() + 2
+    while storage._queue.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert storage._queue.pending == 0
+
+
+def test_close_flushes_and_later_writes_go_direct(tmp_path, make_storage):
+    storage = make_storage(write_behind=True, write_behind_batch=1000, write_behind_interval=60)
+    storage.add_comment('c1', 't', 'u', 'c')
+    storage.close()
+
+    # 关闭后不再入队，直接写入
+    assert storage.add_comment('c2', 't', 'u', 'c')
+    assert storage._queue.pending == 0
+
+    reopened = CommentStorage(str(tmp_path / 'comments.db'))
+    try:
+        assert reopened.get_commented_ids(['c1', 'c2']) == {'c1', 'c2'}
+    finally:
+        reopened.close()
+
+
+def test_failed_flush_backs_off_and_is_bounded(make_storage):
+    storage = make_storage(
+        write_behind=True, write_behind_batch=2, write_behind_interval=60,
+        write_behind_retries=1, write_behind_max_pending=3
+    )
+    queue = storage._queue
+    attempts = []
+    original = storage._write_batch
+
+    def failing(conn, batch):
+        attempts.append(len(batch))
+        raise RuntimeError('disk I/O error')
+
+    storage._write_batch = failing
+    storage.add_comment('c1', 't', 'u', 'c')
+    storage.is_commented('c1')
+    assert attempts == [1] and queue.failing and queue.pending == 1
+
+    # 失败后读取不再尝试写入
+    for _ in range(5):
+        storage.is_commented('c1')
+    assert attempts == [1]
+
+    # 队列有上限
+    assert storage.add_comment('c2', 't', 'u', 'c')
+    assert storage.add_comment('c3', 't', 'u', 'c')
+    assert not storage.add_comment('c4', 't', 'u', 'c')
+
+    # 退避结束后再次失败，超过重试次数的记录被丢弃
+    queue._retry_at = 0
+    queue.flush(storage._get_connection())
+    assert attempts == [1, 3] and queue.pending == 0
+
+    # 恢复后正常写入并清除失败状态
+    storage._write_batch = original
+    storage.add_comment('c5', 't', 'u', 'c')
+    queue._retry_at = 0
+    queue.flush(storage._get_connection())
+    assert not queue.failing
+    assert storage.get_commented_ids(['c1', 'c5']) == {'c5'}
+
+
+def test_reads_include_queued_rows_while_flushes_fail(make_storage):
+    storage = make_storage(write_behind=True, write_behind_batch=1000, write_behind_interval=60)
+
+    def failing(conn, batch):
+        raise RuntimeError('database is locked')
+
+    storage._write_batch = failing
+    storage.add_comment('c1', 't', 'u', 'c')
+    storage.add_activity_participation('7', operation_type='skip_requires_app')
+    storage.add_activity_participation('8', operation_type='post', user_confirmed=True)
+    storage.get_comment_count()
+    assert storage._queue.failing and storage._queue.pending == 3
+
+    # 退避期间记录仍在队列中，查询结果合并这些记录，避免重复评论/参与
+    assert storage.is_commented('c1')
+    assert storage.get_commented_ids(['c1', 'c2']) == {'c1'}
+    assert storage.is_activity_processed('7') and storage.is_activity_skipped_for_app('7')
+    assert storage.is_activity_participated('8') and not storage.is_activity_participated('7')
+    assert storage.get_activity_statuses(['7', '8', '9']) == {
+        '7': {'participated': False, 'processed': True, 'skipped_for_app': True},
+        '8': {'participated': True, 'processed': True, 'skipped_for_app': False},
+        '9': {'participated': False, 'processed': False, 'skipped_for_app': False},
+    }